@@ -1,18 +1,45 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, APIRouter
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, APIRouter, Response, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 import pandas as pd
+import asyncio
 import io
 import os
 import json
-import openai
-from typing import Dict, List, Any
+import zipfile
+from urllib.parse import quote
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional
 from dotenv import load_dotenv
+from dataset_cache import dataset_cache, is_dataset_id
+from review_store import review_store
+from llm_client import client_pool
+from llm_cache import llm_cache, make_key
+from dedup import dedupe_frame
+from stats_engine import ALL_FRANCHISES, PERIODS, stats_table
+from trend import build_trend
+from local_analysis import REPORT_MODE, REPORT_MODES, fast_report, local_digest, prompt_usage, report_keywords
+from report_core import CommentAnalyzer, build_neg_reviews
+from timing import RequestTimer, metrics, record_cache, span, timed
+from job_queue import job_runner
+from report_export import FORMATS, ExportUnavailable, check_available, export_filename, report_exporter
+
+if TYPE_CHECKING:
+    import openai
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    report_exporter.shutdown()
+    await client_pool.aclose()
+
 # FastAPI 앱 생성
-app = FastAPI(title="가맹점 댓글 분석 API")
+app = FastAPI(title="가맹점 댓글 분석 API", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -26,157 +53,630 @@ app.add_middleware(
 # API 전용 라우터 생성
 api_router = APIRouter(prefix="/api", tags=["api"])
 
-class CommentAnalyzer:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-
-    def identify_columns(self, df: pd.DataFrame) -> Dict[str, str]:
-        cols = df.columns.tolist()
-        mapping = {}
-        for c in cols:
-            c_s = str(c).strip()
-            if any(k in c_s for k in ['가맹점', '지점', '매장']): mapping['franchise'] = c
-            if any(k in c_s for k in ['작성일', '날짜', 'Date']): mapping['date'] = c
-            if any(k in c_s for k in ['별점', '점수', 'Rating']): mapping['rating'] = c
-            if any(k in c_s for k in ['댓글내용(한글)', '한글댓글']): mapping['comment_ko'] = c
-            if any(k in c_s for k in ['댓글내용(중국어)', '중국어댓글']): mapping['comment_zh'] = c
-            if any(k in c_s for k in ['답글내용(한글)', '한글답글']): mapping['reply_ko'] = c
-
-        if 'comment_ko' not in mapping and 'comment_zh' not in mapping:
-            for c in cols:
-                if any(k in str(c) for k in ['댓글', 'Content', 'Comment']):
-                    mapping['comment'] = c
-                    break
-        
-        if 'comment' not in mapping:
-            mapping['comment'] = mapping.get('comment_ko', mapping.get('comment_zh', cols[3] if len(cols)>3 else cols[0]))
-        
-        if 'franchise' not in mapping: mapping['franchise'] = cols[0]
-        if 'date' not in mapping: mapping['date'] = cols[1] if len(cols)>1 else cols[0]
-        if 'rating' not in mapping: mapping['rating'] = cols[2] if len(cols)>2 else cols[0]
-        return mapping
-
-    def get_basic_stats(self, df: pd.DataFrame, date_col: str, rating_col: str) -> Dict[str, Any]:
-        try:
-            df[date_col] = pd.to_datetime(df[date_col])
-            total = len(df)
-            avg = round(df[rating_col].mean(), 2)
-            days = (df[date_col].max() - df[date_col].min()).days + 1
-            daily = round(total / days, 1) if days > 0 else total
-            top_dates = [{"date": str(d), "count": int(c)} for d, c in df[date_col].dt.date.value_counts().head(3).items()]
-            return {
-                "total_comments": total,
-                "rating_avg": avg,
-                "daily_avg": daily,
-                "top_dates": top_dates,
-                "sentiment_dist": self.calculate_sentiment_dist(df, rating_col)
-            }
-        except:
-            return {"total_comments": len(df), "rating_avg": 0, "daily_avg": 0, "top_dates": [], "sentiment_dist": {"positive": 0, "neutral": 0, "negative": 0}}
-
-    def calculate_sentiment_dist(self, df: pd.DataFrame, rating_col: str) -> Dict[str, int]:
-        total = len(df)
-        if total == 0: return {"positive": 0, "neutral": 0, "negative": 0}
-        pos = len(df[df[rating_col] >= 4.0])
-        neg = len(df[df[rating_col] <= 3.0])
-        neu = total - pos - neg
+# 배치 분석 시 동시 LLM 호출 수
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", 4))
+
+async def analyze_with_cache(analyzer: CommentAnalyzer, client: "openai.AsyncOpenAI", comments: List[str], franchise: str, month: str, stats: Dict, model: str,
+                             on_section: Optional[Callable[[str, Any], None]] = None, digest: Optional[Dict] = None):
+    """AI 결과 캐시 조회 후 미스일 때만 모델 호출 -> (결과, 캐시 적중 여부)"""
+    key = make_key(model, analyzer.PROMPT_VERSION, analyzer.prompt_fingerprint(comments, stats, digest))
+    cached = await run_in_threadpool(llm_cache.get, key)
+    record_cache("llm", cached is not None)
+    if cached is not None:
+        return cached, True
+    result = await analyzer.analyze_comments_async(client, comments, franchise, month, stats, model, on_section, digest)
+    await run_in_threadpool(llm_cache.put, key, model, result)
+    return result, False
+
+
+async def build_report(analyzer: CommentAnalyzer, api_key: str, comments: List[str], franchise: str, month: str, stats: Dict,
+                       model: str, mode: str, digest: Optional[Dict],
+                       on_section: Optional[Callable[[str, Any], None]] = None):
+    """리포트 모드별 분석 -> (결과, 캐시 적중 여부)
+
+    fast 는 모델 호출 없이 로컬 분석으로 채우고, digest/fast 의 keywords 는 로컬 키워드로 채운다.
+    sentiment 는 항상 별점 기준 분포로 덮어쓴다.
+    """
+    if mode == "fast":
+        with span("local_report"):
+            ai_result, cached = fast_report(stats, digest), False
+    else:
+        # await 를 감싸므로 프로파일 제외 (모델 대기 시간과 토큰은 span/record_llm 으로)
+        with span("llm", profiled=False):
+            async with client_pool.lease(api_key) as client:
+                ai_result, cached = await analyze_with_cache(
+                    analyzer, client, comments, franchise, month, stats, model, on_section, digest
+                )
+    ai_result['sentiment'] = stats['sentiment_dist']
+    if digest:
+        ai_result['keywords'] = report_keywords(digest)
+    return ai_result, cached
+
+
+def check_mode(mode: str, api_key: str) -> None:
+    if mode not in REPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode 는 {', '.join(REPORT_MODES)} 중 하나여야 합니다")
+    if mode != "fast" and not api_key:
+        raise HTTPException(status_code=400, detail="API 키가 필요합니다 (빠른 리포트는 mode=fast)")
+
+
+def group_digest(dataset, group_df: pd.DataFrame, mode: str) -> Optional[Dict[str, Any]]:
+    """digest/fast 모드의 로컬 분석 (llm 모드는 None) - IDF 기준은 데이터셋 전체"""
+    if mode == "llm":
+        return None
+    with span("local"):
+        return local_digest(group_df, dataset.columns, dataset.keyword_baseline)
+
+
+def select_group(analyzer: CommentAnalyzer, dataset, franchise: str, month: str, mode: str = "llm"):
+    """가맹점/월 그룹 + 통계 + 부정 리뷰 + 중복 제거된 프롬프트용 리뷰 + 로컬 분석 (데이터 없으면 None)
+
+    그룹 인덱스의 행 오프셋으로 잘라내므로 전체 데이터를 다시 훑지 않는다.
+    단계별 소요 시간은 현재 요청 timer 에 기록된다. (filter/stats/dedup/local)
+    """
+    mapping = dataset.columns
+    with span("filter"):
+        filtered_df = dataset.group_index.rows(dataset.df, franchise, month)
+    if filtered_df is None:
+        return None
+    with span("stats"):
+        stats = analyzer.get_basic_stats(filtered_df, mapping['date'], mapping['rating'])
+        neg_reviews = build_neg_reviews(filtered_df, mapping)
+    with span("dedup"):
+        comments, dedup = dedupe_frame(filtered_df, mapping)
+    digest = group_digest(dataset, filtered_df, mode)
+    return stats, neg_reviews, comments, prompt_usage(dedup, comments, digest, mode), digest
+
+
+async def group_report(analyzer: CommentAnalyzer, api_key: str, dataset, franchise: str, month: str, model: str,
+                       mode: str) -> Optional[Dict[str, Any]]:
+    """가맹점/월 리포트 본문 (/api/analyze 와 작업 큐 공용, 데이터 없으면 None)"""
+    selected = await run_in_threadpool(select_group, analyzer, dataset, franchise, month, mode)
+    if selected is None:
+        return None
+    stats, neg_reviews, comments, dedup, digest = selected
+    ai_result, cached = await build_report(analyzer, api_key, comments, franchise, month, stats, model, mode, digest)
+    return {
+        "analysis": ai_result,
+        "stats": stats,
+        "neg_reviews": neg_reviews,
+        "meta": {"franchise": franchise, "month": month, "cached": cached, "dedup": dedup, "mode": mode}
+    }
+
+
+async def batch_groups(analyzer: CommentAnalyzer, dataset, franchises: Optional[str], months: Optional[str],
+                       changed_only: bool = False):
+    """배치 대상 (가맹점, 월) 그룹 -> (그룹별 통계, [(키, 그룹 프레임)]) - 대상이 없으면 404
+
+    franchises / months 는 쉼표 구분 목록 (생략 시 전체)
+    changed_only 면 이 업로드로 리뷰 저장소에 새 행/바뀐 행이 생긴 월만
+    """
+    mapping = dataset.columns
+    if changed_only:
+        # prepare 에서 이미 비교한 업로드면 기록된 결과를 그대로 사용
+        delta = await run_in_threadpool(review_store.ingest, dataset.dataset_id, dataset.df, mapping)
+        if delta is not None:
+            changed = sorted(delta["months"])
+            requested = [m.strip() for m in months.split(',')] if months else changed
+            months = ','.join(m for m in requested if m in changed)
+            if not months:
+                raise HTTPException(status_code=404, detail="새로 추가되거나 바뀐 리뷰가 없습니다")
+
+    def group_frame():
+        df = dataset.df
+        month_key = df[mapping['date']].dt.strftime('%Y-%m')
+        franchise_key = df[mapping['franchise']].astype(str)
+        mask = pd.Series(True, index=df.index)
+        if franchises:
+            mask &= franchise_key.isin([f.strip() for f in franchises.split(',')])
+        if months:
+            mask &= month_key.isin([m.strip() for m in months.split(',')])
+        df = df[mask]
+        all_stats = analyzer.get_grouped_stats(df, mapping['franchise'], mapping['date'], mapping['rating'])
+        groups = list(df.groupby([franchise_key[mask], month_key[mask]], sort=True))
+        return all_stats, groups
+
+    all_stats, groups = await run_in_threadpool(group_frame)
+    if not all_stats:
+        raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
+    return all_stats, groups
+
+
+async def batch_group_report(analyzer: CommentAnalyzer, api_key: str, dataset, key, group_df: pd.DataFrame, stats: Dict,
+                             model: str, mode: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """배치의 그룹 하나 - 실패해도 예외 대신 status=error 항목"""
+    franchise, month = key
+    mapping = dataset.columns
+    meta = {"franchise": franchise, "month": month, "mode": mode}
+    try:
+        comments, dedup = await run_in_threadpool(dedupe_frame, group_df, mapping)
+        digest = await run_in_threadpool(group_digest, dataset, group_df, mode)
+        meta["dedup"] = prompt_usage(dedup, comments, digest, mode)
+        async with semaphore:
+            ai_result, cached = await build_report(analyzer, api_key, comments, franchise, month, stats, model, mode, digest)
+        meta["cached"] = cached
         return {
-            "positive": round((pos/total)*100, 1),
-            "neutral": round((neu/total)*100, 1),
-            "negative": round((neg/total)*100, 1)
+            "status": "ok",
+            "analysis": ai_result,
+            "stats": stats,
+            "neg_reviews": build_neg_reviews(group_df, mapping),
+            "meta": meta
         }
+    except Exception as e:
+        return {"status": "error", "error": str(e), "stats": stats, "meta": meta}
+
+
+async def resolve_dataset(analyzer: CommentAnalyzer, file: Optional[UploadFile], dataset_id: Optional[str]):
+    """dataset_id 캐시 조회, 미스 시 업로드 파일 파싱 (형식이 다른 dataset_id 는 400, 둘 다 없으면 410)
+
+    pandas/openpyxl 작업은 스레드풀에서 실행해 이벤트 루프를 막지 않는다.
+    업로드는 디스크에 스풀된 파일 객체 그대로 해시/스트리밍 파싱한다.
+    """
+    dataset = None
+    if dataset_id:
+        if not is_dataset_id(dataset_id):
+            raise HTTPException(status_code=400, detail="잘못된 dataset_id 입니다")
+        dataset = await run_in_threadpool(timed("dataset", dataset_cache.get, dataset_id))
+        record_cache("dataset", dataset is not None)
+    if dataset is None:
+        if file is None:
+            raise HTTPException(status_code=410, detail="데이터셋이 만료되었습니다. 파일을 다시 업로드해주세요")
+        dataset = await run_in_threadpool(timed("parse", dataset_cache.get_or_load_file, file.file, analyzer.identify_columns))
+    return dataset
+
+
+def finish_request(timer: RequestTimer, response: Response, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Server-Timing 헤더를 붙이고 요청 계측 종료 (profile=1 이면 본문에 cProfile 요약)"""
+    if timer.profiler is not None:
+        body["profile"] = timer.profile_summary()
+    response.headers["Server-Timing"] = timer.server_timing()
+    timer.finish(200)
+    return body
 
-    def analyze_comments(self, comments: List[str], franchise: str, month: str, stats: Dict, model: str) -> Dict:
-        prompt = f"""당신은 전문 데이터 분석가입니다. 다음 리뷰 데이터를 분석하여 JSON으로 응답하세요.
-모든 텍스트는 반드시 한글로 작성하세요. 키워드 설명(desc)은 한글 15~25자 내외로 작성하세요.
-데이터: {chr(10).join([f"- {c}" for c in comments[:150]])}
-형식: {{"summary": "...", "insight": "...", "sentiment": {{"positive": 0, "neutral": 0, "negative": 0}}, "pros": [{{"title": "...", "content": "..."}}], "cons": [{{"title": "...", "content": "..."}}], "keywords": [{{"tag": "키워드", "is_positive": true, "desc": "15-25자 설명"}}], "action_plan": ["..."]}}
-"""
-        try:
-            client = openai.OpenAI(api_key=self.api_key)
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-            return json.loads(response.choices[0].message.content)
-        except Exception as e:
-            raise Exception(f"AI 분석 실패: {str(e)}")
+
+def request_error(timer: RequestTimer, status_code: int, detail: str) -> HTTPException:
+    """오류 응답도 Server-Timing 헤더를 붙이고 계측 종료"""
+    headers = {"Server-Timing": timer.server_timing()}
+    timer.finish(status_code)
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
 
 # --- API 엔드포인트 (최우선 등록) ---
 
 @api_router.post("/prepare")
-async def prepare_analysis(file: UploadFile = File(...)):
-    """파일에서 가맹점과 월 정보 추출"""
-    try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        analyzer = CommentAnalyzer("")
-        mapping = analyzer.identify_columns(df)
-        
-        date_col = mapping.get('date')
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-        df = df.dropna(subset=[date_col])
-        
-        franchises = sorted(df[mapping['franchise']].unique().astype(str).tolist())
-        months = sorted(df[date_col].dt.strftime('%Y-%m').unique().tolist(), reverse=True)
-        
-        return {"franchises": franchises, "months": months, "mapping": mapping}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"파일 처리 오류: {str(e)}")
+async def prepare_analysis(response: Response, file: UploadFile = File(...), profile: bool = False):
+    """파일에서 가맹점과 월 정보 추출 (?profile=1 이면 단계별 cProfile 요약 첨부)"""
+    timer = RequestTimer("prepare", profile)
+    with timer.activate():
+        try:
+            analyzer = CommentAnalyzer("")
+            dataset = await resolve_dataset(analyzer, file, None)
+            
+            # 가맹점 × 월 인덱스 (한 번의 groupby) - 데이터가 있는 조합과 행 수/평균 별점/부정 리뷰 수
+            index = await run_in_threadpool(timed("index", lambda: dataset.group_index))
+            franchises = sorted({franchise for franchise, _ in index.keys})
+            months = sorted({month for _, month in index.keys}, reverse=True)
+            # 리뷰 저장소와 비교해 새 행/바뀐 행만 추가 - 월별 변경 요약 (저장소 비활성 시 None)
+            delta = await run_in_threadpool(timed("store", review_store.ingest, dataset.dataset_id, dataset.df, dataset.columns))
+            return finish_request(timer, response, {
+                "franchises": franchises,
+                "months": months,
+                "mapping": dataset.mapping,
+                "dataset_id": dataset.dataset_id,
+                "index": index.to_records(),
+                "delta": delta
+            })
+        except Exception as e:
+            raise request_error(timer, 500, f"파일 처리 오류: {str(e)}")
 
 @api_router.post("/analyze")
 async def analyze_data(
-    file: UploadFile = File(...),
+    response: Response,
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
     franchise: str = Form(...),
     month: str = Form(...),
-    api_key: str = Form(...),
-    model: str = Form("gpt-4o-mini")
+    api_key: str = Form(""),
+    model: str = Form("gpt-4o-mini"),
+    mode: str = Form(REPORT_MODE),
+    profile: bool = False
 ):
-    """댓글 데이터 AI 분석"""
-    try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        analyzer = CommentAnalyzer(api_key)
-        mapping = analyzer.identify_columns(df)
-        
-        df[mapping['date']] = pd.to_datetime(df[mapping['date']], errors='coerce')
-        mask = (df[mapping['franchise']].astype(str) == franchise) & (df[mapping['date']].dt.strftime('%Y-%m') == month)
-        filtered_df = df[mask]
-        
-        if filtered_df.empty:
-            raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
-        
-        stats = analyzer.get_basic_stats(filtered_df, mapping['date'], mapping['rating'])
-        
-        neg_reviews = []
-        for _, row in filtered_df[filtered_df[mapping['rating']] <= 3].head(10).iterrows():
-            neg_reviews.append({
-                "date": str(row.get(mapping['date'], '')),
-                "rating": float(row.get(mapping['rating'], 0)),
-                "content_zh": str(row.get(mapping.get('comment_zh'), '')) if mapping.get('comment_zh') else "",
-                "content_ko": str(row.get(mapping.get('comment_ko'), '')) if mapping.get('comment_ko') else "",
-                "reply_ko": str(row.get(mapping.get('reply_ko'), '')) if mapping.get('reply_ko') else ""
-            })
-        
-        ai_result = analyzer.analyze_comments(filtered_df[mapping['comment']].tolist(), franchise, month, stats, model)
-        ai_result['sentiment'] = stats['sentiment_dist']
-        
-        return {
-            "analysis": ai_result,
+    """댓글 데이터 AI 분석 (dataset_id 캐시 적중 시 업로드/파싱 생략)
+
+    mode: llm(대표 리뷰 원문) / digest(로컬 분석 요약 + 대표 리뷰 일부) / fast(모델 호출 없음, api_key 불필요)
+    단계별 소요 시간은 Server-Timing 헤더로, ?profile=1 이면 cProfile 요약을 본문 profile 로 돌려준다.
+    """
+    timer = RequestTimer("analyze", profile)
+    with timer.activate():
+        try:
+            check_mode(mode, api_key)
+            analyzer = CommentAnalyzer(api_key)
+            dataset = await resolve_dataset(analyzer, file, dataset_id)
+            report = await group_report(analyzer, api_key, dataset, franchise, month, model, mode)
+            if report is None:
+                raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
+            return finish_request(timer, response, report)
+        except HTTPException as e:
+            raise request_error(timer, e.status_code, e.detail)
+        except Exception as e:
+            raise request_error(timer, 500, f"분석 오류: {str(e)}")
+
+# 스트리밍 리포트에서 섹션 단위로 보내는 키 (sentiment 는 통계값으로 대체되므로 제외)
+REPORT_SECTIONS = ("summary", "insight", "pros", "cons", "keywords", "action_plan")
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@api_router.post("/analyze/stream")
+async def analyze_stream(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    franchise: str = Form(...),
+    month: str = Form(...),
+    api_key: str = Form(""),
+    model: str = Form("gpt-4o-mini"),
+    mode: str = Form(REPORT_MODE)
+):
+    """/api/analyze 와 같은 입력으로 리포트를 SSE 로 스트리밍
+
+    이벤트 순서: report(통계/부정 리뷰/meta, 즉시) -> section(summary, pros ... 완성되는 대로) -> done(전체 분석)
+    실패 시 error 이벤트로 끝난다. 캐시 적중이거나 fast 모드면 모든 섹션을 한 번에 보낸다.
+    digest/fast 모드의 keywords 는 로컬 분석 결과라 report 직후 바로 보낸다.
+    """
+    check_mode(mode, api_key)
+    analyzer = CommentAnalyzer(api_key)
+    dataset = await resolve_dataset(analyzer, file, dataset_id)
+    selected = await run_in_threadpool(select_group, analyzer, dataset, franchise, month, mode)
+    if selected is None:
+        raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
+    stats, neg_reviews, comments, dedup, digest = selected
+
+    async def stream():
+        yield sse_event("report", {
             "stats": stats,
             "neg_reviews": neg_reviews,
-            "meta": {"franchise": franchise, "month": month}
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"분석 오류: {str(e)}")
+            "meta": {"franchise": franchise, "month": month, "dedup": dedup, "mode": mode}
+        })
+        if digest:
+            yield sse_event("section", {"key": "keywords", "value": report_keywords(digest)})
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_section(key: str, value: Any):
+            if key in REPORT_SECTIONS and not (digest and key == "keywords"):
+                queue.put_nowait((key, value))
+
+        task = asyncio.create_task(build_report(analyzer, api_key, comments, franchise, month, stats, model, mode, digest, on_section))
+        try:
+            while True:
+                getter = asyncio.create_task(queue.get())
+                finished, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in finished:
+                    key, value = getter.result()
+                    yield sse_event("section", {"key": key, "value": value})
+                    continue
+                getter.cancel()
+                while not queue.empty():
+                    key, value = queue.get_nowait()
+                    yield sse_event("section", {"key": key, "value": value})
+                break
+
+            ai_result, cached = task.result()
+            if cached or mode == "fast":
+                for key in REPORT_SECTIONS:
+                    if key in ai_result and not (digest and key == "keywords"):
+                        yield sse_event("section", {"key": key, "value": ai_result[key]})
+            yield sse_event("done", {"analysis": ai_result, "cached": cached})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"분석 오류: {str(e)}"})
+        finally:
+            task.cancel()
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@api_router.post("/analyze/batch")
+async def analyze_batch(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    api_key: str = Form(""),
+    model: str = Form("gpt-4o-mini"),
+    franchises: Optional[str] = Form(None),
+    months: Optional[str] = Form(None),
+    changed_only: bool = Form(False),
+    concurrency: int = Form(LLM_CONCURRENCY),
+    mode: str = Form(REPORT_MODE)
+):
+    """가맹점 × 월 전체 일괄 분석 - 완료되는 순서대로 NDJSON 한 줄씩 스트리밍
+
+    franchises / months 는 쉼표 구분 목록 (생략 시 전체)
+    changed_only 면 이 업로드로 리뷰 저장소에 새 행/바뀐 행이 생긴 월만 분석
+    mode 는 /api/analyze 와 같음 (fast 면 모델 호출 없이 전체 그룹을 로컬 분석)
+    """
+    check_mode(mode, api_key)
+    analyzer = CommentAnalyzer(api_key)
+    dataset = await resolve_dataset(analyzer, file, dataset_id)
+    all_stats, groups = await batch_groups(analyzer, dataset, franchises, months, changed_only)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_group(key, group_df):
+        return await batch_group_report(analyzer, api_key, dataset, key, group_df, all_stats[key], model, mode, semaphore)
+
+    async def stream():
+        tasks = [asyncio.create_task(run_group(key, group_df)) for key, group_df in groups]
+        done = failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                done += 1
+                failed += item["status"] == "error"
+                yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+            yield json.dumps({"status": "done", "total": done, "failed": failed}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@api_router.post("/stats")
+async def group_statistics(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    period: str = Form("month"),
+    rollup: bool = Form(True),
+    franchises: Optional[str] = Form(None)
+):
+    """가맹점 × 기간 통계 일괄 계산 (대시보드용, AI 호출 없음)
+
+    period: month / quarter / year, rollup 이면 전체 가맹점 합산('전체') 그룹 추가
+    franchises 는 쉼표 구분 목록 (생략 시 전체)
+    """
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period 는 {', '.join(PERIODS)} 중 하나여야 합니다")
+    analyzer = CommentAnalyzer("")
+    dataset = await resolve_dataset(analyzer, file, dataset_id)
+    columns = dataset.columns
+    selected = [f.strip() for f in franchises.split(',')] if franchises else None
+    groups = await run_in_threadpool(
+        stats_table, dataset.df, columns['franchise'], columns['date'], columns['rating'], period, rollup, selected
+    )
+    return {"period": period, "groups": groups}
+
+@api_router.get("/store")
+async def store_summary():
+    """리뷰 저장소 월별 현황 (행 수, 내용 digest, 가맹점별 통계)"""
+    manifest = await run_in_threadpool(review_store.manifest)
+    months = {
+        month: {k: entry[k] for k in ("rows", "parts", "digest", "updated_at")}
+        for month, entry in manifest["months"].items()
+    }
+    return {"enabled": review_store.enabled, "months": months}
+
+@api_router.post("/trend")
+async def trend_report(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    franchise: str = Form(ALL_FRANCHISES),
+    last: int = Form(24),
+    keywords: int = Form(10)
+):
+    """월별 추이 - 평균 별점, 리뷰 수, 긍정/중립/부정 비율, 키워드 빈도의 전월/전년 동월 대비 변화
+
+    dataset_id/file 이 있으면 그 데이터셋의 월별 요약(처음 한 번 계산), 없으면 리뷰 저장소에 누적된 요약을 사용
+    franchise 를 생략하면 전체 가맹점 합산('전체')
+    """
+    if dataset_id or file is not None:
+        dataset = await resolve_dataset(CommentAnalyzer(""), file, dataset_id)
+        summaries = await run_in_threadpool(lambda: dataset.summaries)
+    else:
+        summaries = await run_in_threadpool(review_store.summaries)
+    points = build_trend(summaries, franchise, last, keywords)
+    if not points:
+        raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
+    return {"franchise": franchise, "months": points}
+
+@api_router.get("/cache/stats")
+async def cache_stats():
+    """AI 결과 캐시 적중/미스 카운터"""
+    return {"llm": await run_in_threadpool(llm_cache.stats)}
+
+# --- 분석 작업 큐 ---
+JOB_KINDS = ("analyze", "batch")
+
+async def job_dataset(dataset_id: str):
+    dataset = await run_in_threadpool(dataset_cache.get, dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=410, detail="데이터셋이 만료되었습니다. 파일을 다시 업로드해주세요")
+    return dataset
+
+async def run_analyze_job(params: Dict[str, Any], api_key: str, progress) -> Dict[str, Any]:
+    """kind=analyze - /api/analyze 와 같은 결과"""
+    await progress(0, 1)
+    dataset = await job_dataset(params["dataset_id"])
+    report = await group_report(CommentAnalyzer(api_key), api_key, dataset, params["franchise"], params["month"],
+                                params["model"], params["mode"])
+    if report is None:
+        raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
+    await progress(1, 1)
+    return report
+
+async def run_batch_job(params: Dict[str, Any], api_key: str, progress) -> Dict[str, Any]:
+    """kind=batch - /api/analyze/batch 의 그룹 항목 목록 (가맹점/월 순), 그룹이 끝날 때마다 진행률 갱신"""
+    analyzer = CommentAnalyzer(api_key)
+    dataset = await job_dataset(params["dataset_id"])
+    all_stats, groups = await batch_groups(analyzer, dataset, params["franchises"], params["months"], params["changed_only"])
+    await progress(0, len(groups))
+    # 모델 호출 수는 summarizer 의 전역 상한이 제한하고, 여기서는 동시에 진행하는 그룹 수만 /api/analyze/batch 와 같게
+    semaphore = asyncio.Semaphore(max(1, LLM_CONCURRENCY))
+    tasks = [asyncio.create_task(batch_group_report(analyzer, api_key, dataset, key, group_df, all_stats[key],
+                                                    params["model"], params["mode"], semaphore))
+             for key, group_df in groups]
+    items = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            items.append(await next_done)
+            await progress(len(items), len(groups))
+    finally:
+        for task in tasks:
+            task.cancel()
+    items.sort(key=lambda item: (item["meta"]["franchise"], item["meta"]["month"]))
+    return {"groups": items, "total": len(items), "failed": sum(item["status"] == "error" for item in items)}
+
+job_runner.register("analyze", run_analyze_job)
+job_runner.register("batch", run_batch_job)
+
+@api_router.post("/jobs", status_code=202)
+async def create_job(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    kind: str = Form("analyze"),
+    franchise: Optional[str] = Form(None),
+    month: Optional[str] = Form(None),
+    franchises: Optional[str] = Form(None),
+    months: Optional[str] = Form(None),
+    changed_only: bool = Form(False),
+    api_key: str = Form(""),
+    model: str = Form("gpt-4o-mini"),
+    mode: str = Form(REPORT_MODE)
+):
+    """분석 작업 등록 - 작업 id 를 바로 반환하고 진행률/결과는 GET /api/jobs/{job_id} 로 조회
+
+    kind: analyze(franchise/month 하나, /api/analyze 와 같은 결과) / batch(/api/analyze/batch 와 같은 대상)
+    파일을 올리면 먼저 데이터셋으로 저장한 뒤 그 dataset_id 로 등록한다.
+    같은 요청이 대기/실행 중이면 새 작업 대신 그 작업을 돌려준다. (deduplicated)
+    """
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind 는 {', '.join(JOB_KINDS)} 중 하나여야 합니다")
+    check_mode(mode, api_key)
+    if kind == "analyze" and not (franchise and month):
+        raise HTTPException(status_code=400, detail="franchise 와 month 가 필요합니다")
+    dataset = await resolve_dataset(CommentAnalyzer(api_key), file, dataset_id)
+    if kind == "analyze":
+        rows = await run_in_threadpool(lambda: dataset.group_index.locate(franchise, month))
+        if rows is None:
+            raise HTTPException(status_code=404, detail="선택한 조건에 해당하는 데이터가 없습니다")
+        params = {"dataset_id": dataset.dataset_id, "franchise": franchise, "month": month, "model": model, "mode": mode}
+    else:
+        params = {"dataset_id": dataset.dataset_id, "franchises": franchises, "months": months,
+                  "changed_only": changed_only, "model": model, "mode": mode}
+    job = await job_runner.submit(kind, params, api_key, needs_key=mode != "fast")
+    status = await job_runner.status(job["job_id"])
+    return {"job_id": job["job_id"], "status": status["status"], "deduplicated": job["deduplicated"]}
+
+@api_router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """작업 상태 (queued/running/done/error), 진행률, 완료 시 저장된 결과"""
+    job = await job_runner.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job
+
+EXPORT_MEDIA_TYPES = {"pdf": "application/pdf", "png": "image/png"}
+
+def check_format(format: str) -> None:
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format 은 {', '.join(FORMATS)} 중 하나여야 합니다")
+
+def attachment(filename: str, fallback: str) -> Dict[str, str]:
+    """한글 파일명용 Content-Disposition (RFC 5987 filename*, 구형 클라이언트용 ASCII fallback)"""
+    return {"Content-Disposition": f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"}
+
+@api_router.post("/export")
+async def export_report(payload: Dict[str, Any] = Body(...), format: str = "pdf"):
+    """/api/analyze 결과(analysis/stats/neg_reviews/meta)를 PDF 또는 PNG 로 렌더링 (?format=pdf|png)
+
+    같은 내용은 렌더링 캐시에서 바로 돌려준다. (Server-Timing 의 render 단계가 없으면 캐시 적중)
+    """
+    timer = RequestTimer("export")
+    with timer.activate():
+        if format not in FORMATS:
+            raise request_error(timer, 400, f"format 은 {', '.join(FORMATS)} 중 하나여야 합니다")
+        if not isinstance(payload.get("analysis"), dict) or not isinstance(payload.get("stats"), dict):
+            raise request_error(timer, 400, "analysis 와 stats 가 필요합니다")
+        try:
+            data = await report_exporter.render(payload, format)
+        except ExportUnavailable as e:
+            raise request_error(timer, 501, str(e))
+        except Exception as e:
+            raise request_error(timer, 500, f"리포트 렌더링 오류: {str(e)}")
+        headers = {**attachment(export_filename(payload, format), f"report.{format}"), "Server-Timing": timer.server_timing()}
+        timer.finish(200)
+        return Response(data, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+@api_router.post("/export/month")
+async def export_month(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    month: str = Form(...),
+    format: str = Form("pdf"),
+    franchises: Optional[str] = Form(None),
+    api_key: str = Form(""),
+    model: str = Form("gpt-4o-mini"),
+    mode: str = Form(REPORT_MODE)
+):
+    """한 달의 가맹점 리포트 전체를 zip 으로 (가맹점마다 {가맹점}_분석리포트_{월}.{format})
+
+    분석은 /api/analyze/batch 와 같은 경로(결과 캐시 공유), 렌더링은 프로세스 풀에서 병렬로.
+    실패한 가맹점은 zip 의 errors.json 에 사유를 남긴다.
+    """
+    check_format(format)
+    check_mode(mode, api_key)
+    # 글꼴/라이브러리가 없으면 분석을 돌리기 전에 501
+    try:
+        await run_in_threadpool(check_available, format)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    analyzer = CommentAnalyzer(api_key)
+    dataset = await resolve_dataset(analyzer, file, dataset_id)
+    all_stats, groups = await batch_groups(analyzer, dataset, franchises, month)
+    semaphore = asyncio.Semaphore(max(1, LLM_CONCURRENCY))
+
+    async def export_group(key, group_df):
+        item = await batch_group_report(analyzer, api_key, dataset, key, group_df, all_stats[key], model, mode, semaphore)
+        if item["status"] == "error":
+            return item
+        try:
+            item["data"] = await report_exporter.render(item, format)
+        except ExportUnavailable:
+            raise
+        except Exception as e:
+            return {"status": "error", "error": f"리포트 렌더링 오류: {str(e)}", "meta": item["meta"]}
+        return item
+
+    tasks = [asyncio.create_task(export_group(key, group_df)) for key, group_df in groups]
+    try:
+        items = await asyncio.gather(*tasks)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    def build_zip() -> bytes:
+        # PDF/PNG 는 이미 압축되어 있으므로 ZIP_STORED
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            errors = []
+            for item in items:
+                if item["status"] == "error":
+                    errors.append({**item["meta"], "error": item["error"]})
+                else:
+                    archive.writestr(export_filename(item, format), item["data"])
+            if errors:
+                archive.writestr("errors.json", json.dumps(errors, ensure_ascii=False, indent=2, default=str))
+        return buffer.getvalue()
+
+    data = await run_in_threadpool(build_zip)
+    return Response(data, media_type="application/zip", headers=attachment(f"분석리포트_{month}.zip", f"reports_{month}.zip"))
 
 # --- API 전용 백엔드 (프론트엔드는 Vercel에서 별도 배포) ---
 # API Router 등록
 app.include_router(api_router)
 
+# Prometheus 지표 (프로세스 단위 누적)
+@app.get("/metrics")
+async def prometheus_metrics():
+    """요청/단계 지연 히스토그램, 캐시 적중, 요청당 토큰"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # 루트 경로 (헬스체크용)
 @app.get("/")
 async def root():
@@ -184,7 +684,7 @@ async def root():
     return {
         "service": "Review Report API",
         "status": "healthy",
-        "endpoints": ["/api/prepare", "/api/analyze"]
+        "endpoints": ["/api/prepare", "/api/analyze", "/api/analyze/stream", "/api/analyze/batch", "/api/stats", "/api/trend", "/api/store", "/api/cache/stats", "/api/jobs", "/api/export", "/api/export/month", "/metrics"]
     }
 
 if __name__ == "__main__":
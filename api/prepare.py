@@ -1,102 +1,81 @@
 from http.server import BaseHTTPRequestHandler
 import json
-import io
-import pandas as pd
-from typing import Dict, Any
-import cgi
+import os
+import sys
 from urllib.parse import parse_qs
 
-class CommentAnalyzer:
-    def identify_columns(self, df: pd.DataFrame) -> Dict[str, str]:
-        cols = df.columns.tolist()
-        mapping = {}
-        for c in cols:
-            c_s = str(c).strip()
-            if any(k in c_s for k in ['가맹점', '지점', '매장']): 
-                mapping['franchise'] = c
-            if any(k in c_s for k in ['작성일', '날짜', 'Date']): 
-                mapping['date'] = c
-            if any(k in c_s for k in ['별점', '점수', 'Rating']): 
-                mapping['rating'] = c
-            if any(k in c_s for k in ['댓글내용(한글)', '한글댓글']): 
-                mapping['comment_ko'] = c
-            if any(k in c_s for k in ['댓글내용(중국어)', '중국어댓글']): 
-                mapping['comment_zh'] = c
-            if any(k in c_s for k in ['답글내용(한글)', '한글답글']): 
-                mapping['reply_ko'] = c
-
-        if 'comment_ko' not in mapping and 'comment_zh' not in mapping:
-            for c in cols:
-                if any(k in str(c) for k in ['댓글', 'Content', 'Comment']):
-                    mapping['comment'] = c
-                    break
-        
-        if 'comment' not in mapping:
-            mapping['comment'] = mapping.get('comment_ko', mapping.get('comment_zh', cols[3] if len(cols)>3 else cols[0]))
-        
-        if 'franchise' not in mapping: mapping['franchise'] = cols[0]
-        if 'date' not in mapping: mapping['date'] = cols[1] if len(cols)>1 else cols[0]
-        if 'rating' not in mapping: mapping['rating'] = cols[2] if len(cols)>2 else cols[0]
-        return mapping
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from multipart_form import UploadTooLarge, parse_form
+from dataset_cache import dataset_cache
+from review_store import review_store
+# Column mapping only; prepare never calls the model, so openai is never imported here
+from report_core import CommentAnalyzer
+from timing import RequestTimer, profile_requested, span
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
+        # Per-stage timings go to the Server-Timing header and one JSON log line; ?profile=1 adds a cProfile summary
+        self.timer = RequestTimer("prepare", profile_requested(self.path))
+        self.status = 500
+        with self.timer.activate():
+            self._post()
+        self.timer.finish(self.status)
+    
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+    
+    def _post(self):
+        form = None
         try:
-            # Parse multipart form data
-            content_type = self.headers.get('Content-Type', '')
-            
-            if 'multipart/form-data' not in content_type:
-                self.send_error(400, "Content-Type must be multipart/form-data")
+            # Stream the multipart body; the file part is spooled to one temp file (size-limited)
+            try:
+                with span("upload"):
+                    form = parse_form(self.rfile, self.headers)
+            except UploadTooLarge as e:
+                self.send_error(413, str(e))
+                return
+            except ValueError as e:
+                self.send_error(400, str(e))
                 return
-            
-            # Parse the form data
-            form = cgi.FieldStorage(
-                fp=self.rfile,
-                headers=self.headers,
-                environ={
-                    'REQUEST_METHOD': 'POST',
-                    'CONTENT_TYPE': content_type,
-                }
-            )
             
             # Get the uploaded file
-            if 'file' not in form:
+            upload = form.file('file')
+            if upload is None:
                 self.send_error(400, "No file uploaded")
                 return
             
-            file_item = form['file']
-            if not file_item.file:
-                self.send_error(400, "Invalid file")
-                return
-            
-            # Read file content
-            file_content = file_item.file.read()
-            
-            # Parse Excel file
-            df = pd.read_excel(io.BytesIO(file_content))
-            
-            # Identify columns
+            # Parse Excel file (cached by content hash)
+            # The upload is already spooled to a temp file; hash and stream-parse it in chunks
             analyzer = CommentAnalyzer()
-            mapping = analyzer.identify_columns(df)
+            with span("parse"):
+                dataset = dataset_cache.get_or_load_file(upload, analyzer.identify_columns)
             
-            # Extract date column
-            date_col = mapping.get('date')
-            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-            df = df.dropna(subset=[date_col])
+            # Franchise x month index (one groupby pass): which combinations have data
+            with span("index"):
+                index = dataset.group_index
+            franchises = sorted({franchise for franchise, _ in index.keys})
+            months = sorted({month for _, month in index.keys}, reverse=True)
             
-            # Get unique franchises and months
-            franchises = sorted(df[mapping['franchise']].unique().astype(str).tolist())
-            months = sorted(df[date_col].dt.strftime('%Y-%m').unique().tolist(), reverse=True)
+            # Diff against the review store: only new/changed rows are appended (per-month summary)
+            with span("store"):
+                delta = review_store.ingest(dataset.dataset_id, dataset.df, dataset.columns)
             
             # Prepare response
             response = {
                 "franchises": franchises,
                 "months": months,
-                "mapping": mapping
+                "mapping": dataset.mapping,
+                "dataset_id": dataset.dataset_id,
+                "index": index.to_records(),
+                "delta": delta
             }
+            if self.timer.profiler is not None:
+                response["profile"] = self.timer.profile_summary()
             
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            self.send_header('Server-Timing', self.timer.server_timing())
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
@@ -109,6 +88,9 @@ class handler(BaseHTTPRequestHandler):
             self.end_headers()
             error_response = {"error": str(e)}
             self.wfile.write(json.dumps(error_response).encode())
+        finally:
+            if form is not None:
+                form.close()
     
     def do_OPTIONS(self):
         self.send_response(200)
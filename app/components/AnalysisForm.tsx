@@ -9,6 +9,8 @@ interface AnalysisFormProps {
   setSelectedFranchise: (value: string) => void
   selectedMonth: string
   setSelectedMonth: (value: string) => void
+  fastReport: boolean
+  setFastReport: (value: boolean) => void
   onAnalyze: () => void
 }
 
@@ -18,8 +20,28 @@ export default function AnalysisForm({
   setSelectedFranchise,
   selectedMonth,
   setSelectedMonth,
+  fastReport,
+  setFastReport,
   onAnalyze
 }: AnalysisFormProps) {
+  // 선택한 가맹점의 월별 리뷰 수 (인덱스가 없으면 모든 조합을 허용)
+  const monthCounts = new Map(
+    (prepData.index ?? [])
+      .filter(entry => entry.franchise === selectedFranchise)
+      .map(entry => [entry.month, entry] as const)
+  )
+  const hasIndex = !!prepData.index
+  const selectedEntry = monthCounts.get(selectedMonth)
+  const canAnalyze = !hasIndex || !!selectedEntry
+
+  const handleFranchiseChange = (franchise: string) => {
+    setSelectedFranchise(franchise)
+    const available = (prepData.index ?? []).filter(entry => entry.franchise === franchise).map(entry => entry.month)
+    if (hasIndex && available.length && !available.includes(selectedMonth)) {
+      setSelectedMonth(prepData.months.find(m => available.includes(m)) ?? available[0])
+    }
+  }
+
   return (
     <div className="space-y-8">
       <div className="grid grid-cols-2 gap-6">
@@ -27,7 +49,7 @@ export default function AnalysisForm({
           <label className="text-sm font-bold text-slate-400 uppercase tracking-widest pl-1">가맹점 / 지점 선택</label>
           <select
             value={selectedFranchise}
-            onChange={(e) => setSelectedFranchise(e.target.value)}
+            onChange={(e) => handleFranchiseChange(e.target.value)}
             className="w-full px-6 py-4 bg-slate-50 border-2 border-slate-100 rounded-2xl focus:border-blue-500 outline-none transition-all font-bold text-slate-800"
           >
             {prepData.franchises.map(f => (
@@ -42,16 +64,40 @@ export default function AnalysisForm({
             onChange={(e) => setSelectedMonth(e.target.value)}
             className="w-full px-6 py-4 bg-slate-50 border-2 border-slate-100 rounded-2xl focus:border-blue-500 outline-none transition-all font-bold text-slate-800"
           >
-            {prepData.months.map(m => (
-              <option key={m} value={m}>{m}</option>
-            ))}
+            {prepData.months.map(m => {
+              const entry = monthCounts.get(m)
+              const updated = prepData.delta?.months[m]
+              const label = hasIndex ? `${m} (${entry ? `${entry.count}건` : '데이터 없음'})` : m
+              return (
+                <option key={m} value={m} disabled={hasIndex && !entry}>
+                  {updated ? `${label} · 신규 ${updated.new}건${updated.changed ? ` / 수정 ${updated.changed}건` : ''}` : label}
+                </option>
+              )
+            })}
           </select>
         </div>
       </div>
 
+      {selectedEntry && (
+        <p className="text-sm font-medium text-slate-500 pl-1">
+          리뷰 {selectedEntry.count}건 · 평균 별점 {selectedEntry.rating_avg ?? '-'} · 부정 리뷰 {selectedEntry.negative}건
+        </p>
+      )}
+
+      <label className="flex items-center gap-3 pl-1 text-sm font-medium text-slate-500 cursor-pointer select-none">
+        <input
+          type="checkbox"
+          checked={fastReport}
+          onChange={(e) => setFastReport(e.target.checked)}
+          className="w-4 h-4 accent-blue-600"
+        />
+        빠른 리포트 (AI 호출 없이 키워드/감성 분석만, API 키 불필요)
+      </label>
+
       <button
         onClick={onAnalyze}
-        className="w-full py-6 bg-blue-600 text-white rounded-[1.5rem] font-black text-2xl hover:bg-blue-700 active:scale-[0.98] transition-all shadow-2xl shadow-blue-500/40 flex items-center justify-center gap-4 group"
+        disabled={!canAnalyze}
+        className="w-full py-6 bg-blue-600 text-white rounded-[1.5rem] font-black text-2xl hover:bg-blue-700 active:scale-[0.98] transition-all shadow-2xl shadow-blue-500/40 flex items-center justify-center gap-4 group disabled:bg-slate-300 disabled:shadow-none disabled:cursor-not-allowed"
       >
         <span>🚀 분석 시작하기</span>
         <ChevronRight className="w-8 h-8 group-hover:translate-x-1 transition-transform" />
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useRef } from 'react'
+import { useState, useRef, useEffect } from 'react'
 import { 
   TrendingUp, Star, MessageSquare, ThumbsUp, AlertTriangle, 
   CheckCircle2, Lightbulb, LayoutDashboard, Upload, FileText 
@@ -14,13 +14,20 @@ import { AnalysisResult } from '../types'
 
 interface ReportViewProps {
   result: AnalysisResult
+  // AI 섹션을 스트리밍으로 받는 중이면 true (수정/저장 비활성화)
+  streaming?: boolean
 }
 
-export default function ReportView({ result: initialResult }: ReportViewProps) {
+export default function ReportView({ result: initialResult, streaming = false }: ReportViewProps) {
   const [editableResult, setEditableResult] = useState<AnalysisResult>(initialResult)
   const [isEditComplete, setIsEditComplete] = useState(false)
   const reportRef = useRef<HTMLDivElement>(null)
 
+  // 스트리밍 중 도착한 섹션 반영
+  useEffect(() => {
+    setEditableResult(initialResult)
+  }, [initialResult])
+
   const handleEdit = (section: string, index: number | null, field: string | null, value: string) => {
     setEditableResult(prev => {
       const next = { ...prev }
@@ -105,7 +112,12 @@ export default function ReportView({ result: initialResult }: ReportViewProps) {
     <>
       {/* Save Buttons */}
       <div className="mb-6 flex flex-wrap gap-4 justify-end">
-        {!isEditComplete && (
+        {streaming && (
+          <div className="flex items-center gap-2 px-6 py-3 bg-blue-50 text-blue-600 rounded-xl font-bold border border-blue-100 animate-pulse">
+            AI 리포트 작성 중...
+          </div>
+        )}
+        {!streaming && !isEditComplete && (
           <button
             onClick={() => {
               setIsEditComplete(true)
@@ -0,0 +1,81 @@
+import { AnalysisResult } from '../types'
+
+type Analysis = AnalysisResult['analysis']
+
+export interface StreamHandlers {
+  // 통계/부정 리뷰가 준비되면 즉시 호출 (AI 섹션은 비어 있음)
+  onReport: (partial: AnalysisResult) => void
+  // summary, pros 등 섹션이 완성될 때마다 호출
+  onSection: (key: keyof Analysis, value: any) => void
+}
+
+export class StreamHttpError extends Error {
+  status: number
+
+  constructor(status: number, message: string) {
+    super(message)
+    this.status = status
+  }
+}
+
+const emptyAnalysis = (sentiment: Analysis['sentiment']): Analysis => ({
+  summary: '',
+  insight: '',
+  sentiment,
+  pros: [],
+  cons: [],
+  keywords: [],
+  action_plan: [],
+})
+
+/**
+ * /api/analyze/stream (SSE) 호출 - 섹션이 도착하는 대로 handlers 로 전달하고 최종 결과를 반환
+ * 응답이 스트림이 아니면(404/405 등, 예: 서버리스 배포) StreamHttpError 를 던진다.
+ */
+export async function streamAnalyze(formData: FormData, handlers: StreamHandlers): Promise<AnalysisResult> {
+  const res = await fetch('/api/analyze/stream', { method: 'POST', body: formData })
+  if (!res.ok || !res.body || !res.headers.get('content-type')?.includes('text/event-stream')) {
+    throw new StreamHttpError(res.status, res.statusText)
+  }
+
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let result: AnalysisResult | null = null
+
+  const dispatch = (event: string, data: any) => {
+    if (event === 'report') {
+      result = { ...data, analysis: emptyAnalysis(data.stats.sentiment_dist) }
+      handlers.onReport(result!)
+    } else if (event === 'section' && result) {
+      result = { ...result, analysis: { ...result.analysis, [data.key]: data.value } }
+      handlers.onSection(data.key, data.value)
+    } else if (event === 'done' && result) {
+      result = { ...result, analysis: data.analysis, meta: { ...result.meta, cached: data.cached } }
+    } else if (event === 'error') {
+      throw new Error(data.detail)
+    }
+  }
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      const data: string[] = []
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data.push(line.slice(5).trimStart())
+      }
+      if (data.length) dispatch(event, JSON.parse(data.join('\n')))
+    }
+  }
+
+  if (!result) throw new Error('분석 결과를 받지 못했습니다.')
+  return result
+}
@@ -8,6 +8,7 @@ import AnalysisForm from './components/AnalysisForm'
 import LoadingSpinner from './components/LoadingSpinner'
 import ReportView from './components/ReportView'
 import { AnalysisResult, PrepareData } from './types'
+import { streamAnalyze, StreamHttpError } from './lib/analyzeStream'
 
 export default function Home() {
   const [apiKey, setApiKey] = useState('')
@@ -18,6 +19,9 @@ export default function Home() {
   const [selectedMonth, setSelectedMonth] = useState('')
   const [loading, setLoading] = useState(false)
   const [result, setResult] = useState<AnalysisResult | null>(null)
+  const [streaming, setStreaming] = useState(false)
+  // 빠른 리포트: AI 호출 없이 로컬 키워드/감성 분석만 (API 키 불필요)
+  const [fastReport, setFastReport] = useState(false)
 
   // Load API key from localStorage
   useEffect(() => {
@@ -47,9 +51,12 @@ export default function Home() {
           'Content-Type': 'multipart/form-data'
         }
       })
-      setPrepData(res.data)
-      setSelectedFranchise(res.data.franchises[0])
-      setSelectedMonth(res.data.months[0])
+      const data: PrepareData = res.data
+      setPrepData(data)
+      setSelectedFranchise(data.franchises[0])
+      // 첫 가맹점에 데이터가 있는 가장 최근 월을 기본 선택
+      const available = data.index?.filter(entry => entry.franchise === data.franchises[0]).map(entry => entry.month)
+      setSelectedMonth(data.months.find(m => !available || available.includes(m)) ?? data.months[0])
     } catch (err: any) {
       const errorMsg = err.response?.data?.error || err.message
       alert(`파일 준비 중 오류가 발생했습니다: ${errorMsg}`)
@@ -57,7 +64,7 @@ export default function Home() {
   }
 
   const handleAnalyze = async () => {
-    if (!apiKey) {
+    if (!apiKey && !fastReport) {
       alert("API 키를 입력해주세요.")
       return
     }
@@ -69,24 +76,69 @@ export default function Home() {
 
     setLoading(true)
 
-    const formData = new FormData()
-    formData.append('file', file)
-    formData.append('franchise', selectedFranchise)
-    formData.append('month', selectedMonth)
-    formData.append('api_key', apiKey)
-    formData.append('model', selectedModel)
+    // dataset_id 가 서버 캐시에 있으면 파일 업로드 없이 분석하고, 만료(410) 시에만 파일을 다시 보냄
+    const buildFormData = (withFile: boolean) => {
+      const formData = new FormData()
+      if (withFile) formData.append('file', file)
+      if (prepData?.dataset_id) formData.append('dataset_id', prepData.dataset_id)
+      formData.append('franchise', selectedFranchise)
+      formData.append('month', selectedMonth)
+      formData.append('api_key', apiKey)
+      formData.append('model', selectedModel)
+      if (fastReport) formData.append('mode', 'fast')
+      return formData
+    }
 
-    try {
-      const res = await axios.post('/api/analyze', formData, {
+    const postAnalyze = (withFile: boolean) =>
+      axios.post('/api/analyze', buildFormData(withFile), {
         headers: {
           'Content-Type': 'multipart/form-data'
         }
       })
+
+    // SSE 로 통계를 먼저 보여주고 AI 섹션은 도착하는 대로 채움
+    const analyzeStreaming = (withFile: boolean) =>
+      streamAnalyze(buildFormData(withFile), {
+        onReport: (partial) => {
+          setResult(partial)
+          setStreaming(true)
+          setLoading(false)
+        },
+        onSection: (key, value) => {
+          setResult(prev => prev && { ...prev, analysis: { ...prev.analysis, [key]: value } })
+        },
+      })
+
+    try {
+      try {
+        let final
+        try {
+          final = await analyzeStreaming(!prepData?.dataset_id)
+        } catch (err) {
+          if (!(err instanceof StreamHttpError && err.status === 410)) throw err
+          final = await analyzeStreaming(true)
+        }
+        setResult(final)
+        return
+      } catch (err) {
+        // 스트리밍을 지원하지 않는 배포(서버리스) 또는 스트림 시작 전 오류는 기존 방식으로 재시도
+        if (!(err instanceof StreamHttpError)) throw err
+      }
+
+      let res
+      try {
+        res = await postAnalyze(!prepData?.dataset_id)
+      } catch (err: any) {
+        if (err.response?.status !== 410) throw err
+        res = await postAnalyze(true)
+      }
       setResult(res.data)
     } catch (err: any) {
       const errorMsg = err.response?.data?.error || err.message
       alert("분석 중 오류가 발생했습니다: " + errorMsg)
+      setResult(null)
     } finally {
+      setStreaming(false)
       setLoading(false)
     }
   }
@@ -150,6 +202,8 @@ export default function Home() {
                     setSelectedFranchise={setSelectedFranchise}
                     selectedMonth={selectedMonth}
                     setSelectedMonth={setSelectedMonth}
+                    fastReport={fastReport}
+                    setFastReport={setFastReport}
                     onAnalyze={handleAnalyze}
                   />
                 )}
@@ -157,7 +211,7 @@ export default function Home() {
             </div>
           </div>
         ) : (
-          <ReportView result={result} />
+          <ReportView result={result} streaming={streaming} />
         )}
       </main>
     </div>
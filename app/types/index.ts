@@ -46,12 +46,47 @@ export interface AnalysisResult {
   meta: {
     franchise: string
     month: string
+    cached?: boolean
+    dedup?: {
+      comments: number
+      boilerplate: number
+      unique: number
+      clusters: number
+      selected: number
+      original_tokens: number
+      prompt_tokens: number
+      saved_tokens: number
+    }
+    // llm: 리뷰 원문, digest: 로컬 분석 요약 + 일부 리뷰, fast: AI 호출 없음
+    mode?: ReportMode
   }
 }
 
+export type ReportMode = 'llm' | 'digest' | 'fast'
+
+export interface GroupIndexEntry {
+  franchise: string
+  month: string
+  count: number
+  rating_avg: number | null
+  negative: number
+  offset: number
+}
+
+export interface UploadDelta {
+  // 리뷰 저장소 대비 월별 새 리뷰 / 바뀐 리뷰 수 (변경 없는 월은 빠짐)
+  months: Record<string, { new: number; changed: number }>
+  ingested_at: number
+}
+
 export interface PrepareData {
   franchises: string[]
   months: string[]
   mapping: Record<string, string>
+  dataset_id: string
+  // 데이터가 있는 가맹점 × 월 조합 (이전 서버 응답에는 없을 수 있음)
+  index?: GroupIndexEntry[]
+  // 리뷰 저장소가 꺼져 있으면 null
+  delta?: UploadDelta | null
 }
 
@@ -0,0 +1,73 @@
+"""엑셀 파싱 vs 컬럼형 사이드카 로드 시간 비교
+
+샘플 워크북(11월 댓글.xlsx)을 지정한 행 수(기본 100,000)로 복제한 뒤
+- 스트리밍 파싱 + 정규화 (parse_workbook, /api/prepare 와 같은 excel_ingest 청크 경로)
+- Arrow IPC 사이드카 memory-map 로드 (전체 컬럼 / franchise+date 만)
+의 소요 시간을 측정한다.
+
+사용법: python benchmarks/bench_columnar.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from analyzer import CommentAnalyzer
+from columnar_store import ColumnarStore
+from dataset_cache import compute_dataset_id, parse_workbook
+
+SAMPLE = os.path.join(ROOT, "11월 댓글.xlsx")
+
+
+def build_workbook(rows: int, path: str) -> None:
+    sample = pd.read_excel(SAMPLE)
+    reps = -(-rows // len(sample))
+    pd.concat([sample] * reps, ignore_index=True).head(rows).to_excel(path, index=False)
+
+
+def timed(fn, repeat: int = 3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-columnar-")
+    xlsx_path = os.path.join(workdir, f"reviews_{args.rows}.xlsx")
+    print(f"워크북 생성 중 ({args.rows:,} rows) ...")
+    build_workbook(args.rows, xlsx_path)
+    with open(xlsx_path, "rb") as f:
+        contents = f.read()
+
+    identify = CommentAnalyzer("").identify_columns
+    t_xlsx, (df, mapping, columns) = timed(lambda: parse_workbook(contents, identify), repeat=1)
+
+    store = ColumnarStore(workdir)
+    dataset_id = compute_dataset_id(contents)
+    store.write(dataset_id, df, mapping, columns)
+    t_full, _ = timed(lambda: store.read(dataset_id))
+    t_proj, _ = timed(lambda: store.read(dataset_id, columns=["franchise", "date"]))
+
+    print(f"xlsx 크기            : {len(contents) / 1e6:.1f} MB")
+    print(f"사이드카 크기        : {os.path.getsize(store.path_for(dataset_id)) / 1e6:.1f} MB")
+    print(f"스트리밍 파싱+정규화 : {t_xlsx * 1000:9.1f} ms")
+    print(f"사이드카 (전체 컬럼) : {t_full * 1000:9.1f} ms  ({t_xlsx / t_full:,.0f}x)")
+    print(f"사이드카 (2개 컬럼)  : {t_proj * 1000:9.1f} ms  ({t_xlsx / t_proj:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""FastAPI 서버 동시 요청 처리량 / 이벤트 루프 응답성 부하 테스트
+
+스텁 OpenAI 서버(지연 --latency 초)를 띄우고 uvicorn 으로 analyzer:app 을 실행한 뒤
+/api/analyze 를 --concurrency 개 동시에 보내면서 헬스체크(/) 지연을 함께 측정한다.
+
+- blocking: 이전 동작 재현 (async 핸들러 안에서 동기 openai.OpenAI 호출)
+- async   : 키별 풀링된 AsyncOpenAI + pandas 작업 스레드풀 오프로드
+
+사용법: python benchmarks/bench_concurrency.py [--requests 20] [--concurrency 10] [--latency 1.0]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+import uvicorn
+
+from stub_openai import start_stub
+
+SAMPLE = os.path.join(ROOT, "11월 댓글.xlsx")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app) -> str:
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_load(base: str, dataset_id: str, targets, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, health = [], []
+    finished = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base, timeout=300) as client:
+        async def one(i: int):
+            franchise, month = targets[i % len(targets)]
+            async with semaphore:
+                start = time.perf_counter()
+                r = await client.post("/api/analyze", data={
+                    "dataset_id": dataset_id, "franchise": franchise, "month": month, "api_key": "sk-bench",
+                })
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not finished.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                health.append(time.perf_counter() - start)
+                await asyncio.sleep(0.1)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        finished.set()
+        await prober
+    return elapsed, latencies, health
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--mode", choices=["blocking", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    os.environ["OPENAI_BASE_URL"] = start_stub(args.latency)
+    import analyzer
+
+    async_impl = analyzer.CommentAnalyzer.analyze_comments_async
+
+    async def blocking_impl(self, client, comments, franchise, month, stats, model):
+        return self.analyze_comments(comments, franchise, month, stats, model)
+
+    base = start_server(analyzer.app)
+    with open(SAMPLE, "rb") as f:
+        prep = httpx.post(f"{base}/api/prepare", files={"file": ("sample.xlsx", f)}, timeout=120).json()
+    targets = [(fr, mo) for fr in prep["franchises"] for mo in prep["months"]]
+    stats = analyzer.CommentAnalyzer("").get_grouped_stats(
+        analyzer.dataset_cache.get(prep["dataset_id"]).df, "franchise", "date", "rating")
+    targets = [t for t in targets if t in stats]
+
+    modes = ["blocking", "async"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        analyzer.CommentAnalyzer.analyze_comments_async = blocking_impl if mode == "blocking" else async_impl
+        elapsed, latencies, health = asyncio.run(run_load(base, prep["dataset_id"], targets, args.requests, args.concurrency))
+        print(f"[{mode:8}] {args.requests} req / 동시 {args.concurrency} / LLM {args.latency}s")
+        print(f"  처리량        : {args.requests / elapsed:6.2f} req/s (총 {elapsed:.2f}s)")
+        print(f"  요청 p50/max  : {statistics.median(latencies):6.2f}s / {max(latencies):6.2f}s")
+        print(f"  헬스체크 max  : {max(health) * 1000:8.1f} ms ({len(health)}회)")
+
+
+if __name__ == "__main__":
+    main()
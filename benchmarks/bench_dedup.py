@@ -0,0 +1,59 @@
+"""리뷰 중복 제거(dedup.dedupe_frame) 처리 시간 / 토큰 절감 측정
+
+두 가지 데이터로 측정한다.
+- sample : 샘플 워크북을 --rows 행으로 복제 (완전 중복 위주)
+- unique : 상투 문구 조합으로 만든 서로 다른 리뷰 --rows 건 (유사 중복 위주, 최악의 경우)
+
+사용법: python benchmarks/bench_dedup.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from analyzer import CommentAnalyzer
+from dataset_cache import normalize_frame
+from dedup import dedupe_frame
+
+SAMPLE = os.path.join(ROOT, "11월 댓글.xlsx")
+PHRASES = ["맛있어요", "고기가 부드러워요", "직원이 친절해요", "가격이 비싸요", "대기가 길어요", "분위기 좋아요",
+           "재방문 의사 있어요", "양이 적어요", "깨끗해요", "주차가 불편해요", "很好吃", "服务很好", "环境不错", "有点贵", "👍", "😋"]
+
+
+def sample_frame(rows: int):
+    raw = pd.read_excel(SAMPLE)
+    df, columns = normalize_frame(raw, CommentAnalyzer("").identify_columns(raw))
+    return pd.concat([df] * (-(-rows // len(df))), ignore_index=True).head(rows), columns
+
+
+def unique_frame(rows: int):
+    rng = np.random.default_rng(0)
+    words = np.array(PHRASES)[rng.integers(0, len(PHRASES), (rows, 6))]
+    ko = pd.Series([" ".join(w) + f" {i}" for i, w in enumerate(words)])
+    df = pd.DataFrame({"comment_ko": ko, "comment_zh": "", "rating": rng.integers(1, 6, rows).astype(float)})
+    return df, {"comment": "comment_ko", "comment_ko": "comment_ko", "comment_zh": "comment_zh", "rating": "rating"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, (df, columns) in (("sample", sample_frame(args.rows)), ("unique", unique_frame(args.rows))):
+        dedupe_frame(df.head(1000), columns)
+        start = time.perf_counter()
+        _, info = dedupe_frame(df, columns)
+        elapsed = time.perf_counter() - start
+        print(f"[{name}] {args.rows:,} rows: {elapsed * 1000:.0f} ms")
+        print(f"  고유 {info['unique']:,} / 군집 {info['clusters']:,} / 선택 {info['selected']:,} / 상투 문구 {info['boilerplate']:,}")
+        print(f"  토큰 {info['original_tokens']:,} -> {info['prompt_tokens']:,} (절감 {info['saved_tokens']:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""엑셀 수집(ingestion) 시간 / 최대 메모리(RSS) 비교
+
+샘플 워크북(11월 댓글.xlsx)의 행을 반복해 지정한 행 수의 워크북을 만들고
+(댓글에는 행 번호를 붙여 공유 문자열이 실제 연간 내보내기처럼 행마다 달라지게 함)
+- legacy: 업로드 전체 bytes + pd.read_excel + 정규화 (이전 /api/prepare 경로)
+- memory: 스풀 파일 + 청크 스트리밍 파싱 + 메모리에서 이어 붙임 (pyarrow 미설치 시 경로)
+- stream: 스풀 파일 + 청크 스트리밍 파싱 + 사이드카에 청크 기록 후 memory-map (현재 경로)
+를 각각 별도 프로세스에서 실행해 소요 시간과 최대 RSS 를 측정한다.
+(stream 의 RSS 에는 memory-map 된 파일 페이지가 포함되며, 익명 메모리는 RssAnon 으로 따로 표시)
+
+사용법: python benchmarks/bench_ingest.py [--rows 100000,500000,1000000] [--legacy-max 500000]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE = os.path.join(ROOT, "11월 댓글.xlsx")
+COMMENT_HEADERS = ("댓글내용(한글)", "댓글내용(중국어)")
+
+
+def build_workbook(rows: int, path: str) -> None:
+    """openpyxl write_only 로 대용량 워크북 생성 (pandas to_excel 보다 메모리/시간이 적게 듦)"""
+    import openpyxl
+    import pandas as pd
+
+    sample = pd.read_excel(SAMPLE)
+    sample = sample.loc[:, ~sample.columns.astype(str).str.startswith("Unnamed")]
+    headers = list(sample.columns)
+    records = sample.astype(object).where(sample.notna(), None).values.tolist()
+    comment_pos = [i for i, h in enumerate(headers) if h in COMMENT_HEADERS]
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for i in range(rows):
+        row = list(records[i % len(records)])
+        for pos in comment_pos:
+            if row[pos] is not None:
+                row[pos] = f"{row[pos]} #{i}"
+        sheet.append(row)
+    workbook.save(path)
+
+
+def run_mode(mode: str, path: str) -> dict:
+    """자식 프로세스에서 실행 - 임포트 후 기준 RSS 와 파싱 후 최대 RSS 를 함께 기록"""
+    from analyzer import CommentAnalyzer
+    from columnar_store import ColumnarStore
+    from dataset_cache import DatasetCache, normalize_frame, parse_workbook_file
+
+    identify = CommentAnalyzer("").identify_columns
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "legacy":
+        import io
+        import pandas as pd
+        with open(path, "rb") as f:
+            contents = f.read()
+        raw = pd.read_excel(io.BytesIO(contents))
+        df, _ = normalize_frame(raw, identify(raw))
+    elif mode == "memory":
+        with open(path, "rb") as f:
+            df, _, _ = parse_workbook_file(f, identify)
+    else:
+        store_dir = tempfile.mkdtemp(prefix="bench-ingest-store-")
+        cache = DatasetCache(store=ColumnarStore(store_dir))
+        with open(path, "rb") as f:
+            df = cache.get_or_load_file(f, identify).df
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    status = dict(line.split(":", 1) for line in open("/proc/self/status") if line.startswith("RssAnon"))
+    if mode == "stream":
+        shutil.rmtree(store_dir, ignore_errors=True)
+    return {"rows": len(df), "seconds": round(elapsed, 2), "baseline_mb": round(baseline / 1024), "peak_mb": round(peak / 1024),
+            "anon_mb": round(int(status["RssAnon"].split()[0]) / 1024), "frame_mb": round(df.memory_usage(deep=True).sum() / 1024 / 1024)}
+
+
+def measure(mode: str, path: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, path], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="100000,500000,1000000")
+    parser.add_argument("--legacy-max", type=int, default=500_000, help="이보다 큰 워크북은 legacy 측정 생략")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(*args.child)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+    print(f"{'rows':>10} {'mode':>7} {'file MB':>8} {'sec':>8} {'peak RSS MB':>12} {'(+import)':>10} {'RssAnon MB':>11} {'frame MB':>9}")
+    for rows in (int(r) for r in args.rows.split(",")):
+        path = os.path.join(workdir, f"reviews_{rows}.xlsx")
+        build_workbook(rows, path)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        modes = ["stream", "memory"] + (["legacy"] if rows <= args.legacy_max else [])
+        for mode in modes:
+            r = measure(mode, path)
+            print(f"{rows:>10,} {mode:>7} {size_mb:>8.1f} {r['seconds']:>8.2f} {r['peak_mb']:>12,} {r['peak_mb'] - r['baseline_mb']:>10,} {r['anon_mb']:>11,} {r['frame_mb']:>9,}")
+        os.remove(path)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
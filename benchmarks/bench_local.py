@@ -0,0 +1,60 @@
+"""로컬 분석(키워드 TF-IDF + 감성 어휘) 소요 시간과 프롬프트 크기
+
+샘플 워크북(11월 댓글.xlsx)의 한글 댓글로 합성 데이터(기본 100,000행)를 만든 뒤
+- 체인 기준 키워드 빈도(KeywordBaseline) 계산
+- 10만 건 한 그룹의 local_digest (키워드 순위, 감성 점수)
+- fast_report (모델 호출 없음)
+의 소요 시간과, llm 모드(대표 리뷰 원문) 대비 digest 모드 프롬프트 토큰 수를 비교한다.
+
+사용법: python benchmarks/bench_local.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analyzer import CommentAnalyzer
+from bench_trend import COLUMNS, synthetic_frame
+from dedup import dedupe_frame
+from local_analysis import DIGEST_COMMENTS, KeywordBaseline, fast_report, local_digest
+from stats_engine import frame_stats
+from summarizer import LLM_CHUNK_TOKENS, estimate_tokens, sample_to_budget, LLM_TOKEN_BUDGET
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, 1, 1)
+    t_base, baseline = timed(lambda: KeywordBaseline.build(df[COLUMNS["comment"]]))
+    t_digest, digest = timed(lambda: local_digest(df, COLUMNS, baseline))
+    stats = frame_stats(df, COLUMNS["date"], COLUMNS["rating"])
+    t_fast, _ = timed(lambda: fast_report(stats, digest))
+
+    analyzer = CommentAnalyzer("")
+    comments, _ = dedupe_frame(df, COLUMNS)
+    llm_tokens = sum(estimate_tokens(f"- {c}") for c in sample_to_budget(comments, LLM_TOKEN_BUDGET))
+    digest_tokens = estimate_tokens(analyzer.build_prompt(comments[:DIGEST_COMMENTS], stats, digest))
+
+    print(f"{args.rows:,} 리뷰")
+    print(f"  체인 키워드 빈도 (1회)     : {t_base:6.2f} s")
+    print(f"  local_digest (키워드+감성) : {t_digest:6.2f} s")
+    print(f"  fast_report                : {t_fast * 1000:6.2f} ms")
+    print(f"  프롬프트 토큰 llm (map 입력): {llm_tokens:,} (map 호출 약 {max(1, llm_tokens // LLM_CHUNK_TOKENS)}회 + reduce)")
+    print(f"  프롬프트 토큰 digest       : {digest_tokens:,} (단일 호출)")
+    print(f"  키워드: {', '.join(k['tag'] for k in digest['keywords'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""엔트리 포인트별 콜드 스타트 - import 시간과 첫 요청 지연
+
+엔트리 포인트(Vercel 함수 api/prepare.py, api/analyze.py 와 FastAPI 앱 analyzer.py)마다
+새 파이썬 프로세스를 띄워 (캐시 디렉터리도 새로 만들어 디스크 캐시 없이)
+- 모듈 import 시간과 import 직후 로딩된 무거운 의존성(openai, openpyxl, httpx)
+- 첫 요청 / 같은 요청 두 번째(웜) 지연
+을 측정한다. 요청 본문은 샘플 워크북(11월 댓글.xlsx) 업로드, analyze 는 첫 가맹점/월 그룹.
+
+--mode fast(기본)는 모델을 부르지 않는다. digest/llm 은 스텁 OpenAI 서버(지연 --latency 초)를 쓴다.
+
+사용법: python benchmarks/bench_startup.py [--mode fast] [--latency 0.2]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = os.path.join(ROOT, "11월 댓글.xlsx")
+ENTRIES = ("api/prepare.py", "api/analyze.py", "analyzer.py")
+HEAVY = ("openai", "openpyxl", "httpx")
+
+
+def multipart(fields: dict, files: dict) -> tuple:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b"\r\n")
+    return b"".join(parts) + f"--{boundary}--\r\n".encode(), f"multipart/form-data; boundary={boundary}"
+
+
+def child(entry: str, fields: dict) -> dict:
+    """새 프로세스 안에서 실행 - import 후 같은 요청을 두 번 보냄"""
+    import importlib.util
+    import urllib.request
+    from http.server import HTTPServer
+
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("entry", os.path.join(ROOT, entry))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    import_s = time.perf_counter() - start
+    loaded = [name for name in HEAVY if name in sys.modules]
+
+    data = open(SAMPLE, "rb").read()
+    files = {"file": ("reviews.xlsx", data)}
+    if entry == "analyzer.py":
+        from fastapi.testclient import TestClient
+
+        client = TestClient(module.app)
+        path = "/api/analyze" if fields else "/api/prepare"
+
+        def request():
+            response = client.post(path, data=fields, files=files)
+            response.raise_for_status()
+    else:
+        server = HTTPServer(("127.0.0.1", 0), module.handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/"
+
+        def request():
+            body, content_type = multipart(fields, files)
+            req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+            with urllib.request.urlopen(req, timeout=120) as response:
+                response.read()
+
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        request()
+        timings.append(time.perf_counter() - start)
+    return {"import": import_s, "loaded": loaded, "first": timings[0], "warm": timings[1]}
+
+
+def run(entry: str, fields: dict, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(env, DATASET_CACHE_DIR=os.path.join(tmp, "datasets"), REVIEW_STORE_DIR=os.path.join(tmp, "store"),
+                   LLM_CACHE_PATH=os.path.join(tmp, "llm.sqlite3"))
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, __file__, "--child", entry, "--fields", json.dumps(fields)],
+                             env=env, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        result["process"] = time.perf_counter() - start
+        return result
+
+
+def first_group() -> tuple:
+    from dataset_cache import Dataset, parse_workbook
+    from report_core import CommentAnalyzer
+
+    df, mapping, columns = parse_workbook(open(SAMPLE, "rb").read(), CommentAnalyzer().identify_columns)
+    return Dataset("", df, mapping, columns).group_index.keys[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="fast", choices=("fast", "digest", "llm"))
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--child")
+    parser.add_argument("--fields", default="{}")
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(child(args.child, json.loads(args.fields))))
+        return
+
+    env = dict(os.environ)
+    if args.mode != "fast":
+        from stub_openai import start_stub
+
+        env["OPENAI_BASE_URL"] = start_stub(args.latency)
+    franchise, month = first_group()
+    analyze_fields = {"franchise": franchise, "month": month, "mode": args.mode, "api_key": "sk-bench"}
+
+    print(f"mode={args.mode} (첫 요청 = 새 프로세스, 빈 캐시 디렉터리)")
+    print(f"{'엔트리 포인트':<28}{'import':>9}{'첫 요청':>10}{'웜 요청':>10}{'프로세스':>10}  import 시 로딩")
+    for entry in ENTRIES:
+        cases = [("prepare", {}), ("analyze", analyze_fields)] if entry == "analyzer.py" else \
+            [("", analyze_fields if entry == "api/analyze.py" else {})]
+        for label, fields in cases:
+            r = run(entry, fields, env)
+            name = f"{entry} {label}".strip()
+            print(f"{name:<28}{r['import']:>8.3f}s{r['first']:>9.3f}s{r['warm']:>9.3f}s{r['process']:>9.2f}s  "
+                  f"{', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
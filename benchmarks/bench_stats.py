@@ -0,0 +1,95 @@
+"""그룹 통계: 그룹마다 get_basic_stats 호출 vs stats_engine 한 번에 계산
+
+합성 데이터(기본 1,000,000행, 가맹점 60개 × 24개월)를 메모리에서 만든 뒤
+- legacy: (가맹점, 월) groupby 로 그룹 프레임을 만들고 이전 get_basic_stats 를 그룹마다 호출
+- engine: compute_group_stats 한 번 (월), 롤업(전체 가맹점 월 / 분기 / 연도)
+의 소요 시간을 비교하고, 두 결과가 같은지 확인한다.
+
+사용법: python benchmarks/bench_stats.py [--rows 1000000] [--franchises 60] [--months 24]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import compute_group_stats
+
+
+def legacy_basic_stats(df: pd.DataFrame, date_col: str, rating_col: str):
+    """변경 전 CommentAnalyzer.get_basic_stats / calculate_sentiment_dist"""
+    try:
+        df[date_col] = pd.to_datetime(df[date_col])
+        total = len(df)
+        avg = round(df[rating_col].mean(), 2)
+        days = (df[date_col].max() - df[date_col].min()).days + 1
+        daily = round(total / days, 1) if days > 0 else total
+        top_dates = [{"date": str(d), "count": int(c)} for d, c in df[date_col].dt.date.value_counts().head(3).items()]
+        pos = len(df[df[rating_col] >= 4.0])
+        neg = len(df[df[rating_col] <= 3.0])
+        neu = total - pos - neg
+        return {
+            "total_comments": total,
+            "rating_avg": avg,
+            "daily_avg": daily,
+            "top_dates": top_dates,
+            "sentiment_dist": {
+                "positive": round((pos/total)*100, 1),
+                "neutral": round((neu/total)*100, 1),
+                "negative": round((neg/total)*100, 1)
+            }
+        }
+    except:
+        return {"total_comments": len(df), "rating_avg": 0, "daily_avg": 0, "top_dates": [], "sentiment_dist": {"positive": 0, "neutral": 0, "negative": 0}}
+
+
+def synthetic_frame(rows: int, franchises: int, months: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, months * 30 * 86400, rows)
+    return pd.DataFrame({
+        "franchise": pd.Series(rng.choice([f"가맹점_{i:03d}" for i in range(franchises)], rows)).astype(str),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(seconds), unit="s"),
+        "rating": rng.choice([1.0, 2.0, 3.0, 4.0, 4.5, 5.0, np.nan], rows, p=[.04, .04, .07, .15, .2, .49, .01]),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--franchises", type=int, default=60)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.franchises, args.months)
+
+    def legacy():
+        month = df["date"].dt.strftime("%Y-%m")
+        return {key: legacy_basic_stats(group.copy(), "date", "rating")
+                for key, group in df.groupby([df["franchise"], month], sort=True)}
+
+    t_legacy, expected = timed(legacy)
+    t_engine, result = timed(lambda: compute_group_stats(df, "franchise", "date", "rating"))
+    print(f"{args.rows:,} rows, {len(result):,} (가맹점, 월) 그룹")
+    print(f"  legacy get_basic_stats x 그룹 : {t_legacy:7.2f} s")
+    print(f"  stats_engine (월)             : {t_engine:7.2f} s  ({t_legacy / t_engine:.0f}x)")
+    print(f"  결과 일치                     : {result == expected}")
+
+    for period, by_franchise in (("month", False), ("quarter", True), ("quarter", False), ("year", True), ("year", False)):
+        elapsed, rolled = timed(lambda: compute_group_stats(df, "franchise", "date", "rating", period, by_franchise))
+        scope = "가맹점별" if by_franchise else "전체"
+        print(f"  롤업 {period:<7} {scope:<4} ({len(rolled):>4} 그룹): {elapsed:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
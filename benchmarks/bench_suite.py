@@ -0,0 +1,304 @@
+"""재현 가능한 성능 기준선 - 합성 워크북으로 단계별 + 엔드투엔드 측정, JSON 으로 저장/비교
+
+크기(--rows)마다 workbook_gen 으로 같은 seed 의 워크북을 만들고, 새 프로세스(빈 임시 캐시 디렉터리)에서
+1) 단계별 (HTTP 없이, --repeat 회)
+   parse(엑셀 -> 정규화 프레임) / sidecar_write / sidecar_read / index / keyword_baseline
+   그룹별 select_group 의 filter / stats / dedup / local (가맹점 × 월 그룹 전체, timing span)
+2) 엔드투엔드 (ASGI 로 analyzer:app 직접 호출 - 소켓/uvicorn 제외)
+   /api/prepare: 첫 요청(cold - 파싱/사이드카/저장소 반영) + 같은 파일 재업로드(warm - 해시 후 캐시 적중) --repeat 회
+   /api/analyze: 첫 요청(first_ms)을 보낸 뒤 서로 다른 그룹 --requests 건을 동시 --concurrency 로
+                 (AI 캐시는 모두 미스, 스텁 OpenAI 지연 --latency)
+   응답의 Server-Timing 헤더로 요청 안의 단계별 분포도 함께 집계
+3) 최대 RSS (프로세스 전체) / import 직후 RSS
+를 p50/p99/처리량으로 요약한다. --out 으로 JSON 기준선을 저장하고, --compare 로 이전 기준선과 비교해
+--threshold(기본 20%, 1 ms/1 MB 미만 차이는 제외) 넘게 느려지거나 메모리가 늘어난 항목이 있으면 종료 코드 1.
+
+사용법: python benchmarks/bench_suite.py [--rows 10000 100000] [--latency 0.2] [--requests 30]
+                                         [--out baseline.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from workbook_gen import generate_workbook
+
+
+def summarize(values_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(values_ms, dtype=float)
+    return {
+        "n": int(values.size),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    spans = {}
+    for entry in header.split(","):
+        name, _, rest = entry.strip().partition(";")
+        for param in rest.split(";"):
+            if param.startswith("dur="):
+                spans[name] = float(param[4:])
+    return spans
+
+
+def repeat_ms(fn, repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def rss_mb() -> float:
+    # 리눅스 ru_maxrss 는 KB
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def stage_benchmarks(path: str, repeat: int) -> Dict[str, Any]:
+    from columnar_store import columnar_store
+    from dataset_cache import Dataset, parse_workbook_file
+    from group_index import GroupIndex
+    from local_analysis import KeywordBaseline
+    from report_core import CommentAnalyzer
+    from timing import RequestTimer
+    import analyzer
+
+    identify = CommentAnalyzer("").identify_columns
+    result: Dict[str, List[float]] = {}
+    loaded = {}
+
+    def parse():
+        with open(path, "rb") as f:
+            loaded["frame"] = parse_workbook_file(f, identify)
+
+    result["parse"] = repeat_ms(parse, repeat)
+    df, mapping, columns = loaded["frame"]
+    result["sidecar_write"] = repeat_ms(lambda: columnar_store.write("bench", df, mapping, columns), repeat)
+    result["sidecar_read"] = repeat_ms(lambda: columnar_store.read("bench"), repeat)
+    result["index"] = repeat_ms(lambda: GroupIndex.build(df, columns), repeat)
+    result["keyword_baseline"] = repeat_ms(lambda: KeywordBaseline.build(df[columns["comment"]]), repeat)
+
+    # 그룹별 단계 - 요청 하나처럼 timer 를 켜고 select_group 의 span 을 모은다
+    dataset = Dataset("bench", df, mapping, columns)
+    for franchise, month in dataset.group_index.keys:
+        timer = RequestTimer("bench")
+        with timer.activate():
+            analyzer.select_group(analyzer.CommentAnalyzer(""), dataset, franchise, month, "digest")
+        for name, ms in timer.spans.items():
+            result.setdefault(name, []).append(ms)
+
+    stages = {name: summarize(times) for name, times in result.items()}
+    stages["parse"]["rows_per_s"] = round(len(df) / (stages["parse"]["p50_ms"] / 1000))
+    return stages
+
+
+async def endpoint_benchmarks(path: str, repeat: int, requests: int, concurrency: int, mode: str,
+                              seed: int) -> Dict[str, Any]:
+    import httpx
+
+    import analyzer
+
+    with open(path, "rb") as f:
+        contents = f.read()
+    transport = httpx.ASGITransport(app=analyzer.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        prepare_ms = []
+        prep = None
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            r = await client.post("/api/prepare", files={"file": ("reviews.xlsx", contents)})
+            r.raise_for_status()
+            prepare_ms.append((time.perf_counter() - start) * 1000)
+            prep = prep or r.json()
+
+        groups = [(g["franchise"], g["month"]) for g in prep["index"]]
+        order = np.random.default_rng(seed).permutation(len(groups))
+        targets = [groups[i] for i in order[:min(requests, len(groups) - 1)]]
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        stages: Dict[str, List[float]] = {}
+
+        async def post(franchise: str, month: str) -> httpx.Response:
+            r = await client.post("/api/analyze", data={
+                "dataset_id": prep["dataset_id"], "franchise": franchise, "month": month,
+                "api_key": "sk-bench", "mode": mode,
+            })
+            r.raise_for_status()
+            return r
+
+        async def one(franchise: str, month: str):
+            async with semaphore:
+                start = time.perf_counter()
+                r = await post(franchise, month)
+                latencies.append((time.perf_counter() - start) * 1000)
+                for name, ms in parse_server_timing(r.headers["Server-Timing"]).items():
+                    stages.setdefault(name, []).append(ms)
+
+        # 첫 요청(openai 지연 import, 클라이언트 생성)은 따로 - 측정 대상 그룹과 겹치지 않는 그룹으로
+        start = time.perf_counter()
+        await post(*groups[order[-1]])
+        first_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        await asyncio.gather(*(one(*t) for t in targets))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "prepare": {"cold_ms": round(prepare_ms[0], 2), "warm": summarize(prepare_ms[1:])},
+        "analyze": dict(summarize(latencies), first_ms=round(first_ms, 2), requests=len(latencies),
+                        concurrency=concurrency, mode=mode,
+                        throughput_rps=round(len(latencies) / elapsed, 2),
+                        stages={name: summarize(times) for name, times in stages.items()}),
+    }
+
+
+def child(path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from stub_openai import start_stub
+
+    os.environ["OPENAI_BASE_URL"] = start_stub(args.latency)
+    # 앱 import 비용(RSS)을 재기 위해 여기서 먼저 불러온다 - 모듈 객체는 쓰지 않음
+    importlib.import_module("analyzer")
+
+    result = {"import_rss_mb": rss_mb()}
+    result["stages"] = stage_benchmarks(path, args.repeat)
+    result.update(asyncio.run(endpoint_benchmarks(path, args.repeat, args.requests, args.concurrency,
+                                                  args.mode, args.seed)))
+    result["peak_rss_mb"] = rss_mb()
+    return result
+
+
+def run_size(rows: int, args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    path = os.path.join(workdir, f"reviews-{rows}-{args.franchises}x{args.months}-{args.seed}.xlsx")
+    generated = None
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        generate_workbook(path, rows, args.franchises, args.months, seed=args.seed)
+        generated = round(time.perf_counter() - start, 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATASET_CACHE_DIR=os.path.join(tmp, "datasets"), REVIEW_STORE_DIR=os.path.join(tmp, "store"),
+                   LLM_CACHE_PATH=os.path.join(tmp, "llm.sqlite3"), REQUEST_LOG="0")
+        argv = [sys.executable, __file__, "--child", path] + [
+            f"--{name}={getattr(args, name)}" for name in ("latency", "repeat", "requests", "concurrency", "mode", "seed")]
+        out = subprocess.run(argv, capture_output=True, text=True, check=True, env=env)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return dict({"rows": rows, "workbook_bytes": os.path.getsize(path), "generate_s": generated}, **result)
+
+
+def flatten(entry: Dict[str, Any]) -> Dict[str, float]:
+    """비교할 지표 (클수록 나쁜 값) - 처리량은 역수 대신 부호를 바꿔 같은 규칙으로 비교"""
+    flat = {
+        "prepare.cold_ms": entry["prepare"]["cold_ms"],
+        "prepare.warm.p50_ms": entry["prepare"]["warm"]["p50_ms"],
+        "analyze.p50_ms": entry["analyze"]["p50_ms"],
+        "analyze.p99_ms": entry["analyze"]["p99_ms"],
+        "analyze.throughput_rps": -entry["analyze"]["throughput_rps"],
+        "peak_rss_mb": entry["peak_rss_mb"],
+    }
+    for name, stage in entry["stages"].items():
+        flat[f"stages.{name}.p50_ms"] = stage["p50_ms"]
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """크기별 지표 변화율 출력 - threshold 를 넘는 악화가 하나라도 있으면 False"""
+    ok = True
+    previous = {entry["rows"]: entry for entry in baseline["sizes"]}
+    for entry in current["sizes"]:
+        if entry["rows"] not in previous:
+            continue
+        print(f"\n[{entry['rows']:,}행] 기준선 대비")
+        before = flatten(previous[entry["rows"]])
+        for name, value in flatten(entry).items():
+            old = before.get(name)
+            if not old:
+                continue
+            change = (value - old) / abs(old)
+            # 1 ms(1 MB) 미만의 차이는 측정 잡음으로 본다
+            regressed = change > threshold and abs(value - old) >= 1.0
+            ok = ok and not regressed
+            print(f"  {name:<32}{abs(old):>12.2f}{abs(value):>12.2f}{change:>+9.1%}{'  <- 악화' if regressed else ''}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--franchises", type=int, default=30)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mode", choices=["llm", "digest", "fast"], default="digest")
+    parser.add_argument("--workdir", help="생성한 워크북을 보관/재사용할 디렉터리 (기본: 임시)")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--child")
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(child(args.child, args)))
+        return
+
+    import pandas as pd
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {name: getattr(args, name) for name in
+                   ("franchises", "months", "seed", "latency", "repeat", "requests", "concurrency", "mode")},
+        "sizes": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        for rows in args.rows:
+            entry = run_size(rows, args, workdir)
+            report["sizes"].append(entry)
+            prepare, analyze = entry["prepare"], entry["analyze"]
+            print(f"[{rows:,}행 / {entry['workbook_bytes'] / 2 ** 20:.1f} MB] 최대 RSS {entry['peak_rss_mb']:.0f} MB "
+                  f"(import 후 {entry['import_rss_mb']:.0f} MB)")
+            print(f"  prepare  cold {prepare['cold_ms']:>9.1f} ms   warm p50 {prepare['warm']['p50_ms']:>8.1f} ms")
+            print(f"  analyze  p50 {analyze['p50_ms']:>9.1f} ms   p99 {analyze['p99_ms']:>9.1f} ms   "
+                  f"{analyze['throughput_rps']:.2f} req/s ({analyze['requests']}건, 동시 {analyze['concurrency']}, {analyze['mode']}, "
+                  f"첫 요청 {analyze['first_ms']:.0f} ms)")
+            for name, stage in entry["stages"].items():
+                print(f"  {name:<17}p50 {stage['p50_ms']:>9.2f} ms   p99 {stage['p99_ms']:>9.2f} ms   (n={stage['n']})")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""추이 리포트: 월별 요약 사전 계산 vs 추이 조회 시간
+
+샘플 워크북(11월 댓글.xlsx)의 한글 댓글로 합성 데이터(기본 1,000,000행, 가맹점 60개 × 24개월)를 만든 뒤
+- month_summaries: 가맹점 × 월 / 전체 월 요약(통계 + 키워드) 한 번 계산
+- build_trend: 가맹점마다(와 전체) 24개월 MoM/YoY 추이 조회
+의 소요 시간을 측정한다.
+
+사용법: python benchmarks/bench_trend.py [--rows 1000000] [--franchises 60] [--months 24]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import ALL_FRANCHISES
+from trend import build_trend, month_summaries
+
+SAMPLE = os.path.join(ROOT, "11월 댓글.xlsx")
+COLUMNS = {"franchise": "franchise", "date": "date", "rating": "rating", "comment": "comment_ko"}
+
+
+def synthetic_frame(rows: int, franchises: int, months: int, seed: int = 7) -> pd.DataFrame:
+    comments = pd.read_excel(SAMPLE)["댓글내용(한글)"].dropna().astype(str).to_numpy()
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, months * 30 * 86400, rows)
+    return pd.DataFrame({
+        "franchise": pd.Series(rng.choice([f"가맹점_{i:03d}" for i in range(franchises)], rows)).astype(str),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(seconds), unit="s"),
+        "rating": rng.choice([1.0, 2.0, 3.0, 4.0, 4.5, 5.0], rows, p=[.04, .04, .07, .15, .2, .5]),
+        "comment_ko": pd.Series(rng.choice(comments, rows)).astype("string"),
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--franchises", type=int, default=60)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.franchises, args.months)
+    start = time.perf_counter()
+    summaries = month_summaries(df, COLUMNS)
+    precompute = time.perf_counter() - start
+
+    targets = sorted(df["franchise"].unique()) + [ALL_FRANCHISES]
+    start = time.perf_counter()
+    for franchise in targets:
+        build_trend(summaries, franchise, args.months)
+    query = (time.perf_counter() - start) / len(targets)
+
+    print(f"{args.rows:,} rows, {len(summaries)}개월 × {len(targets) - 1}개 가맹점")
+    print(f"  월별 요약 사전 계산 (1회)   : {precompute:7.2f} s")
+    print(f"  추이 조회 (가맹점당 평균)   : {query * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
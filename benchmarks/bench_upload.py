@@ -0,0 +1,101 @@
+"""서버리스 함수 업로드 파싱 - cgi.FieldStorage 대 스트리밍 파서(multipart_form)
+
+5 MB / 50 MB 파일 파트(압축된 xlsx 와 비슷한 무작위 바이트)와 일반 필드 몇 개로 multipart 본문을 만들고,
+케이스마다 새 프로세스에서 본문을 소켓처럼 읽으며
+- 파싱 시간과 파싱 후 파일 객체를 dataset_cache 처럼 블록 단위로 해시하는 시간
+- tracemalloc 최대 할당량 / 최대 RSS 증가량
+을 측정한다. (파일 파트 이후 단계 - 엑셀 파싱 - 는 두 방식이 같으므로 제외)
+
+사용법: python benchmarks/bench_upload.py [--sizes 5 50]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+import warnings
+from email.message import Message
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIELDS = {"franchise": "리정원_공덕", "month": "2025-11", "mode": "fast"}
+
+
+def write_body(path: str, size_mb: int) -> str:
+    boundary = uuid.uuid4().hex
+    with open(path, "wb") as f:
+        for name, value in FIELDS.items():
+            f.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        f.write(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="reviews.xlsx"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+        remaining = size_mb * 1024 * 1024
+        while remaining:
+            block = os.urandom(min(remaining, 1 << 20))
+            f.write(block)
+            remaining -= len(block)
+        f.write(f"\r\n--{boundary}--\r\n".encode())
+    return f"multipart/form-data; boundary={boundary}"
+
+
+def child(method: str, path: str, content_type: str) -> dict:
+    from dataset_cache import compute_dataset_id_file
+
+    # BaseHTTPRequestHandler.headers 와 같은 (대소문자 무시) 헤더 객체
+    headers = Message()
+    headers["Content-Type"] = content_type
+    headers["Content-Length"] = str(os.path.getsize(path))
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(path, "rb") as rfile:
+        tracemalloc.start()
+        start = time.perf_counter()
+        if method == "cgi":
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                import cgi
+            form = cgi.FieldStorage(fp=rfile, headers=headers,
+                                    environ={"REQUEST_METHOD": "POST", "CONTENT_TYPE": content_type})
+            upload = form["file"].file
+        else:
+            from multipart_form import parse_form
+
+            form = parse_form(rfile, headers)
+            upload = form.file("file")
+        parsed = time.perf_counter() - start
+        compute_dataset_id_file(upload)
+        total = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    return {"parse": parsed, "total": total, "peak": peak, "rss": rss * 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--child", nargs=3)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return
+
+    print(f"{'업로드':>8} {'방식':<10}{'파싱':>9}{'파싱+해시':>11}{'최대 할당':>12}{'RSS 증가':>11}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "body.bin")
+            content_type = write_body(path, size)
+            for method in ("cgi", "streaming"):
+                out = subprocess.run([sys.executable, __file__, "--child", method, path, content_type],
+                                     capture_output=True, text=True, check=True)
+                r = json.loads(out.stdout.strip().splitlines()[-1])
+                print(f"{size:>6} MB {method:<10}{r['parse']:>8.3f}s{r['total']:>10.3f}s"
+                      f"{r['peak'] / 2 ** 20:>10.1f} MB{r['rss'] / 2 ** 20:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
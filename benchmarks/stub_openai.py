@@ -0,0 +1,100 @@
+"""로컬 OpenAI 호환 스텁 서버 (chat.completions 만 지원)
+
+지정한 지연 시간 후 고정된 리포트 JSON 을 반환한다.
+stream=true 요청은 지연 시간을 청크에 나눠 SSE(data: ...) 로 조금씩 보낸다. (stream_options.include_usage 면 마지막에 usage 청크)
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 로 지정해 실제 과금/네트워크 없이 측정한다.
+
+사용법: python benchmarks/stub_openai.py [--port 8900] [--latency 2.0]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPORT = {
+    "summary": "전반적으로 맛과 서비스에 대한 만족도가 높습니다.",
+    "insight": "재방문 의사를 밝힌 리뷰가 많습니다.",
+    "sentiment": {"positive": 80, "neutral": 15, "negative": 5},
+    "pros": [{"title": "맛", "content": "고기 품질에 대한 칭찬이 많습니다."}],
+    "cons": [{"title": "대기", "content": "주말 대기 시간이 길다는 의견이 있습니다."}],
+    "keywords": [{"tag": "맛있어요", "is_positive": True, "desc": "음식 맛에 대한 긍정 평가가 많음"}],
+    "action_plan": ["주말 예약제 도입 검토"],
+}
+
+
+def make_handler(latency: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+            content = json.dumps(REPORT, ensure_ascii=False)
+            if body.get("stream"):
+                self._stream(body, content)
+                return
+            time.sleep(latency)
+            payload = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2, "total_tokens": (len(prompt) + len(content)) // 2},
+            }
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, body, content, pieces: int = 20):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            step = max(1, -(-len(content) // pieces))
+            for i in range(0, len(content), step):
+                time.sleep(latency / pieces)
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            if (body.get("stream_options") or {}).get("include_usage"):
+                prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+                usage = {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2,
+                         "total_tokens": (len(prompt) + len(content)) // 2}
+                chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": body.get("model", "stub"), "choices": [], "usage": usage}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(latency: float, port: int = 0) -> str:
+    """백그라운드 스레드로 스텁 서버를 띄우고 base_url 반환"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=2.0)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency))
+    print(f"stub OpenAI: http://127.0.0.1:{args.port}/v1 (latency {args.latency}s)")
+    server.serve_forever()
@@ -0,0 +1,113 @@
+"""합성 리뷰 워크북 생성기 (재현 가능 - 같은 seed 면 같은 파일)
+
+identify_columns 가 기대하는 샘플 내보내기(11월 댓글.xlsx)와 같은 헤더/형식으로 쓴다.
+- 가맹점 이름 : 브랜드_지역 조합 --franchises 개
+- 날짜        : 'YYYY.MM.DD HH:MM:SS' 문자열, --end 월까지 --months 개월에 고르게 (최신순 정렬)
+- 별점        : 1~5 (긍정 편향 분포)
+- 댓글/답글   : 별점에 맞는 한글/중국어 문장 쌍을 1~3개 이어 붙임 + 메뉴 언급,
+                일부는 "맛있어요!" 같은 짧은 상투 리뷰 (중복 제거/키워드/감성 단계가 실제처럼 동작하도록)
+샘플 파일 없이 만들 수 있으므로 벤치마크 결과가 데이터 파일에 의존하지 않는다.
+
+사용법: python benchmarks/workbook_gen.py out.xlsx [--rows 100000] [--franchises 30] [--months 12] [--seed 7]
+"""
+import argparse
+from typing import List, Tuple
+
+import numpy as np
+
+HEADERS = ["가맹점 이름 ", "날짜", "별점", "게시자", "댓글내용(중국어)", "답글내용(중국어)", "댓글내용(한글)", "답글내용(한글)",
+           "답글완성여부"]
+BRANDS = ("리정원", "봉산정육", "한우마을", "고기굽는집", "숯불명가")
+AREAS = ("공덕", "신촌", "강남", "홍대", "명동", "잠실", "성수", "여의도", "종로", "이태원")
+RATINGS = (1.0, 2.0, 3.0, 4.0, 5.0)
+RATING_P = (0.04, 0.04, 0.07, 0.3, 0.55)
+# (한글, 중국어)
+POSITIVE = (
+    ("고기가 정말 부드럽고 맛있어요", "肉很嫩很好吃"),
+    ("직원분들이 친절하게 구워주셨어요", "服务员很热情，帮忙烤肉"),
+    ("매장이 깨끗하고 분위기가 좋아요", "环境干净，氛围很好"),
+    ("가성비가 좋아서 또 올 거예요", "性价比很高，还会再来"),
+    ("반찬이 신선하고 맛있었습니다", "小菜很新鲜很好吃"),
+    ("한국 친구가 추천해줘서 왔는데 최고예요", "韩国朋友推荐的，真的很棒"),
+    ("서비스가 빠르고 만족스러웠어요", "上菜很快，很满意"),
+    ("숙성 고기라 향이 좋아요", "熟成肉很香"),
+)
+NEGATIVE = (
+    ("대기 시간이 너무 길었어요", "等位时间太长了"),
+    ("가격이 좀 비싸요", "价格有点贵"),
+    ("직원이 불친절했어요", "服务员态度不好"),
+    ("고기가 질기고 별로였어요", "肉很老，不好吃"),
+    ("매장이 시끄럽고 좁아요", "店里很吵，很挤"),
+    ("음식이 너무 짜요", "菜太咸了"),
+    ("주문이 늦게 나와서 실망했어요", "上菜太慢，很失望"),
+)
+NEUTRAL = (
+    ("그럭저럭 괜찮았어요", "还可以"),
+    ("평범한 맛이에요", "味道一般"),
+    ("무난했습니다", "还行"),
+)
+SHORT = (("맛있어요!", "好吃！"), ("최고", "很棒"), ("👍", "👍"), ("추천합니다", "推荐"))
+MENUS = (("삼겹살", "五花肉"), ("오겹살", "五层肉"), ("한우", "韩牛"), ("냉면", "冷面"), ("된장찌개", "大酱汤"),
+         ("갈비", "排骨"), ("항정살", "猪颈肉"))
+REPLY = ("방문해주셔서 진심으로 감사드립니다! 남겨주신 소중한 의견을 바탕으로 더 나은 서비스를 준비하겠습니다. 다시 뵙기를 바랍니다.",
+         "非常感谢您的光临！我们会根据您宝贵的意见提供更好的服务，期待您再次光临。")
+
+
+def franchise_names(count: int) -> List[str]:
+    names = [f"{brand}_{area}" for brand in BRANDS for area in AREAS]
+    return [names[i] if i < len(names) else f"{names[i % len(names)]}{i // len(names) + 1}" for i in range(count)]
+
+
+def _comment(rng: np.random.Generator, rating: float) -> Tuple[str, str]:
+    if rng.random() < 0.15:
+        return SHORT[rng.integers(len(SHORT))]
+    pool = POSITIVE if rating >= 4 else NEGATIVE if rating <= 2 else NEUTRAL + NEGATIVE[:2] + POSITIVE[:2]
+    picks = rng.choice(len(pool), size=min(len(pool), int(rng.integers(1, 4))), replace=False)
+    ko, zh = [pool[i][0] for i in picks], [pool[i][1] for i in picks]
+    if rng.random() < 0.5:
+        menu_ko, menu_zh = MENUS[rng.integers(len(MENUS))]
+        ko.append(f"{menu_ko} {'추천해요' if rating >= 4 else '먹었어요'}")
+        zh.append(f"{'推荐' if rating >= 4 else '吃了'}{menu_zh}")
+    return ". ".join(ko) + ".", "，".join(zh) + "。"
+
+
+def generate_workbook(path: str, rows: int, franchises: int = 30, months: int = 12, end: str = "2025-12",
+                      seed: int = 7) -> None:
+    """openpyxl write_only 로 rows 행 워크북 작성 (대용량도 메모리 일정)"""
+    import openpyxl
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    names = franchise_names(franchises)
+    end_ts = pd.Period(end, freq="M").end_time.floor("s")
+    start_ts = (pd.Period(end, freq="M") - (months - 1)).start_time
+    seconds = np.sort(rng.integers(0, int((end_ts - start_ts).total_seconds()), rows))[::-1]
+    dates = (start_ts + pd.to_timedelta(seconds, unit="s")).strftime("%Y.%m.%d %H:%M:%S")
+    shops = rng.integers(0, franchises, rows)
+    ratings = rng.choice(RATINGS, rows, p=RATING_P)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADERS)
+    for i in range(rows):
+        ko, zh = _comment(rng, ratings[i])
+        sheet.append([names[shops[i]], dates[i], float(ratings[i]), f"user_{int(rng.integers(100000)):05d}",
+                      zh, REPLY[1], ko, REPLY[0], "완료"])
+    workbook.save(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--franchises", type=int, default=30)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--end", default="2025-12")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    generate_workbook(args.path, args.rows, args.franchises, args.months, args.end, args.seed)
+    print(f"{args.path}: {args.rows:,}행, 가맹점 {args.franchises}개, {args.months}개월")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""파싱된 리뷰 데이터의 컬럼형(Arrow IPC / Feather v2) 디스크 사이드카
+
+openpyxl 파싱 결과(정규화된 franchise/date/rating/comment_* 스키마)를
+dataset_id 별 파일로 한 번 기록해 두고, 이후 요청(서버리스 콜드 스타트 포함)은
+엑셀을 다시 파싱하지 않고 memory-map 으로 읽는다. (columns= 로 일부 컬럼만 읽을 수도 있음)
+텍스트 컬럼은 string[pyarrow] 로 변환해 Arrow 버퍼(파일 페이지)를 그대로 쓴다 - object 배열로 복사하지 않음.
+대용량 업로드는 writer() 로 정규화된 청크를 record batch 로 바로 추가해
+전체 프레임을 메모리에 만들지 않고 사이드카를 작성한다.
+pyarrow 가 설치되지 않은 환경에서는 사이드카를 건너뛴다.
+사이드카는 마지막으로 읽은 지 ttl 초가 지나면 만료되고, 전체 크기가 max_bytes 를 넘으면
+오래 쓰지 않은 파일부터 삭제한다. (DATASET_SIDECAR_TTL / DATASET_SIDECAR_MAX_MB)
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow 미설치 환경
+    pa = None
+    feather = None
+
+METADATA_KEY = b"review_report"
+
+
+def sidecar_schema(names: List[str]) -> "pa.Schema":
+    """정규 스키마의 고정 Arrow 타입 - date 는 timestamp[ns], rating 은 float64, 나머지는 string
+
+    청크마다 추론하면 첫 청크 별점이 정수뿐일 때 int64 로 고정돼 뒤의 4.5 에서 실패하므로 데이터와 무관하게 정한다.
+    """
+    types = {'date': pa.timestamp('ns'), 'rating': pa.float64()}
+    return pa.schema([pa.field(name, types.get(name, pa.string())) for name in names])
+
+
+def _arrow_strings(arrow_type: "pa.DataType"):
+    """to_pandas 의 types_mapper - 문자열 컬럼은 Arrow 버퍼를 그대로 쓰는 string[pyarrow] (object 배열로 복사하지 않음)"""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _to_table(df: pd.DataFrame) -> "pa.Table":
+    return pa.Table.from_pandas(df, schema=sidecar_schema(list(df.columns)), preserve_index=False)
+
+
+def _with_metadata(table: "pa.Table", mapping: Dict[str, str], columns: Dict[str, str]) -> "pa.Table":
+    meta = json.dumps({"mapping": {k: str(v) for k, v in mapping.items()}, "columns": columns}, ensure_ascii=False)
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: meta.encode()})
+
+
+class SidecarWriter:
+    """정규화된 청크를 같은 Arrow IPC 파일에 순서대로 추가 (commit 전까지는 임시 파일)"""
+
+    def __init__(self, path: str, on_commit: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.on_commit = on_commit
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame, mapping: Dict[str, str], columns: Dict[str, str]) -> None:
+        table = _to_table(df)
+        if self._writer is None:
+            # 타입은 sidecar_schema 로 고정, 메타데이터(pandas dtype, 매핑)만 첫 청크에서
+            self._schema = _with_metadata(table, mapping, columns).schema
+            self._writer = pa.ipc.new_file(self.tmp_path, self._schema)
+        self._writer.write_table(table.replace_schema_metadata(self._schema.metadata))
+
+    def commit(self) -> str:
+        self._writer.close()
+        os.replace(self.tmp_path, self.path)
+        if self.on_commit is not None:
+            self.on_commit(self.path)
+        return self.path
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class ColumnarStore:
+    def __init__(self, directory: str, max_bytes: int = 2048 * 1024 * 1024, ttl: float = 24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return feather is not None
+
+    def path_for(self, dataset_id: str) -> str:
+        return os.path.join(self.directory, f"{dataset_id}.arrow")
+
+    def write(self, dataset_id: str, df: pd.DataFrame, mapping: Dict[str, str], columns: Dict[str, str]) -> Optional[str]:
+        """정규화된 프레임을 비압축 Arrow IPC 로 기록 (memory-map 가능)"""
+        if not self.enabled:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        table = _with_metadata(_to_table(df), mapping, columns)
+        path = self.path_for(dataset_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def writer(self, dataset_id: str) -> Optional[SidecarWriter]:
+        """청크 단위 기록용 writer (pyarrow 미설치 시 None)"""
+        if not self.enabled:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        return SidecarWriter(self.path_for(dataset_id), on_commit=self.evict)
+
+    def read(self, dataset_id: str, columns: Optional[List[str]] = None) -> Optional[Tuple[pd.DataFrame, Dict[str, str], Dict[str, str]]]:
+        """사이드카가 있으면 (df, mapping, columns) 반환, 없으면 None
+
+        텍스트 컬럼은 string[pyarrow] 로 변환해 memory-map 된 파일 페이지를 그대로 가리킨다.
+        """
+        if not self.enabled:
+            return None
+        path = self.path_for(dataset_id)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl:
+                os.remove(path)
+                return None
+            table = feather.read_table(path, columns=columns, memory_map=True)
+            # mtime = 마지막 사용 시각 (TTL / 크기 제한 삭제 순서 기준)
+            os.utime(path)
+        except (OSError, pa.ArrowInvalid):
+            return None
+        meta = json.loads(table.schema.metadata[METADATA_KEY].decode())
+        return table.to_pandas(types_mapper=_arrow_strings), meta["mapping"], meta["columns"]
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """만료된 사이드카와, 전체 크기가 max_bytes 를 넘는 만큼 오래 쓰지 않은 사이드카 삭제
+
+        keep(방금 기록한 파일)은 남긴다. 이미 memory-map 으로 열린 파일은 삭제해도 매핑이 유지된다.
+        """
+        now = time.time()
+        with self._lock:
+            entries = []
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                if not name.endswith(".arrow"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                    if now - stat.st_mtime > self.ttl:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+
+columnar_store = ColumnarStore(
+    os.environ.get("DATASET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "review-report-datasets")),
+    max_bytes=int(float(os.environ.get("DATASET_SIDECAR_MAX_MB", 2048)) * 1024 * 1024),
+    ttl=float(os.environ.get("DATASET_SIDECAR_TTL", 24 * 3600)),
+)
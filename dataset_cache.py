@@ -0,0 +1,243 @@
+"""업로드 파일 내용 해시 기반 데이터셋 캐시
+
+/api/prepare 에서 한 번 파싱한 DataFrame(날짜 변환, 컬럼 매핑 완료)을
+파일 내용의 SHA-256 해시(dataset_id)로 보관한다.
+/api/analyze 는 dataset_id 만 받아 업로드와 엑셀 파싱을 모두 건너뛴다.
+
+캐시된 프레임은 identify_columns 결과를 기준으로 정규화된 스키마
+(franchise/date/rating/comment_ko/comment_zh/reply_ko, 필요 시 comment)만 가진다.
+메모리 캐시 미스 시에는 columnar_store 의 디스크 사이드카를 먼저 확인한다.
+
+업로드는 스풀된 파일 객체를 블록 단위로 해시하고, xlsx 는 excel_ingest 로 청크 단위 파싱한다.
+정규화된 청크는 바로 사이드카에 record batch 로 추가한 뒤 memory-map 으로 다시 열고,
+텍스트 컬럼은 string[pyarrow] 로 읽어 익명 메모리가 아닌 파일 페이지(회수 가능)에 머물게 한다.
+최대 익명 메모리 = 공유 문자열 + 청크 1개 (pyarrow 가 없으면 청크를 메모리에서 이어 붙임)
+excel_ingest(openpyxl)는 실제로 파일을 파싱할 때 import 한다 - dataset_id 로 들어오는 요청은 로딩하지 않음.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from columnar_store import columnar_store
+from group_index import GroupIndex
+from local_analysis import KeywordBaseline
+from trend import Summaries, month_summaries
+
+TEXT_KEYS = ['comment_ko', 'comment_zh', 'reply_ko']
+
+
+class Dataset:
+    """정규화된 리뷰 프레임
+
+    - mapping: 원본 엑셀 헤더 기준 컬럼 매핑 (클라이언트 표시용)
+    - columns: 논리 키 -> df 컬럼명 (예: columns['comment'] == 'comment_ko')
+    - group_index: 가맹점 × 월 인덱스 (처음 접근할 때 한 번 계산)
+    - summaries: 월별 가맹점/전체 요약 - 추이 리포트용 (처음 접근할 때 한 번 계산)
+    - keyword_baseline: 전체 리뷰의 단어별 언급 수 - 로컬 키워드 IDF 기준 (처음 접근할 때 한 번 계산)
+    """
+
+    def __init__(self, dataset_id: str, df: pd.DataFrame, mapping: Dict[str, str], columns: Dict[str, str]):
+        self.dataset_id = dataset_id
+        self.df = df
+        self.mapping = mapping
+        self.columns = columns
+        self.created_at = time.time()
+        self._group_index: Optional[GroupIndex] = None
+        self._summaries: Optional[Summaries] = None
+        self._keyword_baseline: Optional[KeywordBaseline] = None
+
+    @property
+    def group_index(self) -> GroupIndex:
+        if self._group_index is None:
+            self._group_index = GroupIndex.build(self.df, self.columns)
+        return self._group_index
+
+    @property
+    def summaries(self) -> Summaries:
+        if self._summaries is None:
+            self._summaries = month_summaries(self.df, self.columns)
+        return self._summaries
+
+    @property
+    def keyword_baseline(self) -> KeywordBaseline:
+        if self._keyword_baseline is None:
+            self._keyword_baseline = KeywordBaseline.build(self.df[self.columns['comment']])
+        return self._keyword_baseline
+
+
+# dataset_id 는 SHA-256 hex - 클라이언트가 보낸 값은 캐시/디스크 조회 전에 이 형식인지 확인
+DATASET_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def is_dataset_id(value: str) -> bool:
+    return isinstance(value, str) and DATASET_ID_PATTERN.fullmatch(value) is not None
+
+
+def compute_dataset_id(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def compute_dataset_id_file(source: BinaryIO, block_size: int = 1 << 20) -> str:
+    """파일 객체를 블록 단위로 해시 (전체를 메모리에 올리지 않음, 읽은 뒤 처음으로 되감음)"""
+    source.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: source.read(block_size), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def normalize_frame(raw: pd.DataFrame, mapping: Dict[str, str]) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """매핑된 컬럼만 정규 스키마로 투영하고 타입 변환 (날짜 없는 행 제거)"""
+    data = {
+        'franchise': raw[mapping['franchise']].astype(str),
+        'date': pd.to_datetime(raw[mapping['date']], errors='coerce'),
+        # 청크마다 같은 타입이 되도록 항상 float64 (정수만 있는 청크도 int64 로 추론되지 않게)
+        'rating': pd.to_numeric(raw[mapping['rating']], errors='coerce').astype('float64'),
+    }
+    columns = {'franchise': 'franchise', 'date': 'date', 'rating': 'rating'}
+    for key in TEXT_KEYS:
+        if mapping.get(key) is not None:
+            data[key] = raw[mapping[key]].astype('string')
+            columns[key] = key
+    # 'comment' 가 한글/중국어 댓글 컬럼 중 하나를 가리키면 별도 복사하지 않음
+    comment_src = mapping['comment']
+    columns['comment'] = next((k for k in TEXT_KEYS if k in columns and mapping[k] == comment_src), 'comment')
+    if columns['comment'] == 'comment':
+        data['comment'] = raw[comment_src].astype('string')
+
+    df = pd.DataFrame(data)
+    df = df.dropna(subset=['date']).reset_index(drop=True)
+    return df, columns
+
+
+def parse_workbook(contents: bytes, identify_columns: Callable[[pd.DataFrame], Dict[str, str]]) -> Tuple[pd.DataFrame, Dict[str, str], Dict[str, str]]:
+    """엑셀 파싱 + 컬럼 매핑 + 정규화"""
+    return parse_workbook_file(io.BytesIO(contents), identify_columns)
+
+
+def iter_normalized_chunks(source: BinaryIO, identify_columns: Callable[[pd.DataFrame], Dict[str, str]],
+                           chunk_rows: Optional[int] = None) -> Iterator[Tuple[pd.DataFrame, Dict[str, str], Dict[str, str]]]:
+    """스풀된 업로드 파일을 청크 단위로 읽어 정규화 (xlsx 가 아니면 pd.read_excel 한 번으로 대체)"""
+    from excel_ingest import INGEST_CHUNK_ROWS, iter_sheet_chunks
+
+    source.seek(0)
+    try:
+        for mapping, chunk in iter_sheet_chunks(source, identify_columns, chunk_rows or INGEST_CHUNK_ROWS):
+            part, columns = normalize_frame(chunk, mapping)
+            yield part, mapping, columns
+    except zipfile.BadZipFile:
+        source.seek(0)
+        raw = pd.read_excel(source)
+        mapping = identify_columns(raw)
+        df, columns = normalize_frame(raw, mapping)
+        yield df, mapping, columns
+
+
+def parse_workbook_file(source: BinaryIO, identify_columns: Callable[[pd.DataFrame], Dict[str, str]],
+                        chunk_rows: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, str], Dict[str, str]]:
+    """청크를 메모리에서 이어 붙여 하나의 프레임으로 반환"""
+    parts = []
+    for part, mapping, columns in iter_normalized_chunks(source, identify_columns, chunk_rows):
+        parts.append(part)
+    if len(parts) == 1:
+        return parts[0], mapping, columns
+    # 컬럼 단위로 이어 붙이며 청크를 바로 해제 (전체 프레임이 두 벌 생기지 않게)
+    data = {}
+    for name in list(parts[0].columns):
+        data[name] = pd.concat([part.pop(name) for part in parts], ignore_index=True)
+    return pd.DataFrame(data, copy=False), mapping, columns
+
+
+class DatasetCache:
+    """크기(LRU)와 TTL 로 제한되는 스레드 안전 인메모리 캐시 + 디스크 사이드카"""
+
+    def __init__(self, max_entries: int = 8, ttl: float = 1800, store=columnar_store):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._items: "OrderedDict[str, Dataset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_memory(self, dataset_id: str) -> Optional[Dataset]:
+        with self._lock:
+            dataset = self._items.get(dataset_id)
+            if dataset is None:
+                return None
+            if time.time() - dataset.created_at > self.ttl:
+                del self._items[dataset_id]
+                return None
+            self._items.move_to_end(dataset_id)
+            return dataset
+
+    def get(self, dataset_id: str) -> Optional[Dataset]:
+        # 사이드카 경로에 그대로 들어가므로 형식이 다른 id(../ 등)는 조회하지 않음
+        if not is_dataset_id(dataset_id):
+            return None
+        dataset = self._get_memory(dataset_id)
+        if dataset is None:
+            loaded = self.store.read(dataset_id)
+            if loaded is not None:
+                df, mapping, columns = loaded
+                dataset = Dataset(dataset_id, df, mapping, columns)
+                self.put(dataset)
+        return dataset
+
+    def put(self, dataset: Dataset) -> None:
+        with self._lock:
+            self._items[dataset.dataset_id] = dataset
+            self._items.move_to_end(dataset.dataset_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def get_or_load(self, contents: bytes, identify_columns: Callable[[pd.DataFrame], Dict[str, str]]) -> Dataset:
+        return self.get_or_load_file(io.BytesIO(contents), identify_columns)
+
+    def get_or_load_file(self, source: BinaryIO, identify_columns: Callable[[pd.DataFrame], Dict[str, str]]) -> Dataset:
+        """업로드 파일 객체(디스크 스풀)를 직접 해시/파싱 - 원본 바이트를 메모리에 올리지 않음"""
+        dataset_id = compute_dataset_id_file(source)
+        dataset = self.get(dataset_id)
+        if dataset is None:
+            loaded = self._ingest_to_store(dataset_id, source, identify_columns)
+            if loaded is None:
+                df, mapping, columns = parse_workbook_file(source, identify_columns)
+                try:
+                    self.store.write(dataset_id, df, mapping, columns)
+                except OSError:
+                    pass
+            else:
+                df, mapping, columns = loaded
+            dataset = Dataset(dataset_id, df, mapping, columns)
+            self.put(dataset)
+        return dataset
+
+    def _ingest_to_store(self, dataset_id: str, source: BinaryIO, identify_columns: Callable[[pd.DataFrame], Dict[str, str]]):
+        """정규화된 청크를 사이드카에 바로 기록하고 memory-map 으로 로드 (사이드카를 못 쓰면 None)"""
+        writer = self.store.writer(dataset_id)
+        if writer is None:
+            return None
+        try:
+            for part, mapping, columns in iter_normalized_chunks(source, identify_columns):
+                writer.write(part, mapping, columns)
+            writer.commit()
+        except OSError:
+            writer.abort()
+            return None
+        except BaseException:
+            writer.abort()
+            raise
+        return self.store.read(dataset_id)
+
+
+dataset_cache = DatasetCache(
+    max_entries=int(os.environ.get("DATASET_CACHE_SIZE", 8)),
+    ttl=float(os.environ.get("DATASET_CACHE_TTL", 1800)),
+)
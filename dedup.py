@@ -0,0 +1,164 @@
+"""프롬프트 전 리뷰 중복/상투 문구 제거
+
+"맛있어요", 이모지만 있는 리뷰, 복사한 중국어 템플릿처럼 반복되는 리뷰가 프롬프트 토큰을
+차지하지 않도록 다음 순서로 줄인다. (모든 단계 numpy/pandas 벡터 연산, 10만 건 1초 이내)
+1. 정규화: 소문자, 문장부호/이모지/공백 제거 - 내용이 남지 않는 리뷰는 상투 문구로 집계만 함
+2. 완전 중복: 정규화 텍스트 기준 factorize, 건수를 가중치로 보관
+3. 유사 중복: 글자 3-gram MinHash + LSH 밴딩으로 후보를 찾고 추정 Jaccard 0.7 이상만 묶음
+4. 표본 선택: 군집 대표 리뷰를 가중치 순으로, 별점 구간(긍정/중립/부정)을 번갈아 토큰 예산까지 선택
+대표 리뷰는 "(×N) 리뷰" 형태로 가중치를 함께 프롬프트에 넣는다.
+"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from summarizer import LLM_TOKEN_BUDGET, estimate_tokens_series, pa, pc
+
+SHINGLE = 3
+NUM_PERM = 16
+BANDS = 4
+SIMILARITY = 0.7
+_BASE = np.uint64(0x110000)
+_rng = np.random.default_rng(20251101)
+_PERM_A = _rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+_PERM_A32 = (_PERM_A >> np.uint64(32)).astype(np.uint32) | np.uint32(1)
+_PERM_B32 = (_PERM_B >> np.uint64(32)).astype(np.uint32)
+# 한글 자모/호환 자모, 가나, 한자, 한글 음절
+_WIDE_RANGES = [(0x1100, 0x11FF), (0x3040, 0x30FF), (0x3130, 0x318F), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xAC00, 0xD7AF), (0xF900, 0xFAFF)]
+# 영문/숫자/라틴 문자와 한글/한자/가나 외에는 모두 구분자로 취급 (pyarrow RE2 와 re 모두에서 동일하게 동작)
+_NON_CONTENT = "[^0-9a-z\u00c0-\u024f" + "".join(f"{chr(lo)}-{chr(hi)}" for lo, hi in _WIDE_RANGES) + "]+"
+
+
+def normalize_texts(texts: pd.Series) -> pd.Series:
+    """소문자 + 문장부호/이모지/공백 정리 (pyarrow compute 우선)
+
+    전각 문장부호는 구분자 범위에 포함되므로 NFKC 정규화는 생략한다.
+    """
+    s = texts.fillna('').astype(str)
+    if pc is not None:
+        arr = pc.utf8_trim_whitespace(pc.replace_substring_regex(pc.utf8_lower(pa.array(s)), _NON_CONTENT, ' '))
+        return pd.Series(arr.to_pandas().to_numpy(), index=s.index)
+    return s.str.lower().str.replace(_NON_CONTENT, ' ', regex=True).str.strip()
+
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """글자 3-gram MinHash 서명 (n, NUM_PERM) - 문자열을 한 번에 코드포인트 배열로 변환해 계산"""
+    n = len(texts)
+    padded = [t if len(t) >= SHINGLE else t.ljust(SHINGLE, '\0') for t in texts]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=n)
+    codes = np.frombuffer(''.join(padded).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+    # 전체 배열에서 3-gram 을 만든 뒤 텍스트 경계를 넘는 위치(각 텍스트의 마지막 두 글자)를 제외
+    grams = codes[:-2] * _BASE * _BASE + codes[1:-1] * _BASE + codes[2:]
+    ends = np.cumsum(lengths)
+    keep = np.ones(codes.size, dtype=bool)
+    keep[ends - 1] = False
+    keep[ends - 2] = False
+    with np.errstate(over='ignore'):
+        base = ((grams[keep[:-2]] * _PERM_A[0]) >> np.uint64(32)).astype(np.uint32)
+    first = np.concatenate(([0], np.cumsum(lengths - (SHINGLE - 1))[:-1]))
+
+    # 32비트 곱셈-덧셈 순열 + xorshift 로 NUM_PERM 개 해시
+    signatures = np.empty((n, NUM_PERM), dtype=np.uint32)
+    with np.errstate(over='ignore'):
+        for k in range(NUM_PERM):
+            hashed = base * _PERM_A32[k] + _PERM_B32[k]
+            hashed ^= hashed >> np.uint32(15)
+            signatures[:, k] = np.minimum.reduceat(hashed, first)
+    return signatures
+
+
+def cluster_signatures(signatures: np.ndarray) -> np.ndarray:
+    """LSH 밴딩 - 한 밴드라도 서명이 같은 가장 앞 항목을 대표로 묶음
+
+    후보 대표와의 추정 Jaccard(서명 일치 비율)가 SIMILARITY 미만이면 묶지 않고,
+    연쇄 병합을 막기 위해 대표는 한 단계만 따라간다.
+    """
+    n = signatures.shape[0]
+    index = np.arange(n)
+    labels = index.copy()
+    rows = NUM_PERM // BANDS
+    for b in range(BANDS):
+        band = signatures[:, b * rows:(b + 1) * rows]
+        bucket = pd.util.hash_pandas_object(pd.DataFrame(band), index=False).to_numpy()
+        _, inverse = np.unique(bucket, return_inverse=True)
+        bucket_min = np.full(inverse.max() + 1, n)
+        np.minimum.at(bucket_min, inverse, index)
+        labels = np.minimum(labels, bucket_min[inverse])
+    similar = (signatures == signatures[labels]).mean(axis=1) >= SIMILARITY
+    return np.where(similar, labels, index)
+
+
+def dedupe_frame(df: pd.DataFrame, mapping: Dict[str, str], token_budget: int = LLM_TOKEN_BUDGET) -> Tuple[List[str], Dict[str, Any]]:
+    """프롬프트용 대표 리뷰 목록과 절감 통계 반환"""
+    display = df[mapping['comment']].fillna('').astype(str)
+    original_tokens = int(estimate_tokens_series('- ' + display).sum())
+
+    # 유사도 판단은 한글/중국어 댓글을 함께 사용 (원문 기준 중복을 먼저 제거한 뒤 정규화)
+    source_cols = [mapping[k] for k in ('comment_ko', 'comment_zh') if mapping.get(k)] or [mapping['comment']]
+    raw = df[source_cols[0]].fillna('').astype(str)
+    for col in source_cols[1:]:
+        raw = raw + '\n' + df[col].fillna('').astype(str)
+    raw_codes, raw_uniques = pd.factorize(raw)
+    norm_codes, norm_uniques = pd.factorize(normalize_texts(pd.Series(raw_uniques)))
+    row_codes = norm_codes[raw_codes]
+
+    # 정규화 후 내용이 없는 리뷰(이모지/문장부호만)는 상투 문구로 집계만 함
+    empty = np.flatnonzero(np.asarray(norm_uniques) == '')
+    informative = row_codes != empty[0] if empty.size else np.ones(len(df), dtype=bool)
+    boilerplate = int((~informative).sum())
+    if not informative.any():
+        # 전부 상투 문구면 원문 그대로 사용
+        return display.tolist(), {"comments": len(df), "boilerplate": boilerplate, "unique": 0, "clusters": 0, "selected": len(df),
+                                  "original_tokens": original_tokens, "prompt_tokens": original_tokens, "saved_tokens": 0}
+
+    display = display[informative]
+    ratings = pd.to_numeric(df[mapping['rating']], errors='coerce')[informative].to_numpy()
+
+    # 완전 중복
+    codes, used = pd.factorize(row_codes[informative])
+    uniques = np.asarray(norm_uniques, dtype=object)[used]
+    counts = np.bincount(codes)
+    first_row = np.full(len(uniques), len(codes))
+    np.minimum.at(first_row, codes, np.arange(len(codes)))
+
+    # 유사 중복
+    labels = cluster_signatures(minhash_signatures(uniques.tolist()))
+    cluster_ids, cluster_of_unique = np.unique(labels, return_inverse=True)
+    weights = np.bincount(cluster_of_unique, weights=counts).astype(np.int64)
+
+    # 군집 대표: 가장 많이 반복된 원문
+    order = np.lexsort((-counts, cluster_of_unique))
+    rep_unique = order[np.searchsorted(cluster_of_unique[order], np.arange(len(cluster_ids)))]
+    rep_rows = first_row[rep_unique]
+
+    rating_sum = np.bincount(cluster_of_unique[codes], weights=np.nan_to_num(ratings, nan=3.5))
+    rating_avg = rating_sum / weights
+    stratum = np.where(rating_avg >= 4.0, 0, np.where(rating_avg <= 3.0, 2, 1))
+
+    lines = pd.Series(display.to_numpy()[rep_rows])
+    lines = lines.where(weights <= 1, '(×' + pd.Series(weights).astype(str) + ') ' + lines)
+    line_tokens = estimate_tokens_series('- ' + lines).to_numpy()
+
+    # 별점 구간별 가중치 순서 -> 구간 간 번갈아 선택 (순위가 같으면 부정, 중립, 긍정 순)
+    rank = pd.Series(weights).groupby(stratum).rank(method='first', ascending=False).to_numpy()
+    pick_order = np.lexsort((-stratum, rank))
+    cumulative = np.cumsum(line_tokens[pick_order])
+    selected = pick_order[cumulative <= token_budget]
+    # 최종 프롬프트는 가중치 순
+    selected = selected[np.argsort(-weights[selected], kind='stable')]
+
+    prompt_tokens = int(line_tokens[selected].sum())
+    info = {
+        "comments": len(df),
+        "boilerplate": boilerplate,
+        "unique": int(len(uniques)),
+        "clusters": int(len(cluster_ids)),
+        "selected": int(len(selected)),
+        "original_tokens": original_tokens,
+        "prompt_tokens": prompt_tokens,
+        "saved_tokens": original_tokens - prompt_tokens,
+    }
+    return lines.iloc[selected].tolist(), info
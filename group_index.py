@@ -0,0 +1,77 @@
+"""가맹점 × 월 그룹 인덱스
+
+정규화된 데이터셋에서 한 번의 factorize/bincount 로
+- 그룹별 행 수, 별점 평균, 부정 리뷰(별점 3 이하) 수
+- 그룹 순으로 안정 정렬한 행 위치(order)와 그룹별 시작 오프셋(offsets)
+을 계산한다. 그룹의 행은 order[offsets[i]:offsets[i + 1]] 이고 원본 순서를 유지하므로
+/api/analyze 는 문자열 마스크로 전체를 다시 훑지 않고 O(그룹 행 수) 로 잘라낸다.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class GroupIndex:
+    def __init__(self, keys: List[Tuple[str, str]], order: np.ndarray, offsets: np.ndarray,
+                 rating_avg: np.ndarray, negative: np.ndarray):
+        self.keys = keys
+        self.order = order
+        self.offsets = offsets
+        self.rating_avg = rating_avg
+        self.negative = negative
+        self._positions = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, columns: Dict[str, str]) -> "GroupIndex":
+        dates = df[columns['date']]
+        franchise_codes, franchises = pd.factorize(df[columns['franchise']].astype(str), sort=True)
+        month_keys = (dates.dt.year * 100 + dates.dt.month).to_numpy()
+        month_codes, months = pd.factorize(month_keys, sort=True)
+
+        # (가맹점, 월) 조합 코드 - 정렬된 코드 순서가 곧 (가맹점, 월) 오름차순
+        combined = franchise_codes.astype(np.int64) * len(months) + month_codes
+        group_codes, groups = pd.factorize(combined, sort=True)
+        order = np.argsort(group_codes, kind='stable')
+        counts = np.bincount(group_codes, minlength=len(groups))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        rating = pd.to_numeric(df[columns['rating']], errors='coerce').to_numpy(dtype=float)
+        valid = ~np.isnan(rating)
+        rating_sum = np.bincount(group_codes[valid], weights=rating[valid], minlength=len(groups))
+        rating_n = np.bincount(group_codes[valid], minlength=len(groups))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rating_avg = np.round(rating_sum / rating_n, 2)
+        negative = np.bincount(group_codes[valid & (rating <= 3.0)], minlength=len(groups))
+
+        keys = []
+        for code in groups:
+            f, m = divmod(int(code), len(months))
+            ym = int(months[m])
+            keys.append((str(franchises[f]), f"{ym // 100:04d}-{ym % 100:02d}"))
+        return cls(keys, order, offsets, rating_avg, negative)
+
+    def locate(self, franchise: str, month: str) -> Optional[np.ndarray]:
+        """그룹의 행 위치 (데이터 없으면 None)"""
+        i = self._positions.get((franchise, month))
+        if i is None:
+            return None
+        return self.order[self.offsets[i]:self.offsets[i + 1]]
+
+    def rows(self, df: pd.DataFrame, franchise: str, month: str) -> Optional[pd.DataFrame]:
+        positions = self.locate(franchise, month)
+        return None if positions is None else df.take(positions)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """/api/prepare 응답용 - offset 은 order 기준 그룹 시작 위치"""
+        return [
+            {
+                "franchise": franchise,
+                "month": month,
+                "count": int(self.offsets[i + 1] - self.offsets[i]),
+                "rating_avg": None if np.isnan(self.rating_avg[i]) else float(self.rating_avg[i]),
+                "negative": int(self.negative[i]),
+                "offset": int(self.offsets[i]),
+            }
+            for i, (franchise, month) in enumerate(self.keys)
+        ]
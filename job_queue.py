@@ -0,0 +1,303 @@
+"""분석 작업 큐 (SQLite 작업 테이블 + 프로세스 내 asyncio 워커)
+
+긴 분석을 HTTP 연결에 묶어 두지 않도록 POST /api/jobs 는 작업만 등록하고 id 를 바로 돌려주며,
+워커가 실행한 결과는 작업 테이블에 저장해 GET /api/jobs/{id} 로 조회한다. (연결이 끊겨도 결과 유지)
+
+- 중복 제거: 같은 요청(dedup_key)이 queued/running 이면 새 작업 대신 그 작업 id 를 반환
+  키가 필요한 작업은 API 키 해시도 dedup_key 에 넣어, 다른 키의 요청이 남의 작업에 붙지 않게 한다
+- 임대(lease): 실행 중인 작업에는 실행하는 워커(owner)와 heartbeat 를 기록하고, heartbeat 가
+  JOB_LEASE 초 넘게 끊긴 작업만 queued 로 되돌려 다시 실행한다 (JOB_MAX_ATTEMPTS 회까지)
+  여러 프로세스(uvicorn --workers)가 같은 작업 테이블을 써도 살아 있는 워커의 작업을 두 번 실행하지 않는다
+  정상 종료(stop) 시에는 자기 작업을 바로 queued 로 돌려놓는다
+  배치의 이미 끝난 그룹은 AI 결과 캐시(llm_cache)에 있으므로 다시 돌려도 모델을 재호출하지 않는다
+- API 키는 디스크에 쓰지 않고 메모리에만 둔다. 재시작 후 키가 필요한 작업은 같은 키로 같은 요청을 다시 보내
+  키가 붙을 때까지 queued 로 기다린다 (waiting_for_key)
+- 진행률: 핸들러가 progress(done, total) 로 기록
+- 모델 호출 상한: 작업의 모델 호출도 동기/스트리밍 요청과 같은 summarizer.llm_slots 로 제한된다 (LLM_MAX_INFLIGHT)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# 동시에 실행하는 작업 수
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# 재시작 등으로 중단된 작업을 다시 시도하는 최대 횟수
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+# 끝난 작업(done/error) 보관 기간 (초)
+JOB_RETENTION = float(os.environ.get("JOB_RETENTION", 7 * 24 * 3600))
+# 실행 중 작업의 heartbeat 가 이 시간(초) 넘게 없으면 워커가 죽은 것으로 보고 다시 대기열에 넣음
+JOB_LEASE = float(os.environ.get("JOB_LEASE", 60))
+
+ACTIVE = ("queued", "running")
+
+Progress = Callable[[int, int], Awaitable[None]]
+Handler = Callable[[Dict[str, Any], str, Progress], Awaitable[Dict[str, Any]]]
+
+
+def key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest() if api_key else ""
+
+
+def dedup_key(kind: str, params: Dict[str, Any], key_id: str = "") -> str:
+    """key_id: API 키 해시 (키가 필요한 작업만) - 키가 다르면 다른 작업"""
+    data = json.dumps([kind, params, key_id], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class JobStore:
+    """작업 테이블 - llm_cache 와 같은 단일 연결 + 잠금"""
+
+    def __init__(self, path: str, retention: float = JOB_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT, dedup_key TEXT, params TEXT, needs_key INTEGER,"
+                " status TEXT, done INTEGER, total INTEGER, result TEXT, error TEXT, attempts INTEGER,"
+                " created_at REAL, started_at REAL, finished_at REAL, owner TEXT, heartbeat REAL)"
+            )
+            # 임대 컬럼이 없던 기존 작업 테이블
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs(dedup_key, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, kind: str, params: Dict[str, Any], needs_key: bool, key_id: str = "") -> Dict[str, Any]:
+        """queued 작업 등록 -> {"job_id", "deduplicated"} (같은 요청이 진행 중이면 그 작업)"""
+        key = dedup_key(kind, params, key_id if needs_key else "")
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (key, *ACTIVE),
+            ).fetchone()
+            if row is not None:
+                return {"job_id": row[0], "deduplicated": True}
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, dedup_key, params, needs_key, status, done, total, attempts, created_at)"
+                " VALUES (?, ?, ?, ?, ?, 'queued', 0, 0, 0, ?)",
+                (job_id, kind, key, json.dumps(params, ensure_ascii=False), int(needs_key), now),
+            )
+            conn.execute("DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?", (*ACTIVE, now - self.retention))
+            conn.commit()
+        return {"job_id": job_id, "deduplicated": False}
+
+    def claim(self, owner: str, runnable: Callable[[str, bool], bool]) -> Optional[Dict[str, Any]]:
+        """가장 오래된 실행 가능한 queued 작업을 owner 의 running 으로 바꿔 반환 (없으면 None)"""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT id, kind, params, needs_key FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+            for job_id, kind, params, needs_key in rows:
+                if not runnable(job_id, bool(needs_key)):
+                    continue
+                # 같은 파일을 쓰는 다른 프로세스가 먼저 가져갔으면 rowcount 0
+                now = time.time()
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1, owner = ?, heartbeat = ?"
+                    " WHERE id = ? AND status = 'queued'",
+                    (now, owner, now, job_id),
+                ).rowcount
+                conn.commit()
+                if claimed:
+                    return {"id": job_id, "kind": kind, "params": json.loads(params)}
+        return None
+
+    def progress(self, job_id: str, owner: str, done: int, total: int) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE jobs SET done = ?, total = ?, heartbeat = ? WHERE id = ? AND owner = ?",
+                         (done, total, time.time(), job_id, owner))
+            conn.commit()
+
+    def finish(self, job_id: str, owner: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """결과 기록 - 임대가 만료되어 다른 워커가 가져간 작업이면 기록하지 않음"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                ("error" if error is not None else "done",
+                 json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 error, time.time(), job_id, owner),
+            )
+            conn.commit()
+
+    def heartbeat(self, owner: str) -> None:
+        """owner 가 실행 중인 작업의 임대 연장"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status = 'running'", (time.time(), owner))
+            conn.commit()
+
+    def release(self, owner: str) -> int:
+        """정상 종료 - owner 가 실행 중이던 작업을 바로 queued 로"""
+        with self._lock:
+            conn = self._connect()
+            count = conn.execute("UPDATE jobs SET status = 'queued', owner = NULL WHERE owner = ? AND status = 'running'",
+                                 (owner,)).rowcount
+            conn.commit()
+        return count
+
+    def requeue_expired(self, lease: float = JOB_LEASE, max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+        """heartbeat 가 lease 초 넘게 없는 running 작업 -> queued (시도 횟수를 다 쓴 작업은 error)"""
+        now = time.time()
+        expired = "status = 'running' AND (heartbeat IS NULL OR heartbeat < ?)"
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"UPDATE jobs SET status = 'error', error = ?, finished_at = ? WHERE {expired} AND attempts >= ?",
+                (f"작업이 {max_attempts}회 중단되었습니다", now, now - lease, max_attempts),
+            )
+            count = conn.execute(f"UPDATE jobs SET status = 'queued', owner = NULL WHERE {expired}", (now - lease,)).rowcount
+            conn.commit()
+        return count
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, kind, params, needs_key, status, done, total, result, error, attempts,"
+                " created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        (job_id, kind, params, needs_key, status, done, total, result, error, attempts,
+         created_at, started_at, finished_at) = row
+        return {
+            "job_id": job_id,
+            "kind": kind,
+            "status": status,
+            "progress": {"done": done, "total": total},
+            "params": json.loads(params),
+            "needs_key": bool(needs_key),
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "attempts": attempts,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+        }
+
+
+class JobRunner:
+    """JOB_WORKERS 개의 asyncio 워커가 작업 테이블에서 작업을 가져와 kind 별 핸들러로 실행"""
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS, poll_interval: float = 1.0, lease: float = JOB_LEASE):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        # 이 프로세스의 워커 식별자 (작업 임대 owner)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, Handler] = {}
+        self._keys: Dict[str, str] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self.handlers[kind] = handler
+
+    async def submit(self, kind: str, params: Dict[str, Any], api_key: str = "", needs_key: bool = False) -> Dict[str, Any]:
+        """작업 등록 - 같은 키의 같은 요청이면 기존 작업에 키만 붙인다 (재시작 후 키를 잃은 작업 재개)"""
+        job = await run_in_threadpool(self.store.enqueue, kind, params, needs_key, key_fingerprint(api_key))
+        if api_key:
+            # dedup_key 에 키 해시가 들어가므로 같은 키뿐이지만, 이미 붙은 키는 바꾸지 않는다
+            self._keys.setdefault(job["job_id"], api_key)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await run_in_threadpool(self.store.get, job_id)
+        if job is not None:
+            job["waiting_for_key"] = job["status"] == "queued" and job["needs_key"] and job_id not in self._keys
+        return job
+
+    def _runnable(self, job_id: str, needs_key: bool) -> bool:
+        return not needs_key or job_id in self._keys
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        await run_in_threadpool(self.store.requeue_expired, self.lease)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+        self._tasks.append(asyncio.create_task(self._keep_leases()))
+
+    async def stop(self) -> None:
+        """워커 취소 - 실행 중이던 작업은 queued 로 돌려 다음 기동(또는 다른 프로세스)에서 다시 실행된다"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await run_in_threadpool(self.store.release, self.owner)
+
+    async def _keep_leases(self) -> None:
+        """자기 작업의 heartbeat 갱신 + 죽은 워커(임대 만료)의 작업 회수"""
+        while True:
+            await asyncio.sleep(self.lease / 4)
+            await run_in_threadpool(self.store.heartbeat, self.owner)
+            if await run_in_threadpool(self.store.requeue_expired, self.lease):
+                self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await run_in_threadpool(self.store.claim, self.owner, self._runnable)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+
+        async def progress(done: int, total: int) -> None:
+            await run_in_threadpool(self.store.progress, job_id, self.owner, done, total)
+
+        handler = self.handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise ValueError(f"알 수 없는 작업 종류: {job['kind']}")
+            result = await handler(job["params"], self._keys.get(job_id, ""), progress)
+            await run_in_threadpool(self.store.finish, job_id, self.owner, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await run_in_threadpool(self.store.finish, job_id, self.owner, None, getattr(e, "detail", None) or str(e))
+        finally:
+            self._keys.pop(job_id, None)
+
+
+job_store = JobStore(
+    os.environ.get("JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "review-report-jobs.sqlite3")),
+)
+job_runner = JobRunner(job_store)
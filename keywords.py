@@ -0,0 +1,107 @@
+"""리뷰 키워드 빈도 (형태소 분석기 없이)
+
+dedup.normalize_texts 로 정리한 텍스트를 공백 단위로 나누고 리뷰당 한 번씩 센다.
+- 한글/영문: 흔한 조사를 떼어낸 2글자 이상 단어
+- 중국어(띄어쓰기 없음): 한자 연속 구간의 글자 2-gram
+- 조사 제거/2-gram/불용어 판정은 고유 단어(수만 개)에만 적용하고 결과 코드를 전체 토큰에 되돌려 씀
+- (그룹, 단어) 쌍은 정수 키 하나로 묶어 np.unique 로 집계 (pyarrow 가 있으면 분리도 Arrow 커널로)
+그룹 코드별로 한 번에 집계하며 그룹마다 상위 top_k 개만 남긴다.
+"""
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dedup import normalize_texts
+from summarizer import pa, pc
+
+TOP_KEYWORDS = 20
+# 떼어낼 조사 (긴 것부터), 남는 단어가 2글자 이상일 때만
+PARTICLES = ("에서", "으로", "은", "는", "이", "가", "을", "를", "도", "에", "로", "과", "와", "의")
+STOPWORDS = frozenset({
+    "너무", "정말", "진짜", "아주", "완전", "그리고", "근데", "그냥", "조금", "좀", "많이", "다시", "또",
+    "있어요", "있고", "있는", "있어서", "있었어요", "같아요", "합니다", "했어요", "해요", "입니다", "것", "거", "수",
+    "없이", "때문에", "하는", "하고", "해서", "이번", "정도",
+    "非常", "我们", "一个", "还是", "就是", "这个", "这家", "真的", "可以", "特别", "比较", "的是", "了很",
+    "the", "and", "very", "was", "is", "it", "to", "of",
+})
+_PARTICLE_PATTERN = re.compile(r"^(.{2,}?)(?:" + "|".join(PARTICLES) + r")$")
+_HAN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+
+def _split_words(texts: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(토큰별 리뷰 위치, 토큰별 고유 단어 코드, 고유 단어)"""
+    normalized = normalize_texts(texts)
+    if pc is not None:
+        lists = pc.utf8_split_whitespace(pa.array(normalized, type=pa.string()))
+        encoded = pc.list_flatten(lists).dictionary_encode()
+        rows = pc.list_parent_indices(lists).to_numpy().astype(np.int64)
+        return rows, encoded.indices.to_numpy().astype(np.int64), np.asarray(encoded.dictionary.to_pylist(), dtype=object)
+    words = normalized.reset_index(drop=True).str.split().explode().dropna()
+    codes, uniques = pd.factorize(words.to_numpy())
+    return words.index.to_numpy(dtype=np.int64), codes.astype(np.int64), np.asarray(uniques, dtype=object)
+
+
+def _unique_sorted(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """np.unique(return_counts=True) 와 같음 - 정렬 후 경계만 찾음 (해시 기반 np.unique 보다 빠름)"""
+    keys = np.sort(keys)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1]))) if keys.size else np.zeros(0, dtype=np.int64)
+    return keys[starts], np.diff(np.append(starts, keys.size))
+
+
+def _derive(word: str) -> List[str]:
+    """고유 단어 하나에서 나오는 키워드 후보"""
+    if _HAN.fullmatch(word):
+        return [gram for gram in (word[i:i + 2] for i in range(len(word) - 1)) if gram not in STOPWORDS]
+    word = _PARTICLE_PATTERN.sub(r"\1", word)
+    return [word] if len(word) >= 2 and word not in STOPWORDS else []
+
+
+def tokenize(texts: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(리뷰 위치, 단어 코드, 어휘) - 어휘는 가나다순, 리뷰 하나에 같은 단어는 한 번"""
+    rows, raw_codes, raw_words = _split_words(texts)
+    derived = [_derive(w) for w in raw_words]
+    lengths = np.fromiter(map(len, derived), dtype=np.int64, count=len(derived))
+    vocab_codes, vocab = pd.factorize(np.asarray([t for ts in derived for t in ts], dtype=object), sort=True)
+    if not len(vocab):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.asarray(vocab, dtype=object)
+
+    # 토큰마다 (고유 단어 -> 후보 목록) 을 펼침: 후보 수만큼 반복하고 후보 목록 안의 위치를 더함
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    repeat = lengths[raw_codes]
+    token_rows = np.repeat(rows, repeat)
+    within = np.arange(repeat.sum()) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+    codes = vocab_codes[np.repeat(starts[raw_codes], repeat) + within]
+    pairs, _ = _unique_sorted(token_rows * len(vocab) + codes)
+    return pairs // len(vocab), pairs % len(vocab), np.asarray(vocab, dtype=object)
+
+
+def _top(groups: np.ndarray, codes: np.ndarray, counts: np.ndarray, vocab: np.ndarray,
+         n_groups: int, top_k: int) -> List[Dict[str, int]]:
+    result: List[Dict[str, int]] = [{} for _ in range(n_groups)]
+    ranked = np.lexsort((codes, -counts, groups))
+    first = np.searchsorted(groups[ranked], groups[ranked], side='left')
+    keep = ranked[np.arange(len(ranked)) - first < top_k]
+    for g, c, n in zip(groups[keep], codes[keep], counts[keep]):
+        result[int(g)][str(vocab[c])] = int(n)
+    return result
+
+
+def group_keyword_counts(texts: pd.Series, codes: np.ndarray, n_groups: int, top_k: int = TOP_KEYWORDS,
+                         rollup: bool = False) -> List[Dict[str, int]]:
+    """그룹 코드(0..n_groups-1) 별 {단어: 언급 리뷰 수} - 빈도 내림차순, 같으면 가나다순
+
+    rollup 이면 마지막에 전체 그룹 합산 항목을 하나 더 붙인다 (토큰화는 한 번)
+    """
+    rows, words, vocab = tokenize(texts)
+    if not len(vocab):
+        return [{} for _ in range(n_groups + rollup)]
+    keys, counts = _unique_sorted(np.asarray(codes, dtype=np.int64)[rows] * len(vocab) + words)
+    result = _top(keys // len(vocab), keys % len(vocab), counts, vocab, n_groups, top_k)
+    if rollup:
+        total = np.bincount(keys % len(vocab), weights=counts, minlength=len(vocab)).astype(np.int64)
+        present = np.flatnonzero(total)
+        result += _top(np.zeros(len(present), dtype=np.int64), present, total[present], vocab, 1, top_k)
+    return result
@@ -0,0 +1,113 @@
+"""AI 분석 결과 영구 캐시 (SQLite)
+
+키: (모델, 프롬프트 템플릿 버전, 정규화된 프롬프트 해시)
+같은 가맹점/월을 다시 열거나 재분석하면 OpenAI 호출 없이 저장된 결과를 반환한다.
+전체 크기 기준 LRU 삭제와 선택적 TTL 을 지원하고, 프로세스별 적중/미스 카운터를 노출한다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", prompt)).strip()
+
+
+def make_key(model: str, prompt_version: str, prompt: str) -> str:
+    digest = hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+    return f"{model}:{prompt_version}:{digest}"
+
+
+class LLMResultCache:
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, model TEXT, value TEXT, size INTEGER,"
+                " created_at REAL, accessed_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, value: Dict[str, Any]) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, model, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, data, len(data.encode()), now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl is not None:
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+llm_cache = LLMResultCache(
+    os.environ.get("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "review-report-llm-cache.sqlite3")),
+    max_bytes=int(float(os.environ.get("LLM_CACHE_MAX_MB", 64)) * 1024 * 1024),
+    ttl=float(os.environ["LLM_CACHE_TTL"]) if os.environ.get("LLM_CACHE_TTL") else None,
+)
@@ -0,0 +1,101 @@
+"""API 키별 AsyncOpenAI 클라이언트 풀
+
+요청마다 openai.OpenAI 를 새로 만들면 TLS 연결을 매번 다시 맺고,
+동기 호출이 이벤트 루프를 막는다. 키별로 keep-alive 연결 풀을 가진
+AsyncOpenAI 를 재사용한다. (키 개수는 LRU 로 제한)
+클라이언트는 lease() 로 빌려 쓰고, LRU 에서 밀려난 클라이언트는 빌려 간 호출이 모두 끝난 뒤에 닫는다.
+httpx/openai 는 첫 클라이언트를 만들 때 import 한다 (앱 기동 시간 단축).
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Set
+
+if TYPE_CHECKING:  # 주석용 - 실제 import 는 첫 클라이언트 생성 시
+    import openai
+
+
+class AsyncClientPool:
+    def __init__(self, max_clients: int = 32, max_connections: int = 20, timeout: float = 120.0):
+        self.max_clients = max_clients
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._clients: "OrderedDict[str, openai.AsyncOpenAI]" = OrderedDict()
+        # 클라이언트별 진행 중인 호출 수, LRU 에서 밀려났지만 아직 쓰이는 클라이언트
+        self._inflight: "Dict[openai.AsyncOpenAI, int]" = {}
+        self._evicted: "Set[openai.AsyncOpenAI]" = set()
+        self._lock = threading.Lock()
+
+    def _new_client(self, api_key: str) -> "openai.AsyncOpenAI":
+        import httpx
+        import openai
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            timeout=self.timeout,
+        )
+        # 재시도/백오프는 analyze_comments_async 에서 직접 처리
+        return openai.AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+    @asynccontextmanager
+    async def lease(self, api_key: str) -> AsyncIterator["openai.AsyncOpenAI"]:
+        """키의 클라이언트를 빌려 쓴다 - 쓰는 동안에는 LRU 에서 밀려나도 닫지 않음"""
+        client = self._acquire(api_key)
+        try:
+            yield client
+        finally:
+            if self._release(client):
+                await client.close()
+
+    def _acquire(self, api_key: str) -> "openai.AsyncOpenAI":
+        key = hashlib.sha256(api_key.encode()).hexdigest()
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._new_client(api_key)
+                self._clients[key] = client
+                while len(self._clients) > self.max_clients:
+                    _, evicted = self._clients.popitem(last=False)
+                    self._evict(evicted)
+            self._clients.move_to_end(key)
+            self._inflight[client] = self._inflight.get(client, 0) + 1
+            return client
+
+    def _release(self, client: "openai.AsyncOpenAI") -> bool:
+        """호출 하나 종료 - 밀려난 클라이언트의 마지막 호출이면 True (호출한 쪽에서 닫음)"""
+        with self._lock:
+            count = self._inflight.pop(client) - 1
+            if count:
+                self._inflight[client] = count
+                return False
+            if client in self._evicted:
+                self._evicted.discard(client)
+                return True
+            return False
+
+    def _evict(self, client: "openai.AsyncOpenAI") -> None:
+        # 진행 중인 호출이 있으면 마지막 호출이 끝날 때(_release) 닫는다
+        if client in self._inflight:
+            self._evicted.add(client)
+            return
+        try:
+            asyncio.get_running_loop().create_task(client.close())
+        except RuntimeError:
+            pass
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values()) + list(self._evicted)
+            self._clients.clear()
+            self._evicted.clear()
+        for client in clients:
+            await client.close()
+
+
+client_pool = AsyncClientPool(
+    max_clients=int(os.environ.get("LLM_CLIENT_POOL_SIZE", 32)),
+    max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", 20)),
+)
@@ -0,0 +1,208 @@
+"""로컬(CPU) 리뷰 분석 - 키워드 TF-IDF + 감성 어휘 점수
+
+LLM 호출 전에 가맹점/월 그룹을 로컬에서 먼저 분석한다.
+- 키워드: keywords.tokenize 후보(한글 단어, 중국어 2-gram)를 그룹 내 언급률(TF) × 데이터셋 전체
+  (체인) 기준 희소도(IDF)로 순위화 - 모든 가맹점에 흔한 단어보다 이 그룹에서 두드러진 단어가 위로
+- 감성: 긍정/부정 어휘 출현 수로 리뷰별 점수(-1~1). 부정 표현을 먼저 세고 지운 뒤 긍정 표현을 세므로
+  "불친절"/"不好吃" 의 "친절"/"好吃" 은 긍정으로 세지 않는다
+- digest: 위 결과를 LLM 프롬프트용 짧은 구조화 요약으로 (원문 대신 대표 리뷰 몇 건만 함께 전달)
+- fast_report: 모델 호출 없이 같은 리포트 스키마를 채움 (오프라인 빠른 리포트)
+모든 단계가 벡터 연산이라 10만 건도 수 초 안에 끝난다.
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from dedup import normalize_texts
+from keywords import tokenize
+from summarizer import estimate_tokens, pa, pc
+
+REPORT_MODES = ("llm", "digest", "fast")
+# llm: 대표 리뷰 원문 전체(기본), digest: 로컬 분석 요약 + 대표 리뷰 일부, fast: 모델 호출 없음 (digest/fast 는 선택)
+REPORT_MODE = os.environ.get("REPORT_MODE", "llm")
+DIGEST_COMMENTS = int(os.environ.get("DIGEST_COMMENTS", 30))
+LOCAL_KEYWORDS = 10
+# 그룹에서 이 건수 이상 언급된 단어만 키워드 후보 (그룹이 작으면 1)
+MIN_MENTIONS = 2
+
+POSITIVE_TERMS = (
+    "맛있", "맛나", "친절", "깨끗", "청결", "최고", "추천", "만족", "훌륭", "좋아", "좋았", "좋고", "좋은", "신선",
+    "부드럽", "가성비", "재방문", "또 올", "감사", "편안", "넓", "빠르",
+    "好吃", "美味", "好", "推荐", "满意", "干净", "热情", "新鲜", "不错", "棒", "赞", "喜欢", "周到", "划算",
+)
+NEGATIVE_TERMS = (
+    "맛없", "별로", "불친절", "더럽", "불결", "비싸", "짜요", "짜고", "느리", "실망", "최악", "불만", "아쉽",
+    "안 좋", "안좋", "불편", "냄새", "안 맛있",
+    "难吃", "不好", "不好吃", "差", "贵", "慢", "失望", "脏", "一般", "不新鲜", "不推荐", "态度不",
+)
+
+
+def _pattern(terms: tuple) -> str:
+    # 긴 표현부터 - 겹치는 표현("不好吃"/"不好")은 한 번만 매칭
+    return "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+
+
+_POSITIVE = _pattern(POSITIVE_TERMS)
+_NEGATIVE = _pattern(NEGATIVE_TERMS)
+
+
+def polarity_scores(texts: pd.Series) -> np.ndarray:
+    """리뷰별 어휘 감성 점수 (긍정-부정)/(긍정+부정), 어휘가 없으면 0"""
+    # 정규화로 공백이 한 칸씩 남으므로 "안 좋" 같은 띄어 쓴 표현도 그대로 매칭
+    normalized = normalize_texts(texts)
+    if pc is not None:
+        arr = pa.array(normalized, type=pa.string())
+        neg = pc.count_substring_regex(arr, _NEGATIVE).to_numpy().astype(np.int64)
+        pos = pc.count_substring_regex(pc.replace_substring_regex(arr, _NEGATIVE, " "), _POSITIVE).to_numpy().astype(np.int64)
+    else:
+        neg = normalized.str.count(_NEGATIVE).to_numpy(dtype=np.int64)
+        pos = normalized.str.replace(_NEGATIVE, " ", regex=True).str.count(_POSITIVE).to_numpy(dtype=np.int64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(pos + neg > 0, (pos - neg) / (pos + neg), 0.0)
+
+
+class KeywordBaseline:
+    """데이터셋 전체(체인)의 단어별 언급 리뷰 수 - IDF 기준"""
+
+    def __init__(self, doc_freq: Dict[str, int], n_docs: int):
+        self.doc_freq = doc_freq
+        self.n_docs = n_docs
+
+    @classmethod
+    def build(cls, texts: pd.Series) -> "KeywordBaseline":
+        rows, codes, vocab = tokenize(texts)
+        counts = np.bincount(codes, minlength=len(vocab))
+        return cls(dict(zip(vocab.tolist(), counts.tolist())), len(texts))
+
+    def idf(self, words: np.ndarray) -> np.ndarray:
+        df = np.fromiter((self.doc_freq.get(w, 0) for w in words), dtype=float, count=len(words))
+        return np.log((1 + self.n_docs) / (1 + df)) + 1
+
+
+def rank_keywords(texts: pd.Series, polarity: np.ndarray, ratings: np.ndarray,
+                  baseline: Optional[KeywordBaseline], top_k: int = LOCAL_KEYWORDS) -> List[Dict[str, Any]]:
+    """그룹 키워드 - TF-IDF 순, 리포트 keywords 스키마({tag, is_positive, desc}) + count/score"""
+    texts = texts.reset_index(drop=True)
+    rows, codes, vocab = tokenize(texts)
+    n = len(texts)
+    if not len(vocab) or n == 0:
+        return []
+    mentions = np.bincount(codes, minlength=len(vocab))
+    candidates = np.flatnonzero(mentions >= min(MIN_MENTIONS, max(1, n // 20)))
+    if not len(candidates):
+        return []
+    tf = mentions[candidates] / n
+    idf = baseline.idf(vocab[candidates]) if baseline is not None else np.ones(len(candidates))
+    scores = tf * idf
+
+    # 키워드 극성: 언급한 리뷰의 어휘 점수 평균, 어휘가 없으면 별점 평균(4 이상 긍정)
+    polarity_sum = np.bincount(codes, weights=polarity[rows], minlength=len(vocab))
+    rating = np.nan_to_num(ratings[rows].astype(float), nan=3.5)
+    rating_sum = np.bincount(codes, weights=rating, minlength=len(vocab))
+    hits = np.bincount(codes, weights=(polarity[rows] != 0).astype(float), minlength=len(vocab))
+
+    result = []
+    for i in np.lexsort((candidates, -scores))[:top_k]:
+        code = candidates[i]
+        count = int(mentions[code])
+        if hits[code]:
+            positive = polarity_sum[code] / count >= 0
+        else:
+            positive = rating_sum[code] / count >= 4.0
+        share = round(count / n * 100)
+        # 예시 리뷰: 키워드를 언급하고 극성이 같은 첫 리뷰 (없으면 첫 언급 리뷰)
+        mentioned = rows[codes == code]
+        same = mentioned[(polarity[mentioned] > 0) == positive]
+        example = texts.iloc[int(same[0] if len(same) else mentioned[0])]
+        result.append({
+            "tag": str(vocab[code]),
+            "is_positive": bool(positive),
+            "desc": f"리뷰 {count}건({share}%)에서 언급된 {'강점' if positive else '불만'} 키워드",
+            "count": count,
+            "score": round(float(scores[i]), 4),
+            "example": example,
+        })
+    return result
+
+
+def local_digest(df: pd.DataFrame, mapping: Dict[str, str], baseline: Optional[KeywordBaseline],
+                 top_k: int = LOCAL_KEYWORDS) -> Dict[str, Any]:
+    """그룹 로컬 분석 결과 - 키워드(예시 리뷰 포함), 어휘 감성 비율"""
+    texts = df[mapping['comment']].fillna('').astype(str)
+    polarity = polarity_scores(texts)
+    ratings = pd.to_numeric(df[mapping['rating']], errors='coerce').to_numpy(dtype=float)
+    n = len(texts)
+    pos, neg = int((polarity > 0).sum()), int((polarity < 0).sum())
+    return {
+        "keywords": rank_keywords(texts, polarity, ratings, baseline, top_k),
+        "reviews": n,
+        "polarity": {
+            "positive": round(pos / n * 100, 1) if n else 0,
+            "neutral": round((n - pos - neg) / n * 100, 1) if n else 0,
+            "negative": round(neg / n * 100, 1) if n else 0,
+            "score": round(float(polarity.mean()), 3) if n else 0,
+        },
+    }
+
+
+def report_keywords(digest: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """리포트 keywords 스키마로 ({tag, is_positive, desc})"""
+    return [{k: kw[k] for k in ("tag", "is_positive", "desc")} for kw in digest["keywords"]]
+
+
+def format_digest(digest: Dict[str, Any]) -> str:
+    """프롬프트용 한 줄 요약 (원문 리뷰 대신)"""
+    keywords = ", ".join(
+        f"{k['tag']}({k['count']}건, {'긍정' if k['is_positive'] else '부정'})" for k in digest["keywords"]
+    )
+    polarity = digest["polarity"]
+    return (f"어휘 기준 긍정 {polarity['positive']}% / 중립 {polarity['neutral']}% / 부정 {polarity['negative']}%; "
+            f"특징 키워드: {keywords or '없음'}")
+
+
+def prompt_usage(dedup: Dict[str, Any], comments: List[str], digest: Optional[Dict[str, Any]], mode: str) -> Dict[str, Any]:
+    """dedupe_frame 절감 통계를 실제로 만든 프롬프트 기준으로 (llm 은 그대로)
+
+    digest: 대표 리뷰 DIGEST_COMMENTS 건 + 로컬 분석 요약 줄, fast: 프롬프트 없음
+    """
+    if mode == "llm" or digest is None:
+        return dedup
+    if mode == "fast":
+        selected, prompt_tokens = 0, 0
+    else:
+        lines = comments[:DIGEST_COMMENTS]
+        selected = len(lines)
+        prompt_tokens = sum(estimate_tokens(f"- {c}") for c in lines) + estimate_tokens(format_digest(digest))
+    return {**dedup, "selected": selected, "prompt_tokens": prompt_tokens,
+            "saved_tokens": dedup["original_tokens"] - prompt_tokens}
+
+
+def fast_report(stats: Dict[str, Any], digest: Dict[str, Any]) -> Dict[str, Any]:
+    """모델 없이 로컬 분석만으로 채운 리포트 (analyze 응답과 같은 스키마)"""
+    keywords = digest["keywords"]
+    strengths = [k for k in keywords if k["is_positive"]]
+    issues = [k for k in keywords if not k["is_positive"]]
+    polarity = digest["polarity"]
+    total = stats.get("total_comments", 0)
+    top = ", ".join(k["tag"] for k in keywords[:3]) or "-"
+
+    def items(picked: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        return [{"title": k["tag"], "content": f"{k['desc']}. 예: \"{k['example'][:120]}\""} for k in picked[:3]]
+
+    action_plan = [f"'{k['tag']}' 관련 리뷰를 확인하고 개선 조치를 공유하세요" for k in issues[:3]]
+    if not action_plan and strengths:
+        action_plan = [f"강점인 '{strengths[0]['tag']}'을(를) 홍보 문구에 활용하세요"]
+    tone = "긍정적" if polarity["score"] > 0.2 else "부정적" if polarity["score"] < -0.2 else "엇갈리는"
+    return {
+        "summary": f"리뷰 {total}건, 평균 별점 {stats.get('rating_avg', 0)}점. 주요 키워드는 {top}이며 전반적으로 {tone} 반응입니다.",
+        "insight": (f"어휘 기준 긍정 {polarity['positive']}%, 부정 {polarity['negative']}%. "
+                    + (f"'{issues[0]['tag']}' 관련 불만이 두드러집니다." if issues else "두드러진 불만 키워드는 없습니다.")),
+        "sentiment": stats.get("sentiment_dist", {}),
+        "pros": items(strengths),
+        "cons": items(issues),
+        "keywords": report_keywords(digest),
+        "action_plan": action_plan,
+    }
@@ -0,0 +1,145 @@
+"""서버리스 함수(BaseHTTPRequestHandler)용 스트리밍 multipart/form-data 파서
+
+cgi.FieldStorage 는 (3.13 에서 제거 예정) 본문을 줄 단위로 읽어 바이너리 xlsx 를 수많은 작은
+조각으로 나누고 복사한다. 여기서는 python-multipart(FastAPI/Starlette 와 같은 파서)에 본문을
+블록 단위로 흘려보내며
+- 파일 파트는 SpooledTemporaryFile 에 바로 기록 (UPLOAD_SPOOL_BYTES 를 넘으면 디스크로 넘어감)
+- 일반 필드는 문자열로
+- Content-Length 와 실제 읽은 바이트 모두 UPLOAD_MAX_MB 로 제한 (넘으면 UploadTooLarge)
+스풀 파일 객체는 되감아 그대로 dataset_cache.get_or_load_file 에 넘긴다. (추가 복사 없음)
+"""
+import os
+import tempfile
+from typing import BinaryIO, Dict, List, Optional
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # pragma: no cover - python-multipart 0.0.12 이전 (모듈 이름 multipart)
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# 업로드 본문 최대 크기
+UPLOAD_MAX_MB = float(os.environ.get("UPLOAD_MAX_MB", 100))
+# 파일 파트를 메모리에 두는 최대 크기 (넘으면 임시 파일로)
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+READ_BLOCK = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class FormData:
+    """파싱된 폼 - cgi.FieldStorage 처럼 getvalue(name, default) 로 필드를 읽는다"""
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self.files: Dict[str, BinaryIO] = {}
+        self.filenames: Dict[str, str] = {}
+
+    def getvalue(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.fields.get(name, default)
+
+    def file(self, name: str) -> Optional[BinaryIO]:
+        return self.files.get(name)
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+
+def _disposition(headers: Dict[bytes, bytes]) -> tuple:
+    _, params = parse_options_header(headers.get(b"content-disposition"))
+    name = params.get(b"name")
+    filename = params.get(b"filename")
+    return (name.decode("utf-8", "replace") if name is not None else None,
+            filename.decode("utf-8", "replace") if filename is not None else None)
+
+
+def parse_form(rfile: BinaryIO, headers, max_bytes: Optional[int] = None,
+               spool_bytes: int = UPLOAD_SPOOL_BYTES) -> FormData:
+    """요청 본문(rfile)을 Content-Length 만큼 블록 단위로 읽어 파싱
+
+    Content-Type 이 multipart 가 아니거나 Content-Length 가 없으면 ValueError,
+    크기 제한을 넘으면 UploadTooLarge. 실패하면 이미 만든 임시 파일은 닫는다.
+    (메시지는 send_error 의 상태 줄에 그대로 쓰이므로 영문)
+    """
+    max_bytes = int(UPLOAD_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    content_type, params = parse_options_header(headers.get("Content-Type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Content-Type must be multipart/form-data")
+    try:
+        length = int(headers.get("Content-Length", ""))
+    except ValueError:
+        raise ValueError("Content-Length is required")
+    if length > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds the {max_bytes:,} byte limit")
+
+    form = FormData()
+    part_headers: Dict[bytes, bytes] = {}
+    field: List[bytes] = []
+    value: List[bytes] = []
+    state: Dict[str, object] = {}
+
+    def on_part_begin():
+        part_headers.clear()
+        state.update(name=None, target=None, chunks=None)
+
+    def on_header_field(data, start, end):
+        field.append(data[start:end])
+
+    def on_header_value(data, start, end):
+        value.append(data[start:end])
+
+    def on_header_end():
+        part_headers[b"".join(field).lower()] = b"".join(value)
+        field.clear()
+        value.clear()
+
+    def on_headers_finished():
+        name, filename = _disposition(part_headers)
+        state["name"] = name
+        if filename is not None and name is not None:
+            target = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+            state["target"] = target
+            form.files[name] = target
+            form.filenames[name] = filename
+        else:
+            state["chunks"] = []
+
+    def on_part_data(data, start, end):
+        target = state["target"]
+        if target is not None:
+            target.write(data[start:end])
+        else:
+            state["chunks"].append(data[start:end])
+
+    def on_part_end():
+        if state["target"] is not None:
+            state["target"].seek(0)
+        elif state["name"] is not None:
+            form.fields[state["name"]] = b"".join(state["chunks"]).decode("utf-8", "replace")
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    try:
+        remaining = length
+        while remaining > 0:
+            block = rfile.read(min(READ_BLOCK, remaining))
+            if not block:
+                raise ValueError("Request body is shorter than Content-Length")
+            remaining -= len(block)
+            parser.write(block)
+        parser.finalize()
+    except Exception:
+        form.close()
+        raise
+    return form
@@ -0,0 +1,142 @@
+"""리포트 분석 공통 코어 - FastAPI 앱(analyzer.py)과 Vercel 함수(api/*.py)가 함께 쓴다
+
+컬럼 매핑, 그룹 통계, 프롬프트 생성, AI 결과 캐시 키, 부정 리뷰 목록을 한 곳에 둔다.
+openai 는 모델을 실제로 호출할 때 처음 import 하므로 업로드/prepare/fast 리포트처럼
+모델을 부르지 않는 요청은 openai 로딩 시간(콜드 스타트의 상당 부분)을 치르지 않는다.
+"""
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from local_analysis import DIGEST_COMMENTS, format_digest
+from stats_engine import compute_group_stats, frame_stats, sentiment_dist
+from summarizer import complete_json, fits_single_prompt, format_stats, map_reduce_analyze
+from timing import record_llm
+
+if TYPE_CHECKING:
+    import openai
+
+
+class CommentAnalyzer:
+    # 프롬프트 템플릿을 바꾸면 올려서 기존 AI 결과 캐시를 무효화
+    PROMPT_VERSION = "3"
+
+    def __init__(self, api_key: str = ""):
+        self.api_key = api_key
+
+    def identify_columns(self, df: pd.DataFrame) -> Dict[str, str]:
+        cols = df.columns.tolist()
+        mapping = {}
+        for c in cols:
+            c_s = str(c).strip()
+            if any(k in c_s for k in ['가맹점', '지점', '매장']): mapping['franchise'] = c
+            if any(k in c_s for k in ['작성일', '날짜', 'Date']): mapping['date'] = c
+            if any(k in c_s for k in ['별점', '점수', 'Rating']): mapping['rating'] = c
+            if any(k in c_s for k in ['댓글내용(한글)', '한글댓글']): mapping['comment_ko'] = c
+            if any(k in c_s for k in ['댓글내용(중국어)', '중국어댓글']): mapping['comment_zh'] = c
+            if any(k in c_s for k in ['답글내용(한글)', '한글답글']): mapping['reply_ko'] = c
+
+        if 'comment_ko' not in mapping and 'comment_zh' not in mapping:
+            for c in cols:
+                if any(k in str(c) for k in ['댓글', 'Content', 'Comment']):
+                    mapping['comment'] = c
+                    break
+
+        if 'comment' not in mapping:
+            mapping['comment'] = mapping.get('comment_ko', mapping.get('comment_zh', cols[3] if len(cols)>3 else cols[0]))
+
+        if 'franchise' not in mapping: mapping['franchise'] = cols[0]
+        if 'date' not in mapping: mapping['date'] = cols[1] if len(cols)>1 else cols[0]
+        if 'rating' not in mapping: mapping['rating'] = cols[2] if len(cols)>2 else cols[0]
+        return mapping
+
+    def get_basic_stats(self, df: pd.DataFrame, date_col: str, rating_col: str) -> Dict[str, Any]:
+        """단일 프레임 통계 - stats_engine 으로 프레임 전체를 한 그룹으로 계산 (df 를 수정하지 않음)"""
+        return frame_stats(df, date_col, rating_col)
+
+    def calculate_sentiment_dist(self, df: pd.DataFrame, rating_col: str) -> Dict[str, int]:
+        rating = pd.to_numeric(df[rating_col], errors='coerce')
+        return sentiment_dist(len(df), int((rating >= 4.0).sum()), int((rating <= 3.0).sum()))
+
+    def get_grouped_stats(self, df: pd.DataFrame, franchise_col: str, date_col: str, rating_col: str) -> Dict[tuple, Dict[str, Any]]:
+        """(가맹점, 월) 그룹 전체의 get_basic_stats 결과를 한 번의 grouped 패스로 계산"""
+        return compute_group_stats(df, franchise_col, date_col, rating_col)
+
+    def build_prompt(self, comments: List[str], stats: Optional[Dict] = None, digest: Optional[Dict] = None) -> str:
+        # digest 가 있으면 로컬 분석 요약 + 대표 리뷰 일부만 전달 (없으면 기존 프롬프트 그대로)
+        local = f"\n로컬 분석: {format_digest(digest)}" if digest else ""
+        return f"""당신은 전문 데이터 분석가입니다. 다음 리뷰 데이터를 분석하여 JSON으로 응답하세요.
+모든 텍스트는 반드시 한글로 작성하세요. 키워드 설명(desc)은 한글 15~25자 내외로 작성하세요.
+리뷰 앞의 (×N)은 같거나 거의 같은 리뷰가 N건 있다는 뜻입니다.
+통계: {format_stats(stats)}{local}
+데이터: {chr(10).join([f"- {c}" for c in comments[:150]])}
+형식: {{"summary": "...", "insight": "...", "sentiment": {{"positive": 0, "neutral": 0, "negative": 0}}, "pros": [{{"title": "...", "content": "..."}}], "cons": [{{"title": "...", "content": "..."}}], "keywords": [{{"tag": "키워드", "is_positive": true, "desc": "15-25자 설명"}}], "action_plan": ["..."]}}
+"""
+
+    def prompt_fingerprint(self, comments: List[str], stats: Optional[Dict] = None, digest: Optional[Dict] = None) -> str:
+        """결과 캐시 키용 - 단일 프롬프트 또는 map-reduce 입력 전체"""
+        if digest:
+            return self.build_prompt(comments[:DIGEST_COMMENTS], stats, digest)
+        if fits_single_prompt(comments):
+            return self.build_prompt(comments, stats)
+        return "map-reduce\n" + format_stats(stats) + "\n" + "\n".join(str(c) for c in comments)
+
+    def analyze_comments(self, comments: List[str], franchise: str, month: str, stats: Dict, model: str,
+                         digest: Optional[Dict] = None) -> Dict:
+        """동기 분석 (Vercel 함수용) - analyze_comments_async 와 같은 분기, 요청마다 클라이언트 생성"""
+        if digest:
+            prompt = self.build_prompt(comments[:DIGEST_COMMENTS], stats, digest)
+        elif not fits_single_prompt(comments):
+            return asyncio.run(self._map_reduce(comments, stats, model))
+        else:
+            prompt = self.build_prompt(comments, stats)
+        import openai
+
+        try:
+            client = openai.OpenAI(api_key=self.api_key)
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"}
+            )
+            record_llm(model, response.usage)
+            return json.loads(response.choices[0].message.content)
+        except Exception as e:
+            raise Exception(f"AI 분석 실패: {str(e)}")
+
+    async def _map_reduce(self, comments: List[str], stats: Dict, model: str) -> Dict:
+        import openai
+
+        client = openai.AsyncOpenAI(api_key=self.api_key)
+        try:
+            return await map_reduce_analyze(client, comments, stats, model)
+        finally:
+            await client.close()
+
+    async def analyze_comments_async(self, client: "openai.AsyncOpenAI", comments: List[str], franchise: str, month: str, stats: Dict, model: str,
+                                     on_section: Optional[Callable[[str, Any], None]] = None, digest: Optional[Dict] = None) -> Dict:
+        """비동기 분석 - 한 프롬프트에 들어가면 단일 호출, 아니면 전체 리뷰 map-reduce
+
+        on_section 을 주면 응답을 스트리밍으로 받아 섹션이 완성될 때마다 호출한다.
+        digest(로컬 분석)가 있으면 요약 + 대표 리뷰 DIGEST_COMMENTS 건으로 항상 단일 호출.
+        """
+        if digest:
+            return await complete_json(client, self.build_prompt(comments[:DIGEST_COMMENTS], stats, digest), model, on_section)
+        if fits_single_prompt(comments):
+            return await complete_json(client, self.build_prompt(comments, stats), model, on_section)
+        return await map_reduce_analyze(client, comments, stats, model, on_section=on_section)
+
+
+def build_neg_reviews(df: pd.DataFrame, mapping: Dict[str, str], limit: int = 10) -> List[Dict[str, Any]]:
+    neg_reviews = []
+    for _, row in df[df[mapping['rating']] <= 3].head(limit).iterrows():
+        neg_reviews.append({
+            "date": str(row.get(mapping['date'], '')),
+            "rating": float(row.get(mapping['rating'], 0)),
+            "content_zh": str(row.get(mapping.get('comment_zh'), '')) if mapping.get('comment_zh') else "",
+            "content_ko": str(row.get(mapping.get('comment_ko'), '')) if mapping.get('comment_ko') else "",
+            "reply_ko": str(row.get(mapping.get('reply_ko'), '')) if mapping.get('reply_ko') else ""
+        })
+    return neg_reviews
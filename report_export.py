@@ -0,0 +1,685 @@
+"""서버 측 리포트 렌더링 - /api/analyze 결과(analysis/stats/neg_reviews/meta)를 PDF/PNG 로
+
+브라우저의 html2canvas + jsPDF 대신 reportlab 으로 sample report.pdf 와 같은 구성을 그린다.
+헤더 -> 리뷰가 가장 많았던 날 / 전체 분위기 -> 칭찬 / 아쉬운 점 -> 키워드 -> 한 달 요약 및 실행 제안 -> 주의 필요 댓글
+- PNG 는 같은 PDF 를 pypdfium2 로 래스터화해 페이지를 세로로 이어 붙인 한 장 (EXPORT_PNG_SCALE 배율)
+- 글꼴: 한글/중국어 TrueType 글꼴을 항상 PDF 에 임베드한다 (PNG 도 같은 PDF 를 그리므로 서버 글꼴과 무관)
+  REPORT_FONT_PATH(/REPORT_FONT_BOLD_PATH, 중국어 원문용 REPORT_FONT_ZH_PATH) 를 먼저 쓰고, 없으면
+  시스템 글꼴 디렉터리(+ REPORT_FONT_DIRS)에서 나눔고딕, WenQuanYi Zen Hei 등을 찾는다
+  한글/간체자 글리프가 실제로 있는 글꼴만 쓰며, 찾지 못하면 ExportUnavailable (빈 글자 리포트를 만들지 않음)
+- 렌더링 결과는 렌더링에 쓰는 필드의 해시로 EXPORT_CACHE_DIR 에 캐시 (EXPORT_CACHE_MAX_MB 초과 시 오래된 것부터 삭제)
+- 여러 리포트(월 일괄 내보내기)는 프로세스 풀(EXPORT_WORKERS)에서 병렬 렌더링
+
+reportlab / pypdfium2 / Pillow 는 렌더링할 때 처음 import 한다. (없으면 ExportUnavailable)
+"""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from timing import record_cache, span
+
+# 레이아웃을 바꾸면 올려서 기존 렌더링 캐시를 무효화
+TEMPLATE_VERSION = "2"
+FORMATS = ("pdf", "png")
+
+REPORT_FONT_PATH = os.environ.get("REPORT_FONT_PATH", "")
+REPORT_FONT_BOLD_PATH = os.environ.get("REPORT_FONT_BOLD_PATH", "")
+REPORT_FONT_ZH_PATH = os.environ.get("REPORT_FONT_ZH_PATH", "")
+# 글꼴을 찾을 디렉터리 (os.pathsep 구분, 시스템 글꼴 디렉터리보다 먼저)
+REPORT_FONT_DIRS = [d for d in os.environ.get("REPORT_FONT_DIRS", "").split(os.pathsep) if d]
+FONT_DIRS = ("/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+             os.path.expanduser("~/.local/share/fonts"), "/Library/Fonts", "/System/Library/Fonts")
+# 찾을 글꼴 파일 (우선순위 순) - 한글 본문용 / 중국어 원문용, 일반 -> 굵게
+KO_FONTS = ("NanumGothic.ttf", "NanumBarunGothic.ttf", "wqy-zenhei.ttc", "DroidSansFallbackFull.ttf", "UnDotum.ttf")
+ZH_FONTS = ("wqy-zenhei.ttc", "wqy-microhei.ttc", "DroidSansFallbackFull.ttf", "SimHei.ttf")
+BOLD_FONTS = {"NanumGothic.ttf": "NanumGothicBold.ttf", "NanumBarunGothic.ttf": "NanumBarunGothicBold.ttf"}
+# 글꼴이 실제로 담고 있어야 하는 글자 (한글 / 간체자)
+KO_SAMPLE = "가힣한글"
+ZH_SAMPLE = "务为们说时这"
+EXPORT_PNG_SCALE = float(os.environ.get("EXPORT_PNG_SCALE", 2.0))
+# 0 이면 CPU 수
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", 0)) or os.cpu_count() or 1
+# 표 셀 하나는 페이지를 넘겨 나눌 수 없으므로 댓글/답글 길이 제한
+TEXT_LIMIT = 1500
+
+# 색상 (ReportView.tsx 의 Tailwind 팔레트)
+BG = "#f8fafc"
+BLUE = "#315ae7"
+INDIGO = "#4f46e5"
+BLUE_600 = "#2563eb"
+BLUE_50 = "#eff6ff"
+SLATE_800 = "#1e293b"
+SLATE_600 = "#475569"
+SLATE_400 = "#94a3b8"
+SLATE_100 = "#f1f5f9"
+DARK = "#0f172a"
+ROSE_50 = "#fff1f2"
+ROSE_100 = "#ffe4e6"
+ROSE_600 = "#e11d48"
+ROSE_700 = "#be123c"
+AMBER = "#d97706"
+SENTIMENT_COLORS = (("긍정", "positive", "#3b82f6"), ("중립", "neutral", "#94a3b8"), ("부정", "negative", "#ef4444"))
+
+
+class ExportUnavailable(RuntimeError):
+    """렌더링 라이브러리가 설치되지 않음"""
+
+
+def render_fields(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """렌더링에 쓰는 필드만 (meta.cached/dedup 처럼 결과 모양과 무관한 값은 캐시 키에서 제외)"""
+    meta = payload.get("meta") or {}
+    return {
+        "analysis": payload.get("analysis") or {},
+        "stats": payload.get("stats") or {},
+        "neg_reviews": payload.get("neg_reviews") or [],
+        "franchise": meta.get("franchise", ""),
+        "month": meta.get("month", ""),
+    }
+
+
+def render_fields_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """프로세스 풀로 보낼 최소 payload"""
+    fields = render_fields(payload)
+    return {"analysis": fields["analysis"], "stats": fields["stats"], "neg_reviews": fields["neg_reviews"],
+            "meta": {"franchise": fields["franchise"], "month": fields["month"]}}
+
+
+def payload_key(payload: Dict[str, Any], fmt: str, fonts: Optional[Dict[str, str]] = None) -> str:
+    """렌더링 캐시 키 - 내용, 형식, 템플릿 버전, 사용한 글꼴 파일"""
+    data = json.dumps([TEMPLATE_VERSION, fmt, EXPORT_PNG_SCALE if fmt == "png" else None, render_fields(payload),
+                       sorted((fonts or {}).items())], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def export_filename(payload: Dict[str, Any], fmt: str) -> str:
+    """ReportView 의 저장 파일명과 같은 형식 (경로 구분자는 _ 로)"""
+    fields = render_fields(payload)
+    name = f"{fields['franchise']}_분석리포트_{fields['month']}.{fmt}"
+    return name.replace("/", "_").replace("\\", "_")
+
+
+# --- 글꼴 ---
+
+_fonts: Dict[str, str] = {}
+_font_paths: Optional[Dict[str, str]] = None
+
+
+def _covers(path: str, sample: str) -> bool:
+    """임베드 가능한 TrueType 이고 sample 글자를 모두 담고 있는지 (CFF 기반 OTF 등은 False)"""
+    from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+    try:
+        glyphs = TTFont("_probe", path).face.charToGlyph
+    except (OSError, TTFError):
+        return False
+    return all(ord(ch) in glyphs for ch in sample)
+
+
+def _find_font(names, sample: str, located: Dict[str, str]) -> str:
+    for name in names:
+        path = located.get(name.lower())
+        if path and _covers(path, sample):
+            return path
+    return ""
+
+
+def resolve_fonts() -> Dict[str, str]:
+    """{"regular", "bold", "zh"} 글꼴 파일 경로 - 프로세스당 한 번 (찾지 못하면 ExportUnavailable)"""
+    global _font_paths
+    if _font_paths is not None:
+        return _font_paths
+    try:
+        import reportlab  # noqa: F401
+    except ImportError as e:
+        raise ExportUnavailable("리포트 내보내기에는 reportlab 이 필요합니다") from e
+
+    located: Dict[str, str] = {}
+    wanted = {name.lower() for name in KO_FONTS + ZH_FONTS + tuple(BOLD_FONTS.values())}
+    for root_dir in REPORT_FONT_DIRS + list(FONT_DIRS):
+        for root, _, files in os.walk(root_dir):
+            for name in files:
+                if name.lower() in wanted:
+                    located.setdefault(name.lower(), os.path.join(root, name))
+
+    regular = REPORT_FONT_PATH if REPORT_FONT_PATH and _covers(REPORT_FONT_PATH, KO_SAMPLE) else ""
+    regular = regular or _find_font(KO_FONTS, KO_SAMPLE, located)
+    if not regular:
+        raise ExportUnavailable("한글 TrueType 글꼴이 없습니다. REPORT_FONT_PATH 를 지정하거나 나눔고딕(fonts-nanum)을 설치하세요")
+    bold = REPORT_FONT_BOLD_PATH
+    if not bold:
+        bold_name = BOLD_FONTS.get(os.path.basename(regular))
+        bold = located.get(bold_name.lower(), "") if bold_name else ""
+        if bold_name and not bold and os.path.exists(os.path.join(os.path.dirname(regular), bold_name)):
+            bold = os.path.join(os.path.dirname(regular), bold_name)
+    if bold and not _covers(bold, KO_SAMPLE):
+        bold = ""
+    zh = REPORT_FONT_ZH_PATH if REPORT_FONT_ZH_PATH and _covers(REPORT_FONT_ZH_PATH, ZH_SAMPLE) else ""
+    zh = zh or (regular if _covers(regular, ZH_SAMPLE) else "") or _find_font(ZH_FONTS, ZH_SAMPLE, located)
+    if not zh:
+        raise ExportUnavailable("중국어(간체) TrueType 글꼴이 없습니다. REPORT_FONT_ZH_PATH 를 지정하거나 "
+                                "WenQuanYi Zen Hei(fonts-wqy-zenhei)를 설치하세요")
+    _font_paths = {"regular": regular, "bold": bold or regular, "zh": zh}
+    return _font_paths
+
+
+def _register_fonts() -> Dict[str, str]:
+    """프로세스당 한 번 등록 -> {"regular", "bold", "zh"} 글꼴 이름 (항상 임베드되는 TrueType)"""
+    if _fonts:
+        return _fonts
+    from reportlab.lib.fonts import addMapping
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    paths = resolve_fonts()
+    names = {"regular": "Report", "bold": "Report-Bold", "zh": "ReportZH"}
+    for role, name in names.items():
+        pdfmetrics.registerFont(TTFont(name, paths[role]))
+    # Paragraph 의 <b> 를 굵은 글꼴로
+    for name, bold_name in ((names["regular"], names["bold"]), (names["zh"], names["zh"])):
+        addMapping(name, 0, 0, name)
+        addMapping(name, 1, 0, bold_name)
+        addMapping(name, 0, 1, name)
+        addMapping(name, 1, 1, bold_name)
+    _fonts.update(names)
+    return _fonts
+
+
+def check_available(fmt: str) -> None:
+    """렌더링 전에 라이브러리/글꼴 확인 (없으면 ExportUnavailable) - 월 일괄 내보내기가 분석부터 하지 않도록"""
+    resolve_fonts()
+    if fmt == "png":
+        try:
+            import PIL  # noqa: F401
+            import pypdfium2  # noqa: F401
+        except ImportError as e:
+            raise ExportUnavailable("PNG 내보내기에는 pypdfium2 와 Pillow 가 필요합니다") from e
+
+
+# --- PDF ---
+
+def _text(value: Any, limit: Optional[int] = None) -> str:
+    """Paragraph 마크업용 이스케이프 (줄바꿈 유지)"""
+    text = "" if value is None else str(value)
+    if limit is not None and len(text) > limit:
+        text = text[:limit] + "…"
+    return escape(text).replace("\n", "<br/>")
+
+
+def _number(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value if value is not None else 0)
+
+
+class _Layout:
+    """문단 스타일과 카드/표 도우미 - 렌더링 한 번에 하나"""
+
+    def __init__(self, width: float):
+        from reportlab.lib.styles import ParagraphStyle
+
+        fonts = _register_fonts()
+        self.width = width
+        self.fonts = fonts
+
+        def style(name, size, color, font="regular", leading=None, **kwargs):
+            return ParagraphStyle(name, fontName=fonts[font], fontSize=size, leading=leading or size * 1.45,
+                                  textColor=color, **kwargs)
+
+        self.card_title = style("card_title", 13, SLATE_800, "bold", spaceAfter=8)
+        self.body = style("body", 9.5, SLATE_600)
+        self.strong = style("strong", 11, SLATE_800, "bold", spaceAfter=2)
+        self.label = style("label", 8, SLATE_400, "bold", spaceAfter=4)
+        self.small = style("small", 8.5, SLATE_600)
+        self.zh = style("zh", 8.5, SLATE_600, "zh", wordWrap="CJK")
+        self.ko = style("ko", 10.5, SLATE_800, leading=16)
+        self.right = style("right", 11, BLUE_600, "bold", alignment=2)
+
+    def para(self, text: str, style, **overrides):
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.platypus import Paragraph
+
+        if overrides:
+            style = ParagraphStyle(f"{style.name}_x", parent=style, **overrides)
+        return Paragraph(text, style)
+
+    def card(self, rows: List[List[Any]], width: float, background: str = "#ffffff", border: str = SLATE_100,
+             padding: float = 16, radius: float = 12, extra: Optional[List] = None):
+        """한 열 표로 만든 카드 - 행 단위로 페이지를 넘겨 나뉜다"""
+        from reportlab.platypus import Table, TableStyle
+
+        table = Table(rows, colWidths=[width])
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), background),
+            ("BOX", (0, 0), (-1, -1), 0.8, border),
+            ("ROUNDEDCORNERS", [radius] * 4),
+            ("LEFTPADDING", (0, 0), (-1, -1), padding),
+            ("RIGHTPADDING", (0, 0), (-1, -1), padding),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("TOPPADDING", (0, 0), (-1, 0), padding),
+            ("BOTTOMPADDING", (0, -1), (-1, -1), padding),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ] + (extra or [])))
+        return table
+
+    def box(self, content: List[Any], width: float, background: str, border: Optional[str] = None, padding: float = 8):
+        """카드 안의 둥근 배경 상자"""
+        return self.card([[content]], width - 0.1, background, border or background, padding=padding, radius=8)
+
+
+class _Header:
+    """그라디언트 헤더 (Flowable 은 reportlab import 후에 만든다)"""
+
+    @staticmethod
+    def build(layout: _Layout, fields: Dict[str, Any]):
+        from reportlab.lib import colors
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.platypus import Flowable
+
+        stats = fields["stats"]
+        fonts = layout.fonts
+
+        class Header(Flowable):
+            def __init__(self):
+                super().__init__()
+                self.height = 112
+
+            def wrap(self, available_width, available_height):
+                self.width = available_width
+                return self.width, self.height
+
+            def draw(self):
+                c = self.canv
+                c.saveState()
+                path = c.beginPath()
+                path.roundRect(0, 0, self.width, self.height, 16)
+                c.clipPath(path, stroke=0, fill=0)
+                c.linearGradient(0, 0, self.width, 0, (colors.HexColor(BLUE), colors.HexColor(INDIGO)), extend=True)
+                c.restoreState()
+
+                c.setFillColor(colors.white)
+                c.setFont(fonts["regular"], 9.5)
+                c.drawString(24, self.height - 30, f"{fields['month']} 분석 리포트")
+                title = f"{fields['franchise']} 고객 리뷰 분석"
+                size = 22
+                while size > 12 and stringWidth(title, fonts["bold"], size) > self.width - 48:
+                    size -= 1
+                c.setFont(fonts["bold"], size)
+                c.drawString(24, self.height - 60, title)
+
+                x = 24
+                for label, value, unit in (("총 ", stats.get("total_comments", 0), "개의 리뷰"),
+                                           ("일 평균 ", stats.get("daily_avg", 0), "개"),
+                                           ("평점 ", stats.get("rating_avg", 0), "점")):
+                    for text, font, font_size in ((label, "regular", 10), (_number(value), "bold", 16), (unit, "regular", 10)):
+                        c.setFont(fonts[font], font_size)
+                        c.drawString(x, 22, text)
+                        x += stringWidth(text, fonts[font], font_size)
+                    x += 24
+
+        return Header()
+
+
+def _top_dates_card(layout: _Layout, fields: Dict[str, Any], width: float):
+    from reportlab.platypus import Table, TableStyle
+
+    rows = [[layout.para("리뷰가 가장 많았던 날", layout.card_title)]]
+    inner = width - 32
+    for i, item in enumerate(fields["stats"].get("top_dates") or []):
+        row = Table([[layout.para(f"<b>{i + 1}</b>", layout.small, alignment=1),
+                      layout.para(_text(item.get("date")), layout.strong),
+                      layout.para(f"{_number(item.get('count'))}건", layout.right)]],
+                    colWidths=[22, inner - 22 - 60, 60])
+        row.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), BG),
+            ("ROUNDEDCORNERS", [8] * 4),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("TOPPADDING", (0, 0), (-1, -1), 7),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
+        ]))
+        rows.append([row])
+    if len(rows) == 1:
+        rows.append([layout.para("리뷰 날짜 정보가 없습니다.", layout.body)])
+    return layout.card(rows, width)
+
+
+def _sentiment_card(layout: _Layout, fields: Dict[str, Any], width: float):
+    from reportlab.graphics.charts.doughnut import Doughnut
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    analysis = fields["analysis"]
+    sentiment = analysis.get("sentiment") or fields["stats"].get("sentiment_dist") or {}
+    values = [(name, float(sentiment.get(key) or 0), color) for name, key, color in SENTIMENT_COLORS]
+
+    drawing = Drawing(96, 96)
+    chart = Doughnut()
+    chart.x = chart.y = 4
+    chart.width = chart.height = 88
+    chart.innerRadiusFraction = 0.62
+    shown = [(value, color) for _, value, color in values if value > 0] or [(1, SLATE_100)]
+    chart.data = [value for value, _ in shown]
+    chart.labels = None
+    chart.slices.strokeWidth = 0
+    for i, (_, color) in enumerate(shown):
+        chart.slices[i].fillColor = colors.HexColor(color)
+    drawing.add(chart)
+
+    legend = Table([[layout.para(f'<font color="{color}">●</font> {name}', layout.body),
+                     layout.para(f"<b>{_number(value)}%</b>", layout.body, alignment=2, textColor=SLATE_800)]
+                    for name, value, color in values], colWidths=[60, width - 32 - 96 - 60 - 12])
+    legend.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "MIDDLE")]))
+    chart_row = Table([[drawing, legend]], colWidths=[96 + 12, width - 32 - 96 - 12])
+    chart_row.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                                   ("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0)]))
+    rows = [[layout.para("전체 분위기 (감성 분석)", layout.card_title)], [chart_row]]
+    if analysis.get("summary"):
+        rows.append([layout.box([layout.para(_text(analysis["summary"]), layout.body)], width - 32, BG)])
+    return layout.card(rows, width)
+
+
+def _pros_cons(layout: _Layout, fields: Dict[str, Any], width: float):
+    """칭찬 / 아쉬운 점 두 열 - 항목 i 를 같은 행에 두어 행 단위로 페이지를 넘긴다"""
+    from reportlab.platypus import Table, TableStyle
+
+    analysis = fields["analysis"]
+    gap = 14
+    column = (width - gap) / 2
+    inner = column - 32
+    pros = [[layout.para(f'<font color="{BLUE_600}">●</font> {_text(item.get("title"))}', layout.strong),
+             layout.para(f'"{_text(item.get("content"))}"', layout.body, leftIndent=10)]
+            for item in analysis.get("pros") or []]
+    cons = [[layout.box([layout.para(_text(item.get("title")), layout.strong, textColor=ROSE_700),
+                         layout.para(_text(item.get("content")), layout.body, textColor=ROSE_600)],
+                        inner, ROSE_50, ROSE_100)]
+            for item in analysis.get("cons") or []]
+    rows = [[layout.para("고객들이 칭찬했어요", layout.card_title), "", layout.para("이런 점은 아쉬워요", layout.card_title)]]
+    for i in range(max(len(pros), len(cons), 1)):
+        rows.append([pros[i] if i < len(pros) else "", "", cons[i] if i < len(cons) else ""])
+    table = Table(rows, colWidths=[column, gap, column])
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (0, -1), "#ffffff"),
+        ("BACKGROUND", (2, 0), (2, -1), "#ffffff"),
+        ("BOX", (0, 0), (0, -1), 0.8, SLATE_100),
+        ("BOX", (2, 0), (2, -1), 0.8, SLATE_100),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 16),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 16),
+        ("LEFTPADDING", (1, 0), (1, -1), 0),
+        ("RIGHTPADDING", (1, 0), (1, -1), 0),
+        ("TOPPADDING", (0, 0), (-1, 0), 16),
+        ("BOTTOMPADDING", (0, -1), (-1, -1), 16),
+    ]))
+    return table
+
+
+def _keywords_card(layout: _Layout, fields: Dict[str, Any], width: float):
+    pills = []
+    for item in fields["analysis"].get("keywords") or []:
+        positive = item.get("is_positive", True)
+        color, background = (BLUE_600, BLUE_50) if positive else (ROSE_700, ROSE_50)
+        tag = str(item.get("tag", "")).replace("#", "")
+        desc = f' <font size="7.5">({_text(item.get("desc"))})</font>' if item.get("desc") else ""
+        pills.append(f'<font backColor="{background}" color="{color}">&nbsp;<b>#{_text(tag)}</b>{desc}&nbsp;</font>')
+    body = "&nbsp;&nbsp; ".join(pills) or "키워드가 없습니다."
+    return layout.card([[layout.para("자주 등장한 키워드", layout.card_title)],
+                        [layout.para(body, layout.body, leading=22)]], width)
+
+
+def _action_card(layout: _Layout, fields: Dict[str, Any], width: float):
+    from reportlab.platypus import Table, TableStyle
+
+    analysis = fields["analysis"]
+    light = dict(textColor="#e2e8f0")
+    rows = [
+        [layout.para('<font color="#facc15">●</font> 한 달 요약 및 실행 제안', layout.card_title, textColor="#ffffff")],
+        [layout.para("총평", layout.label)],
+        [layout.para(_text(analysis.get("insight") or analysis.get("summary")), layout.ko, **light)],
+    ]
+    plans = [str(plan) for plan in analysis.get("action_plan") or []]
+    if plans:
+        rows.append([layout.para("다음 달을 위한 ACTION PLAN", layout.label, spaceBefore=8)])
+        gap = 10
+        cell = (width - 32 - gap) / 2
+        for i in range(0, len(plans), 2):
+            cells = []
+            for n, plan in enumerate(plans[i:i + 2], start=i + 1):
+                item = Table([[layout.para(f"<b>{n}</b>", layout.small, alignment=1, textColor="#ffffff"),
+                               layout.para(_text(plan), layout.body, **light)]], colWidths=[22, cell - 22])
+                item.setStyle(TableStyle([
+                    ("BACKGROUND", (0, 0), (-1, -1), SLATE_800),
+                    ("BACKGROUND", (0, 0), (0, 0), BLUE_600),
+                    ("ROUNDEDCORNERS", [8] * 4),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                    ("TOPPADDING", (0, 0), (-1, -1), 8),
+                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+                ]))
+                cells.append(item)
+            pair = Table([cells + [""] * (2 - len(cells))], colWidths=[cell + gap, cell])
+            pair.setStyle(TableStyle([("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+                                      ("VALIGN", (0, 0), (-1, -1), "TOP")]))
+            rows.append([pair])
+    return layout.card(rows, width, DARK, DARK, padding=20)
+
+
+def _negative_card(layout: _Layout, fields: Dict[str, Any], width: float):
+    """주의 필요 댓글 - 리뷰마다 머리/원문/번역/답글을 각각 한 행으로 (긴 리뷰도 행 단위로 나뉨)"""
+    from reportlab.platypus import Table, TableStyle
+
+    reviews = fields["neg_reviews"]
+    inner = width - 32
+    content = inner - 24
+    rows = [[layout.para(f"주의 필요 댓글 (별점 3점 이하) - 총 {len(reviews)}개", layout.card_title, textColor=ROSE_700)],
+            [layout.para("사장님께서 꼭 확인하고 대응해야 할 댓글들입니다.", layout.small, textColor=ROSE_600)]]
+    style = []
+    for review in reviews:
+        start = len(rows)
+        head = Table([[layout.para(f'<font color="{AMBER}"><b>★ {_number(review.get("rating"))}점</b></font>', layout.strong),
+                       layout.para(_text(review.get("date")), layout.small, alignment=2, textColor=SLATE_400)]],
+                     colWidths=[content / 2, content / 2])
+        head.setStyle(TableStyle([("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0)]))
+        rows.append([head])
+        if review.get("content_zh"):
+            rows.append([[layout.para("[중국어 원문]", layout.label),
+                          layout.box([layout.para(_text(review["content_zh"], TEXT_LIMIT), layout.zh)], content, BG)]])
+        if review.get("content_ko"):
+            rows.append([[layout.para("[한글 번역]", layout.label),
+                          layout.para(_text(review["content_ko"], TEXT_LIMIT), layout.ko)]])
+        if review.get("reply_ko"):
+            rows.append([[layout.para(f'<font color="{BLUE_600}">[답글 현황]</font>', layout.label),
+                          layout.box([layout.para(_text(review["reply_ko"], TEXT_LIMIT), layout.small)], content, BLUE_50)]])
+        end = len(rows) - 1
+        # 리뷰 하나 = 흰 배경 행 묶음, 리뷰 사이는 분홍 선으로 띄운다
+        style += [
+            ("BACKGROUND", (0, start), (0, end), "#ffffff"),
+            ("LINEABOVE", (0, start), (0, start), 10, ROSE_50),
+            ("LEFTPADDING", (0, start), (0, end), 28),
+            ("RIGHTPADDING", (0, start), (0, end), 28),
+            ("TOPPADDING", (0, start), (0, start), 18),
+            ("BOTTOMPADDING", (0, end), (0, end), 12),
+        ]
+    if not reviews:
+        rows.append([layout.para("별점 3점 이하 댓글이 없습니다.", layout.body)])
+    return layout.card(rows, width, ROSE_50, ROSE_100, extra=style)
+
+
+def render_pdf(payload: Dict[str, Any]) -> bytes:
+    """A4 세로 PDF"""
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.platypus import SimpleDocTemplate, Spacer, Table, TableStyle
+    except ImportError as e:
+        raise ExportUnavailable("PDF 내보내기에는 reportlab 이 필요합니다") from e
+
+    fields = render_fields(payload)
+    buffer = io.BytesIO()
+    margin = 12 * mm
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=margin, rightMargin=margin, topMargin=margin,
+                            bottomMargin=margin, title=f"{fields['franchise']} {fields['month']} 리뷰 분석",
+                            author="RE-REPORT")
+    width = A4[0] - 2 * margin
+    layout = _Layout(width)
+    gap = 14
+    half = (width - gap) / 2
+
+    top = Table([[_top_dates_card(layout, fields, half), "", _sentiment_card(layout, fields, half)]],
+                colWidths=[half, gap, half])
+    top.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP"),
+                             ("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0)]))
+    story = [
+        _Header.build(layout, fields), Spacer(1, gap),
+        top, Spacer(1, gap),
+        _pros_cons(layout, fields, width), Spacer(1, gap),
+        _keywords_card(layout, fields, width), Spacer(1, gap),
+        _action_card(layout, fields, width), Spacer(1, gap),
+        _negative_card(layout, fields, width),
+    ]
+
+    def background(canvas, _doc):
+        canvas.saveState()
+        canvas.setFillColor(colors.HexColor(BG))
+        canvas.rect(0, 0, A4[0], A4[1], stroke=0, fill=1)
+        canvas.restoreState()
+
+    doc.build(story, onFirstPage=background, onLaterPages=background)
+    return buffer.getvalue()
+
+
+def pdf_to_png(pdf: bytes, scale: float = EXPORT_PNG_SCALE) -> bytes:
+    """PDF 페이지를 래스터화해 세로로 이어 붙인 PNG 한 장"""
+    try:
+        import pypdfium2 as pdfium
+        from PIL import Image
+    except ImportError as e:
+        raise ExportUnavailable("PNG 내보내기에는 pypdfium2 와 Pillow 가 필요합니다") from e
+
+    document = pdfium.PdfDocument(pdf)
+    try:
+        pages = [document[i].render(scale=scale).to_pil() for i in range(len(document))]
+    finally:
+        document.close()
+    image = Image.new("RGB", (max(p.width for p in pages), sum(p.height for p in pages)), BG)
+    y = 0
+    for page in pages:
+        image.paste(page, (0, y))
+        y += page.height
+    out = io.BytesIO()
+    image.save(out, format="PNG", optimize=False, compress_level=6)
+    return out.getvalue()
+
+
+def render_report(payload: Dict[str, Any], fmt: str) -> bytes:
+    """프로세스 풀에서 실행하는 렌더링 함수 (모듈 최상위 - pickle 가능)"""
+    pdf = render_pdf(payload)
+    return pdf if fmt == "pdf" else pdf_to_png(pdf)
+
+
+# --- 캐시 / 병렬 렌더링 ---
+
+class ExportCache:
+    """렌더링 결과 파일 캐시 - 키는 payload_key, 전체 크기 기준으로 오래 쓰지 않은 파일부터 삭제"""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        path = self.path_for(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, fmt: str, data: bytes) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path_for(key, fmt)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._evict()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+
+class ReportExporter:
+    """캐시 조회 후 미스만 프로세스 풀에서 렌더링 (풀은 처음 렌더링할 때 생성)"""
+
+    def __init__(self, cache: ExportCache, workers: int = EXPORT_WORKERS):
+        self.cache = cache
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+
+                # 스레드가 있는 서버 프로세스를 fork 하지 않도록 spawn
+                self._pool = ProcessPoolExecutor(max_workers=max(1, self.workers),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    async def render(self, payload: Dict[str, Any], fmt: str) -> bytes:
+        """-> 렌더링된 바이트 (같은 내용이면 캐시)"""
+        from starlette.concurrency import run_in_threadpool
+
+        await run_in_threadpool(check_available, fmt)
+        key = payload_key(payload, fmt, resolve_fonts())
+        cached = await run_in_threadpool(self.cache.get, key, fmt)
+        record_cache("export", cached is not None)
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        with span("render", profiled=False):
+            data = await loop.run_in_executor(self._executor(), render_report, render_fields_payload(payload), fmt)
+        await run_in_threadpool(self.cache.put, key, fmt, data)
+        return data
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+report_exporter = ReportExporter(ExportCache(
+    os.environ.get("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "review-report-exports")),
+    max_bytes=int(float(os.environ.get("EXPORT_CACHE_MAX_MB", 256)) * 1024 * 1024),
+))
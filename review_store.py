@@ -0,0 +1,208 @@
+"""월 단위 append-only 리뷰 저장소
+
+매달 누적 내보내기를 다시 올리면 지난달까지의 데이터는 그대로인데 전체를 다시 분석하게 된다.
+/api/prepare 에서 정규화된 데이터셋을 이 저장소와 비교해 새 행/바뀐 행만 월 파티션에 추가한다.
+
+- 행 키: (가맹점, 작성 시각, 댓글) 해시 + 같은 키 안의 순번(내용 해시 순) / 내용 해시: 정규화된 전체 컬럼 해시
+  (날짜만 있는 내보내기의 같은 날 "맛있어요" 여러 건처럼 키가 같은 별개 리뷰도 각각 저장)
+- 파티션: {REVIEW_STORE_DIR}/{YYYY-MM}/part-00001.arrow ... (Arrow IPC, 추가만 하고 수정하지 않음)
+  같은 키가 다시 들어오면(답글 추가, 별점 수정 등) 새 버전을 뒤 파트에 추가하고 읽을 때 마지막 버전을 사용
+- manifest.json: 월별 행 수, 내용 digest, 가맹점별/전체 요약(통계 + 키워드, trend.month_summaries),
+  업로드(dataset_id)별 변경된 월
+
+바뀌지 않은 월은 digest/통계가 그대로 유지되고, 같은 행으로 만든 프롬프트도 같으므로
+AI 결과 캐시(llm_cache)도 그대로 적중한다. 새 월(또는 바뀐 월)만 다시 분석하면 된다.
+pyarrow 가 없으면 저장소를 건너뛴다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import pa, feather
+from trend import Summaries, month_summaries
+
+KEY_COLUMNS = ('franchise', 'date', 'comment')
+# manifest 에 변경 월을 기억해 두는 최근 업로드 수
+MAX_UPLOADS = 64
+
+
+def month_labels(dates: pd.Series) -> pd.Series:
+    return dates.dt.strftime('%Y-%m')
+
+
+def content_hashes(df: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def row_keys(df: pd.DataFrame, columns: Dict[str, str], hashes: Optional[np.ndarray] = None) -> np.ndarray:
+    """(가맹점, 작성 시각, 댓글) 안정 해시 + 같은 키 안의 순번 - 파일 간 행 순서와 무관
+
+    순번은 같은 키의 행들을 내용 해시 순으로 정렬해 매기므로, 다음 누적 내보내기에서 순서가 바뀌어도 같은 키가 나온다.
+    n 번째(n >= 1) 행은 (해시, n) 을 다시 해시한다. 첫 행은 해시 그대로라 키가 겹치지 않는 행은 기존 저장소와 호환.
+    """
+    frame = pd.DataFrame({key: df[columns[key]] for key in KEY_COLUMNS})
+    keys = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    if len(keys) == 0:
+        return keys
+    if hashes is None:
+        hashes = content_hashes(df)
+    order = np.lexsort((hashes, keys))
+    sorted_keys = keys[order]
+    positions = np.arange(len(keys))
+    starts = np.maximum.accumulate(np.where(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]], positions, 0))
+    occurrence = np.empty(len(keys), dtype=np.int64)
+    occurrence[order] = positions - starts
+    repeated = occurrence > 0
+    if repeated.any():
+        keys = keys.copy()
+        pairs = pd.DataFrame({"key": keys[repeated], "n": occurrence[repeated]})
+        keys[repeated] = pd.util.hash_pandas_object(pairs, index=False).to_numpy()
+    return keys
+
+
+def digest(keys: np.ndarray, hashes: np.ndarray) -> str:
+    order = np.lexsort((hashes, keys))
+    return hashlib.sha256(keys[order].tobytes() + hashes[order].tobytes()).hexdigest()[:16]
+
+
+class ReviewStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # (mtime, size) 가 같으면 manifest 를 다시 파싱하지 않음 (추이 요청을 밀리초 단위로)
+        self._manifest_cache: Optional[tuple] = None
+
+    @property
+    def enabled(self) -> bool:
+        return feather is not None
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def manifest(self) -> Dict[str, Any]:
+        """현재 manifest (캐시된 객체이므로 읽기 전용으로 사용)"""
+        try:
+            stat = os.stat(self._manifest_path())
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._manifest_cache is None or self._manifest_cache[0] != signature:
+                with open(self._manifest_path(), encoding="utf-8") as f:
+                    self._manifest_cache = (signature, json.load(f))
+            return self._manifest_cache[1]
+        except (OSError, ValueError):
+            return {"months": {}, "uploads": {}}
+
+    def summaries(self) -> Summaries:
+        """월 -> 가맹점 -> 요약 (추이 리포트용, 원본 행을 읽지 않음)"""
+        return {month: entry.get("groups", {}) for month, entry in self.manifest()["months"].items()}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._manifest_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _parts(self, month: str) -> List[str]:
+        directory = os.path.join(self.directory, month)
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".arrow")]
+
+    def _read_parts(self, month: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        parts = [feather.read_table(path, columns=columns, memory_map=True) for path in self._parts(month)]
+        if not parts:
+            return None
+        return pa.concat_tables(parts, promote_options="permissive").to_pandas()
+
+    def load_month(self, month: str) -> Optional[pd.DataFrame]:
+        """월의 현재 행 - 처음 들어온 순서, 값은 키별 마지막 버전 (row_key/row_hash 컬럼 포함)"""
+        frame = self._read_parts(month)
+        if frame is None:
+            return None
+        latest = frame.drop_duplicates('row_key', keep='last').set_index('row_key')
+        first_seen = frame['row_key'].drop_duplicates(keep='first')
+        return latest.loc[first_seen.to_numpy()].reset_index()
+
+    def ingest(self, dataset_id: str, df: pd.DataFrame, columns: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """업로드된 데이터셋을 월 파티션과 비교해 새 행/바뀐 행만 추가하고 월별 변경 요약 반환
+
+        같은 dataset_id 를 다시 넣으면 이전 결과를 그대로 돌려준다.
+        저장소가 비활성이거나 디스크 오류가 나면 None (분석 흐름은 저장소 없이 계속)
+        """
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                return self._ingest(dataset_id, df, columns)
+        except OSError:
+            return None
+
+    def _ingest(self, dataset_id: str, df: pd.DataFrame, columns: Dict[str, str]) -> Dict[str, Any]:
+        cached = self.manifest()
+        if dataset_id in cached["uploads"]:
+            return cached["uploads"][dataset_id]
+        manifest = {"months": dict(cached["months"]), "uploads": dict(cached["uploads"])}
+
+        # 키가 같은 리뷰는 내용 해시 순 순번으로 구분되므로 업로드 안에서 행 키가 겹치지 않는다
+        hashes = content_hashes(df)
+        frame = df.assign(row_key=row_keys(df, columns, hashes), row_hash=hashes)
+        months = month_labels(frame[columns['date']])
+
+        summary: Dict[str, Dict[str, int]] = {}
+        for month, rows in frame.groupby(months, sort=True):
+            known = self._read_parts(month, ['row_key', 'row_hash'])
+            if known is None:
+                delta = rows
+                new_rows, changed_rows = len(rows), 0
+            else:
+                current = known.drop_duplicates('row_key', keep='last')
+                positions = pd.Index(current['row_key']).get_indexer(rows['row_key'])
+                is_new = positions < 0
+                previous = current['row_hash'].to_numpy()[np.where(is_new, 0, positions)]
+                changed = ~is_new & (previous != rows['row_hash'].to_numpy())
+                delta = rows[is_new | changed]
+                new_rows, changed_rows = int(is_new.sum()), int(changed.sum())
+            if delta.empty:
+                continue
+            self._append(month, delta)
+            summary[month] = {"new": new_rows, "changed": changed_rows}
+            manifest["months"][month] = self._describe(month, columns)
+
+        result = {"months": summary, "ingested_at": time.time()}
+        manifest["uploads"][dataset_id] = result
+        while len(manifest["uploads"]) > MAX_UPLOADS:
+            manifest["uploads"].pop(next(iter(manifest["uploads"])))
+        self._save_manifest(manifest)
+        return result
+
+    def _append(self, month: str, delta: pd.DataFrame) -> None:
+        directory = os.path.join(self.directory, month)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{len(self._parts(month)) + 1:05d}.arrow")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(pa.Table.from_pandas(delta, preserve_index=False), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+
+    def _describe(self, month: str, columns: Dict[str, str]) -> Dict[str, Any]:
+        """바뀐 월만 다시 계산하는 manifest 항목 (행 수, digest, 가맹점별/전체 요약)"""
+        current = self.load_month(month)
+        return {
+            "rows": len(current),
+            "parts": len(self._parts(month)),
+            "digest": digest(current['row_key'].to_numpy(), current['row_hash'].to_numpy()),
+            "groups": month_summaries(current, columns).get(month, {}),
+            "updated_at": time.time(),
+        }
+
+
+review_store = ReviewStore(
+    os.environ.get("REVIEW_STORE_DIR", os.path.join(tempfile.gettempdir(), "review-report-store"))
+)
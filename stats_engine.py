@@ -0,0 +1,155 @@
+"""가맹점 × 기간 통계 엔진
+
+get_basic_stats 와 같은 항목(리뷰 수, 평균 별점, 일평균, 상위 날짜, 긍정/중립/부정 비율)을
+모든 그룹에 대해 한 번의 factorize + bincount/reduceat 로 계산한다.
+- 기간: 월('2025-11'), 분기('2025-Q4'), 연도('2025')
+- 롤업: by_franchise=False 면 전체 가맹점을 ALL_FRANCHISES('전체') 한 그룹으로 합산
+그룹별 DataFrame 을 만들지 않으므로 100만 행, 수백 개 그룹도 1초 안에 끝난다.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ALL_FRANCHISES = "전체"
+PERIODS = ("month", "quarter", "year")
+TOP_DATES = 3
+
+EMPTY_STATS = {"total_comments": 0, "rating_avg": 0, "daily_avg": 0, "top_dates": [],
+               "sentiment_dist": {"positive": 0, "neutral": 0, "negative": 0}}
+
+
+def sentiment_dist(total: int, pos: int, neg: int) -> Dict[str, float]:
+    """별점 4 이상 긍정, 3 이하 부정, 나머지(별점 없음 포함) 중립 비율(%)"""
+    if total == 0:
+        return {"positive": 0, "neutral": 0, "negative": 0}
+    return {
+        "positive": round((pos/total)*100, 1),
+        "neutral": round(((total-pos-neg)/total)*100, 1),
+        "negative": round((neg/total)*100, 1)
+    }
+
+
+def period_keys(dates: pd.Series, period: str) -> Tuple[np.ndarray, List[str]]:
+    """행별 기간 코드와 (정렬된) 기간 라벨"""
+    if period not in PERIODS:
+        raise ValueError(f"period 는 {', '.join(PERIODS)} 중 하나여야 합니다")
+    year = dates.dt.year.to_numpy(dtype=np.int64)
+    if period == "year":
+        codes, uniques = pd.factorize(year, sort=True)
+        return codes, [f"{y:04d}" for y in uniques]
+    month = dates.dt.month.to_numpy(dtype=np.int64)
+    if period == "quarter":
+        codes, uniques = pd.factorize(year * 10 + (month - 1) // 3 + 1, sort=True)
+        return codes, [f"{k // 10:04d}-Q{k % 10}" for k in uniques]
+    codes, uniques = pd.factorize(year * 100 + month, sort=True)
+    return codes, [f"{k // 100:04d}-{k % 100:02d}" for k in uniques]
+
+
+def _as_datetime(values: pd.Series) -> pd.Series:
+    # 정규화된 데이터셋은 이미 datetime64 이므로 변환하지 않음
+    return values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+
+
+def grouped_stats(codes: np.ndarray, n_groups: int, dates: pd.Series, ratings: pd.Series) -> List[Dict[str, Any]]:
+    """그룹 코드(0..n_groups-1) 별 get_basic_stats 결과 목록
+
+    상위 날짜는 value_counts 와 같이 건수 내림차순, 같으면 그룹 안에서 먼저 나온 날짜 순.
+    날짜가 없는 행(NaT)은 리뷰 수/비율에는 포함되고 기간/상위 날짜 계산에서만 빠진다.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    totals = np.bincount(codes, minlength=n_groups)
+
+    rating = pd.to_numeric(ratings, errors='coerce').to_numpy(dtype=float)
+    valid = ~np.isnan(rating)
+    rating_sum = np.bincount(codes[valid], weights=rating[valid], minlength=n_groups)
+    rating_n = np.bincount(codes[valid], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rating_avg = np.round(rating_sum / rating_n, 2)
+    pos = np.bincount(codes[valid & (rating >= 4.0)], minlength=n_groups)
+    neg = np.bincount(codes[valid & (rating <= 3.0)], minlength=n_groups)
+
+    # 기간(최초~최종 작성 시각)과 상위 날짜는 날짜가 있는 행만 그룹 순으로 정렬해 reduceat
+    stamps = _as_datetime(dates).to_numpy()
+    dated = ~np.isnat(stamps)
+    order = np.flatnonzero(dated)[np.argsort(codes[dated], kind='stable')]
+    sorted_codes = codes[order]
+    unit, _ = np.datetime_data(stamps.dtype)
+    ticks = stamps[order].astype(np.int64)
+    day_ticks = int(np.timedelta64(1, 'D') / np.timedelta64(1, unit))
+
+    days = np.zeros(n_groups, dtype=np.int64)
+    top_dates: List[List[Dict[str, Any]]] = [[] for _ in range(n_groups)]
+    if order.size:
+        present, starts = np.unique(sorted_codes, return_index=True)
+        span = np.maximum.reduceat(ticks, starts) - np.minimum.reduceat(ticks, starts)
+        days[present] = span // day_ticks + 1
+
+        day = np.floor_divide(ticks, day_ticks)
+        base = int(day.min())
+        width = int(day.max()) - base + 1
+        day_codes, day_keys = pd.factorize(sorted_codes * width + (day - base))
+        counts = np.bincount(day_codes)
+        key_group = day_keys // width
+        ranked = np.lexsort((np.arange(len(day_keys)), -counts, key_group))
+        first = np.searchsorted(key_group[ranked], key_group[ranked], side='left')
+        keep = ranked[np.arange(len(ranked)) - first < TOP_DATES]
+        for g, d, c in zip(key_group[keep], day_keys[keep] % width + base, counts[keep]):
+            top_dates[int(g)].append({"date": str(np.datetime64(int(d), 'D')), "count": int(c)})
+
+    result = []
+    for g in range(n_groups):
+        n, d = int(totals[g]), int(days[g])
+        if n == 0:
+            result.append(dict(EMPTY_STATS))
+            continue
+        result.append({
+            "total_comments": n,
+            "rating_avg": 0 if np.isnan(rating_avg[g]) else float(rating_avg[g]),
+            "daily_avg": round(n / d, 1) if d > 0 else n,
+            "top_dates": top_dates[g],
+            "sentiment_dist": sentiment_dist(n, int(pos[g]), int(neg[g]))
+        })
+    return result
+
+
+def frame_stats(df: pd.DataFrame, date_col: str, rating_col: str) -> Dict[str, Any]:
+    """프레임 전체를 한 그룹으로 본 통계 (get_basic_stats 대체)"""
+    if df.empty:
+        return dict(EMPTY_STATS)
+    return grouped_stats(np.zeros(len(df), dtype=np.int64), 1, df[date_col], df[rating_col])[0]
+
+
+def compute_group_stats(df: pd.DataFrame, franchise_col: str, date_col: str, rating_col: str,
+                        period: str = "month", by_franchise: bool = True) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """(가맹점, 기간) -> 통계. by_franchise=False 면 (ALL_FRANCHISES, 기간) 롤업"""
+    if df.empty:
+        return {}
+    dates = _as_datetime(df[date_col])
+    dated = dates.notna().to_numpy()
+    if not dated.all():
+        df, dates = df[dated], dates[dated]
+    period_codes, period_labels = period_keys(dates, period)
+    if by_franchise:
+        franchise_codes, franchise_labels = pd.factorize(df[franchise_col].astype(str), sort=True)
+    else:
+        franchise_codes, franchise_labels = np.zeros(len(df), dtype=np.int64), [ALL_FRANCHISES]
+
+    combined = franchise_codes.astype(np.int64) * len(period_labels) + period_codes
+    codes, groups = pd.factorize(combined, sort=True)
+    stats = grouped_stats(codes, len(groups), dates, df[rating_col])
+    return {
+        (str(franchise_labels[int(k) // len(period_labels)]), period_labels[int(k) % len(period_labels)]): s
+        for k, s in zip(groups, stats)
+    }
+
+
+def stats_table(df: pd.DataFrame, franchise_col: str, date_col: str, rating_col: str,
+                period: str = "month", rollup: bool = True, franchises: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """대시보드용 행 목록 - 가맹점별 그룹 뒤에 (rollup 이면) 전체 가맹점 합산 그룹"""
+    if franchises:
+        df = df[df[franchise_col].astype(str).isin(franchises)]
+    tables = [compute_group_stats(df, franchise_col, date_col, rating_col, period, True)]
+    if rollup:
+        tables.append(compute_group_stats(df, franchise_col, date_col, rating_col, period, False))
+    return [{"franchise": f, "period": p, "stats": s} for table in tables for (f, p), s in table.items()]
@@ -0,0 +1,315 @@
+"""대량 리뷰 map-reduce 요약
+
+한 프롬프트에 들어가지 않는 달(리뷰 150건 초과 또는 LLM_SINGLE_PROMPT_TOKENS 초과)은
+앞부분만 잘라 보내는 대신 전체 리뷰를 토큰 예산 단위 청크로 나눈다.
+- map   : 청크별로 장점/단점/키워드를 병렬 요약 (동시 호출 수 제한)
+- merge : 부분 요약이 한 프롬프트를 넘으면 단계적으로 병합
+- reduce: 통계와 부분 요약을 합쳐 최종 리포트 JSON 생성
+요청당 입력 토큰 총량은 LLM_TOKEN_BUDGET 으로 제한하며, 초과 시 월 전체에서 고르게 표본 추출한다.
+모든 모델 호출은 complete_json 을 거치며, 프로세스(이벤트 루프) 전체의 동시 호출 수는 LLM_MAX_INFLIGHT 로 제한한다.
+"""
+import asyncio
+import json
+import os
+import random
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from timing import record_llm
+
+if TYPE_CHECKING:
+    import openai
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow 미설치 환경
+    pa = None
+    pc = None
+
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 5))
+# 단일 프롬프트 최대 리뷰 수 (기존 동작과 동일)
+SINGLE_PROMPT_COMMENTS = 150
+# 단일 프롬프트에 넣을 수 있는 리뷰 토큰 수 - 모델 컨텍스트(gpt-4o 계열 128k) 기준, 지시문/응답 여유분 제외
+# 이 안에 들어가는 달은 map-reduce 없이 한 번에 호출한다
+LLM_SINGLE_PROMPT_TOKENS = int(os.environ.get("LLM_SINGLE_PROMPT_TOKENS", 32000))
+# map 청크 하나에 넣을 리뷰 토큰 수 (지시문/응답 여유분 제외)
+LLM_CHUNK_TOKENS = int(os.environ.get("LLM_CHUNK_TOKENS", 6000))
+# 요청 하나가 사용할 수 있는 리뷰 입력 토큰 총량
+LLM_TOKEN_BUDGET = int(os.environ.get("LLM_TOKEN_BUDGET", 120000))
+# 요청 하나 안에서의 map 단계 동시 호출 수
+LLM_MAP_CONCURRENCY = int(os.environ.get("LLM_MAP_CONCURRENCY", 4))
+# 프로세스 전체 동시 모델 호출 상한 - /api/analyze, 스트리밍, 배치, 작업 큐가 함께 쓴다
+LLM_MAX_INFLIGHT = int(os.environ.get("LLM_MAX_INFLIGHT", os.environ.get("JOB_LLM_CONCURRENCY", 16)))
+
+MAP_SCHEMA = '{"pros": [{"title": "...", "content": "..."}], "cons": [{"title": "...", "content": "..."}], "keywords": [{"tag": "키워드", "is_positive": true, "count": 0}], "notable": ["..."]}'
+REPORT_SCHEMA = '{"summary": "...", "insight": "...", "sentiment": {"positive": 0, "neutral": 0, "negative": 0}, "pros": [{"title": "...", "content": "..."}], "cons": [{"title": "...", "content": "..."}], "keywords": [{"tag": "키워드", "is_positive": true, "desc": "15-25자 설명"}], "action_plan": ["..."]}'
+
+
+def estimate_tokens(text: str) -> int:
+    """로컬 토큰 추정 - 한글/한자(UTF-8 3바이트)는 글자당 1, 그 외는 4자당 1 (보수적)"""
+    wide = (len(text.encode('utf-8')) - len(text)) // 2
+    return wide + (len(text) - wide + 3) // 4 + 1
+
+
+def estimate_tokens_series(texts: pd.Series) -> pd.Series:
+    """estimate_tokens 의 벡터 버전"""
+    if pc is not None:
+        arr = pa.array(texts.astype(str))
+        chars = pd.Series(pc.utf8_length(arr).to_numpy(zero_copy_only=False), index=texts.index)
+        nbytes = pd.Series(pc.binary_length(arr).to_numpy(zero_copy_only=False), index=texts.index)
+    else:
+        chars = texts.str.len()
+        nbytes = texts.str.encode('utf-8').str.len()
+    wide = (nbytes - chars) // 2
+    return wide + (chars - wide + 3) // 4 + 1
+
+
+def format_stats(stats: Optional[Dict[str, Any]]) -> str:
+    if not stats:
+        return ""
+    dist = stats.get("sentiment_dist", {})
+    return (f"총 {stats.get('total_comments', 0)}건, 평균 별점 {stats.get('rating_avg', 0)}, "
+            f"일평균 {stats.get('daily_avg', 0)}건, 별점 기준 긍정 {dist.get('positive', 0)}% / "
+            f"중립 {dist.get('neutral', 0)}% / 부정 {dist.get('negative', 0)}%")
+
+
+def fits_single_prompt(comments: List[str]) -> bool:
+    if len(comments) > SINGLE_PROMPT_COMMENTS:
+        return False
+    return sum(estimate_tokens(f"- {c}") for c in comments) <= LLM_SINGLE_PROMPT_TOKENS
+
+
+def sample_to_budget(comments: List[str], budget: int) -> List[str]:
+    """총 토큰이 예산을 넘으면 월 전체에 고르게 분포하도록 등간격 표본 추출"""
+    costs = [estimate_tokens(f"- {c}") for c in comments]
+    total = sum(costs)
+    if total <= budget:
+        return comments
+    step = total / budget
+    picked, used, cursor = [], 0, 0.0
+    for i in range(len(comments)):
+        if i >= cursor and used + costs[i] <= budget:
+            picked.append(comments[i])
+            used += costs[i]
+            cursor += step
+    return picked
+
+
+def chunk_comments(comments: List[str], max_tokens: int = LLM_CHUNK_TOKENS) -> List[List[str]]:
+    """토큰 예산 단위 청크 분할 (예산보다 긴 리뷰는 잘라서 넣음)"""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for comment in comments:
+        cost = estimate_tokens(f"- {comment}")
+        if cost > max_tokens:
+            comment = comment[:max_tokens]
+            cost = estimate_tokens(f"- {comment}")
+        if current and used + cost > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(comment)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_map_prompt(comments: List[str]) -> str:
+    return f"""당신은 전문 데이터 분석가입니다. 다음은 한 가맹점의 월간 리뷰 중 일부입니다. 이 리뷰들만 근거로 JSON으로 요약하세요.
+모든 텍스트는 반드시 한글로 작성하세요. 리뷰 앞의 (×N)은 같거나 거의 같은 리뷰가 N건 있다는 뜻이며, count 는 이를 반영한 언급 리뷰 수입니다.
+데이터: {chr(10).join([f"- {c}" for c in comments])}
+형식: {MAP_SCHEMA}
+"""
+
+
+def build_merge_prompt(partials: List[Dict[str, Any]]) -> str:
+    return f"""다음은 같은 가맹점 리뷰를 나누어 요약한 부분 결과들입니다. 중복을 합치고 count 를 더해 하나의 JSON으로 병합하세요.
+모든 텍스트는 반드시 한글로 작성하세요.
+부분 요약: {json.dumps(partials, ensure_ascii=False)}
+형식: {MAP_SCHEMA}
+"""
+
+
+def build_reduce_prompt(partials: List[Dict[str, Any]], stats: Optional[Dict[str, Any]], comments_total: int) -> str:
+    return f"""당신은 전문 데이터 분석가입니다. 다음은 한 가맹점의 월간 리뷰 {comments_total}건 전체를 나누어 요약한 결과와 통계입니다.
+이를 종합하여 최종 리포트를 JSON으로 응답하세요.
+모든 텍스트는 반드시 한글로 작성하세요. 키워드 설명(desc)은 한글 15~25자 내외로 작성하세요.
+통계: {format_stats(stats)}
+부분 요약: {json.dumps(partials, ensure_ascii=False)}
+형식: {REPORT_SCHEMA}
+"""
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Retry-After 헤더가 있으면 따르고, 없으면 지터를 더한 지수 백오프"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    try:
+        if retry_after is not None:
+            return float(retry_after)
+    except ValueError:
+        pass
+    return min(2 ** attempt, 30) + random.uniform(0, 1)
+
+
+class IncrementalObjectParser:
+    """스트리밍 중인 JSON 객체 텍스트에서 완성된 최상위 키/값을 순서대로 꺼낸다"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        completed: List[Tuple[str, Any]] = []
+        buf = self.buffer
+        for i in range(self.pos, len(buf)):
+            ch = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.member_start is None:
+                    self.member_start = i
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                if self.depth == 1:
+                    self._complete(i, completed)
+                self.depth -= 1
+            elif ch == ',' and self.depth == 1:
+                self._complete(i, completed)
+        self.pos = len(buf)
+        return completed
+
+    def _complete(self, end: int, completed: List[Tuple[str, Any]]) -> None:
+        if self.member_start is None:
+            return
+        member = self.buffer[self.member_start:end]
+        self.member_start = None
+        try:
+            completed.extend(json.loads("{" + member + "}").items())
+        except ValueError:
+            pass
+
+
+# 이벤트 루프별 세마포어 (Vercel 함수의 asyncio.run 처럼 루프가 바뀌어도 다른 루프에 묶이지 않게)
+_llm_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def llm_slots() -> asyncio.Semaphore:
+    """현재 이벤트 루프의 모델 호출 세마포어 (LLM_MAX_INFLIGHT)"""
+    loop = asyncio.get_running_loop()
+    slots = _llm_slots.get(loop)
+    if slots is None:
+        slots = _llm_slots[loop] = asyncio.Semaphore(max(1, LLM_MAX_INFLIGHT))
+    return slots
+
+
+async def _stream_json(client: "openai.AsyncOpenAI", prompt: str, model: str, on_section: Callable[[str, Any], None]) -> Dict[str, Any]:
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    parser = IncrementalObjectParser()
+    parts = []
+    usage = None
+    async for chunk in stream:
+        # include_usage: 마지막 청크(choices 없음)에 토큰 사용량
+        usage = getattr(chunk, "usage", None) or usage
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        parts.append(delta)
+        for key, value in parser.feed(delta):
+            on_section(key, value)
+    record_llm(model, usage)
+    return json.loads("".join(parts))
+
+
+async def complete_json(client: "openai.AsyncOpenAI", prompt: str, model: str,
+                        on_section: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """JSON 응답 호출 - 429/일시 오류는 Retry-After 또는 지수 백오프로 재시도
+
+    on_section 을 주면 스트리밍으로 받으면서 최상위 키가 완성될 때마다 (키, 값)으로 호출한다.
+    호출(스트리밍이면 응답을 다 받을 때까지)은 llm_slots() 안에서 실행하고, 재시도 대기 중에는 자리를 비운다.
+    """
+    import openai  # 콜드 스타트 단축 - 모델을 호출할 때 처음 로딩
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with llm_slots():
+                if on_section is not None:
+                    return await _stream_json(client, prompt, model, on_section)
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"}
+                )
+            record_llm(model, response.usage)
+            return json.loads(response.choices[0].message.content)
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise Exception(f"AI 분석 실패: {str(e)}")
+            await asyncio.sleep(_retry_delay(e, attempt))
+        except Exception as e:
+            raise Exception(f"AI 분석 실패: {str(e)}")
+
+
+async def map_reduce_analyze(client: "openai.AsyncOpenAI", comments: List[str], stats: Optional[Dict[str, Any]], model: str,
+                             concurrency: int = LLM_MAP_CONCURRENCY, token_budget: int = LLM_TOKEN_BUDGET,
+                             chunk_tokens: int = LLM_CHUNK_TOKENS,
+                             on_section: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """on_section 은 최종 reduce 호출의 스트리밍에만 적용"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def call(prompt: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await complete_json(client, prompt, model)
+
+    used = sample_to_budget(comments, token_budget)
+    chunks = chunk_comments(used, chunk_tokens)
+    partials = await asyncio.gather(*(call(build_map_prompt(chunk)) for chunk in chunks))
+
+    # 부분 요약이 한 프롬프트를 넘으면 단계적으로 병합
+    while len(partials) > 1 and estimate_tokens(json.dumps(partials, ensure_ascii=False)) > chunk_tokens:
+        groups, group, size = [], [], 0
+        for partial in partials:
+            cost = estimate_tokens(json.dumps(partial, ensure_ascii=False))
+            if group and size + cost > chunk_tokens:
+                groups.append(group)
+                group, size = [], 0
+            group.append(partial)
+            size += cost
+        groups.append(group)
+        if len(groups) == len(partials):
+            # 각 부분 요약이 이미 예산만큼 크면 더 합칠 수 없으므로 두 개씩 병합
+            groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+        partials = await asyncio.gather(*(call(build_merge_prompt(g)) if len(g) > 1 else asyncio.sleep(0, g[0]) for g in groups))
+
+    async with semaphore:
+        result = await complete_json(client, build_reduce_prompt(list(partials), stats, len(comments)), model, on_section)
+    result["coverage"] = {
+        "mode": "map_reduce",
+        "comments_total": len(comments),
+        "comments_used": len(used),
+        "chunks": len(chunks),
+    }
+    return result
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 루트의 모듈(dataset_cache, review_store 등)을 그대로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,38 @@
+"""스트리밍 ingest -> 사이드카 기록 (청크 여러 개)"""
+import io
+
+import openpyxl
+import pandas as pd
+
+import excel_ingest
+from columnar_store import ColumnarStore
+from dataset_cache import DatasetCache
+from report_core import CommentAnalyzer
+
+
+def workbook(ratings) -> io.BytesIO:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["가맹점 이름", "날짜", "별점", "댓글내용(한글)"])
+    for i, rating in enumerate(ratings):
+        ws.append(["리정원_공덕", f"2025.11.{i % 28 + 1:02d} 12:00:00", rating, f"댓글 {i}"])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_integer_ratings_then_fractional(tmp_path, monkeypatch):
+    # 첫 청크는 정수 별점뿐, 뒤 청크에 4.5
+    monkeypatch.setattr(excel_ingest, "INGEST_CHUNK_ROWS", 10)
+    ratings = [5, 4, 3] * 5 + [4.5] * 15
+    cache = DatasetCache(store=ColumnarStore(str(tmp_path)))
+
+    dataset = cache.get_or_load_file(workbook(ratings), CommentAnalyzer().identify_columns)
+
+    assert dataset.df["rating"].dtype == "float64"
+    assert dataset.df["rating"].tolist() == [float(r) for r in ratings]
+    assert pd.api.types.is_datetime64_ns_dtype(dataset.df["date"])
+    # 사이드카에서 다시 읽어도 같은 값
+    reloaded = DatasetCache(store=ColumnarStore(str(tmp_path))).get(dataset.dataset_id)
+    assert reloaded.df["rating"].tolist() == dataset.df["rating"].tolist()
@@ -0,0 +1,33 @@
+"""월 파티션 저장소 - 같은 키 리뷰의 행 키"""
+import pandas as pd
+
+from review_store import ReviewStore
+
+COLUMNS = {'franchise': 'franchise', 'date': 'date', 'rating': 'rating', 'comment_ko': 'comment_ko',
+           'reply_ko': 'reply_ko', 'comment': 'comment_ko'}
+
+
+def export(order) -> pd.DataFrame:
+    # 날짜만 있는 내보내기: 같은 날 "맛있어요" 세 건 (키는 같고 별점/답글이 다름)
+    rows = [
+        ("리정원_공덕", "2025-11-03", 5.0, "맛있어요", "감사합니다"),
+        ("리정원_공덕", "2025-11-03", 4.0, "맛있어요", None),
+        ("리정원_공덕", "2025-11-03", 3.0, "맛있어요", "다음엔 더 잘하겠습니다"),
+        ("리정원_공덕", "2025-11-04", 5.0, "친절해요", None),
+    ]
+    df = pd.DataFrame([rows[i] for i in order], columns=['franchise', 'date', 'rating', 'comment_ko', 'reply_ko'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['comment_ko'] = df['comment_ko'].astype('string')
+    df['reply_ko'] = df['reply_ko'].astype('string')
+    return df
+
+
+def test_reordered_duplicate_keys_are_unchanged(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    first = store.ingest("a" * 64, export([0, 1, 2, 3]), COLUMNS)
+    assert first["months"] == {"2025-11": {"new": 4, "changed": 0}}
+
+    again = store.ingest("b" * 64, export([2, 3, 0, 1]), COLUMNS)
+
+    assert again["months"] == {}
+    assert len(store.load_month("2025-11")) == 4
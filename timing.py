@@ -0,0 +1,263 @@
+"""요청 단계별 소요 시간 / LLM 토큰 / 캐시 적중 계측
+
+- RequestTimer: 요청 하나의 단계(span)별 시간, 모델 호출(모델, 호출 수, 토큰), 캐시 적중 여부
+  -> Server-Timing 응답 헤더, 구조화 로그(JSON 한 줄, stderr), 프로세스 누적 metrics
+- span / record_llm / record_cache: 현재 요청의 timer(contextvar)에 기록 - 요청 밖(배치, 벤치마크)이면 무시.
+  run_in_threadpool 과 asyncio 태스크는 contextvar 를 물려받으므로 깊은 곳(summarizer 등)에서도 바로 기록한다
+- Metrics: Prometheus 텍스트 형식 (/metrics) - 요청/단계 지연 히스토그램, 캐시 요청 수, 요청당 토큰
+- profile=True 면 동기 단계(span)를 실행하는 스레드에서 cProfile 을 켜고, 누적 시간 상위 함수를 응답에 붙인다
+"""
+import bisect
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# 0 이면 요청 로그를 남기지 않음
+REQUEST_LOG = os.environ.get("REQUEST_LOG", "1") != "0"
+# profile 요약에 남길 함수 수
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", 25))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+logger = logging.getLogger("review_report.timing")
+if REQUEST_LOG and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # le 는 '이하' - 경계값과 같으면 그 버킷
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+
+class Metrics:
+    """스레드 안전 카운터/히스토그램 모음 (프로세스 단위)"""
+
+    HELP = {
+        "review_report_request_duration_seconds": "Request latency by endpoint and status",
+        "review_report_stage_duration_seconds": "Stage latency by endpoint and stage",
+        "review_report_llm_tokens": "LLM tokens per request",
+        "review_report_llm_tokens_total": "LLM tokens by model",
+        "review_report_llm_calls_total": "LLM calls by model",
+        "review_report_cache_requests_total": "Cache lookups by cache and result",
+    }
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Dict[str, str], value: float,
+                buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines += [f"# HELP {name} {self.HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip([*hist.buckets, "+Inf"], hist.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else f"{bound:g}"
+                        lines.append(f'{name}_bucket{{{_labels(key + (("le", le),))}}} {cumulative}')
+                    lines.append(f"{name}_sum{{{_labels(key)}}} {hist.sum:.6g}")
+                    lines.append(f"{name}_count{{{_labels(key)}}} {hist.count}")
+            for name, series in sorted(self._counters.items()):
+                lines += [f"# HELP {name} {self.HELP.get(name, name)}", f"# TYPE {name} counter"]
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{{{_labels(key)}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+_current: contextvars.ContextVar[Optional["RequestTimer"]] = contextvars.ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """요청 하나의 단계별 계측 - activate() 안에서 span/record_llm/record_cache 가 이 timer 에 기록된다"""
+
+    def __init__(self, endpoint: str, profile: bool = False):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.llm: Dict[str, Any] = {"model": None, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self.caches: Dict[str, str] = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self._local = threading.local()
+        self._finished: Optional[Dict[str, Any]] = None
+
+    @contextmanager
+    def activate(self) -> Iterator["RequestTimer"]:
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def span(self, name: str, profiled: bool = True) -> Iterator[None]:
+        """단계 소요 시간 (같은 이름은 합산)
+
+        profiled=False: await 를 감싸는 단계(모델 호출) - 다른 요청의 코루틴까지 프로파일되지 않게 제외
+        """
+        outer = getattr(self._local, "depth", 0) == 0
+        profiling = self.profiler is not None and profiled and outer
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        start = time.perf_counter()
+        if profiling:
+            self.profiler.enable()
+        try:
+            yield
+        finally:
+            if profiling:
+                self.profiler.disable()
+            self._local.depth -= 1
+            self.spans[name] = self.spans.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def record_llm(self, model: str, usage: Any) -> None:
+        self.llm["model"] = model
+        self.llm["calls"] += 1
+        if usage is not None:
+            self.llm["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            self.llm["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.caches[cache] = "hit" if hit else "miss"
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (단계별 + total, llm 은 모델/토큰 설명 포함)"""
+        parts = []
+        for name, ms in self.spans.items():
+            entry = f"{name};dur={ms:.1f}"
+            if name == "llm" and self.llm["model"]:
+                entry += f';desc="{self.llm["model"]} {self.llm["prompt_tokens"]}+{self.llm["completion_tokens"]} tok"'
+            parts.append(entry)
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def profile_summary(self) -> Optional[List[Dict[str, Any]]]:
+        """누적 시간 상위 PROFILE_TOP 함수 (profile 이 꺼져 있거나 기록이 없으면 None)"""
+        if self.profiler is None:
+            return None
+        try:
+            stats = pstats.Stats(self.profiler).stats
+        except TypeError:  # 한 번도 enable 되지 않음
+            return None
+        top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+        return [{
+            "function": f"{os.path.basename(file)}:{line}({func})",
+            "calls": nc,
+            "total_ms": round(tt * 1000, 2),
+            "cumulative_ms": round(ct * 1000, 2),
+        } for (file, line, func), (cc, nc, tt, ct, _) in top]
+
+    def finish(self, status: int) -> Dict[str, Any]:
+        """요청 종료 - 로그 한 줄 + metrics 누적 (여러 번 불러도 한 번만 기록)"""
+        if self._finished is not None:
+            return self._finished
+        total = time.perf_counter() - self.started
+        summary = {
+            "event": "request",
+            "endpoint": self.endpoint,
+            "status": status,
+            "total_ms": round(total * 1000, 1),
+            "spans": {name: round(ms, 1) for name, ms in self.spans.items()},
+            "llm": self.llm if self.llm["calls"] else None,
+            "cache": self.caches,
+        }
+        self._finished = summary
+        metrics.observe("review_report_request_duration_seconds", {"endpoint": self.endpoint, "status": str(status)}, total)
+        for name, ms in self.spans.items():
+            metrics.observe("review_report_stage_duration_seconds", {"endpoint": self.endpoint, "stage": name}, ms / 1000)
+        for cache, result in self.caches.items():
+            metrics.inc("review_report_cache_requests_total", {"cache": cache, "result": result})
+        if self.llm["calls"]:
+            model = self.llm["model"]
+            metrics.inc("review_report_llm_calls_total", {"model": model}, self.llm["calls"])
+            for kind in ("prompt", "completion"):
+                tokens = self.llm[f"{kind}_tokens"]
+                metrics.inc("review_report_llm_tokens_total", {"model": model, "kind": kind}, tokens)
+                metrics.observe("review_report_llm_tokens", {"endpoint": self.endpoint, "kind": kind}, tokens, TOKEN_BUCKETS)
+        if REQUEST_LOG:
+            logger.info(json.dumps(summary, ensure_ascii=False))
+        return summary
+
+
+def current() -> Optional[RequestTimer]:
+    return _current.get()
+
+
+def span(name: str, profiled: bool = True):
+    """현재 요청 timer 의 span (요청 밖이면 아무것도 하지 않음)"""
+    timer = _current.get()
+    return timer.span(name, profiled) if timer is not None else nullcontext()
+
+
+def timed(name: str, fn, *args, **kwargs):
+    """run_in_threadpool 에 넘길 함수 - 실행하는 스레드에서 span 안에 실행 (cProfile 도 그 스레드에서)"""
+    def run():
+        with span(name):
+            return fn(*args, **kwargs)
+    return run
+
+
+def profile_requested(path: str) -> bool:
+    """요청 경로의 ?profile=1 (true/yes/on 도 허용)"""
+    values = parse_qs(urlparse(path).query).get("profile", [""])
+    return values[-1].lower() in ("1", "true", "yes", "on")
+
+
+def record_llm(model: str, usage: Any) -> None:
+    timer = _current.get()
+    if timer is not None:
+        timer.record_llm(model, usage)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    timer = _current.get()
+    if timer is not None:
+        timer.record_cache(cache, hit)
@@ -0,0 +1,87 @@
+"""월별 요약 기반 추이/비교 리포트
+
+가맹점 × 월(과 전체 가맹점 합산)마다 get_basic_stats 항목과 키워드 빈도를 한 번 미리 계산해 두고
+(month_summaries - 리뷰 저장소 manifest 또는 데이터셋에 보관), 추이 요청은 원본 행을 다시 읽지 않고
+요약만으로 전월 대비(MoM) / 전년 동월 대비(YoY) 변화량을 만든다.
+"""
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from keywords import group_keyword_counts
+from stats_engine import ALL_FRANCHISES, compute_group_stats, period_keys
+
+# month -> franchise(ALL_FRANCHISES 포함) -> {"stats": {...}, "keywords": {단어: 리뷰 수}}
+Summaries = Dict[str, Dict[str, Dict[str, Any]]]
+
+SENTIMENTS = ("positive", "neutral", "negative")
+
+
+def month_summaries(df: pd.DataFrame, columns: Dict[str, str]) -> Summaries:
+    """월 단위로 나눠(메모리 제한) 가맹점별/전체 통계와 키워드 빈도 계산"""
+    summaries: Summaries = {}
+    dates = df[columns['date']]
+    df = df[dates.notna().to_numpy()]
+    if df.empty:
+        return summaries
+    month_codes, month_labels = period_keys(df[columns['date']], "month")
+    for code, month in enumerate(month_labels):
+        part = df[month_codes == code]
+        groups: Dict[str, Dict[str, Any]] = {}
+        for by_franchise in (True, False):
+            stats = compute_group_stats(part, columns['franchise'], columns['date'], columns['rating'],
+                                        "month", by_franchise)
+            for (franchise, _), s in stats.items():
+                groups[franchise] = {"stats": s}
+
+        franchise_codes, franchises = pd.factorize(part[columns['franchise']].astype(str), sort=True)
+        keywords = group_keyword_counts(part[columns['comment']], franchise_codes, len(franchises), rollup=True)
+        for franchise, counts in zip([*map(str, franchises), ALL_FRANCHISES], keywords):
+            groups[franchise]["keywords"] = counts
+        summaries[month] = groups
+    return summaries
+
+
+def _shift_month(month: str, months: int) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    index = year * 12 + mon - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _pct(current: float, previous: float) -> Optional[float]:
+    return round((current - previous) / previous * 100, 1) if previous else None
+
+
+def compare(current: Dict[str, Any], previous: Optional[Dict[str, Any]], top_k: int) -> Optional[Dict[str, Any]]:
+    """두 월 요약의 변화량 (비교 대상 월이 없으면 None)"""
+    if previous is None:
+        return None
+    cur, prev = current["stats"], previous["stats"]
+    prev_keywords = previous.get("keywords", {})
+    return {
+        "total_comments": cur["total_comments"] - prev["total_comments"],
+        "total_comments_pct": _pct(cur["total_comments"], prev["total_comments"]),
+        "rating_avg": round(cur["rating_avg"] - prev["rating_avg"], 2),
+        "sentiment_dist": {k: round(cur["sentiment_dist"][k] - prev["sentiment_dist"][k], 1) for k in SENTIMENTS},
+        "keywords": [
+            {"tag": tag, "count": count, "delta": count - prev_keywords.get(tag, 0), "new": tag not in prev_keywords}
+            for tag, count in list(current.get("keywords", {}).items())[:top_k]
+        ],
+    }
+
+
+def build_trend(summaries: Summaries, franchise: str = ALL_FRANCHISES, last: int = 24,
+                top_k: int = 10) -> List[Dict[str, Any]]:
+    """가맹점(또는 전체)의 최근 last 개월 추이 - 월마다 요약과 MoM/YoY 변화량"""
+    months = sorted(m for m, groups in summaries.items() if franchise in groups)[-last:] if last > 0 else []
+    points = []
+    for month in months:
+        current = summaries[month][franchise]
+        points.append({
+            "month": month,
+            "stats": current["stats"],
+            "keywords": [{"tag": t, "count": c} for t, c in list(current.get("keywords", {}).items())[:top_k]],
+            "mom": compare(current, summaries.get(_shift_month(month, -1), {}).get(franchise), top_k),
+            "yoy": compare(current, summaries.get(_shift_month(month, -12), {}).get(franchise), top_k),
+        })
+    return points